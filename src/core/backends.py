@@ -0,0 +1,272 @@
+"""
+Moteurs OCR interchangeables
+- `OCRBackend` : interface commune (`recognize`, `recognize_many`, `recognize_layout`, `version`)
+- `TesseractCLI` : exécutable tesseract, via pytesseract ou en mémoire (transports, voir engine.py)
+- `Tesserocr` : libtesseract dans le processus (paquet tesserocr), modèle gardé chargé
+- `FakeBackend` : texte déterministe calculé depuis l'image, sans Tesseract (tests, benchmarks)
+- `get_backend(name, transport)` : instance partagée par le processus
+- `available_backends()` : moteurs utilisables sur cette machine
+
+Le moteur 'auto' (défaut) choisit tesserocr s'il est installé, sinon
+l'exécutable. tesserocr évite à chaque image le démarrage d'un processus et
+le rechargement du modèle de langue : les instances de l'API sont gardées
+par langue et réutilisées d'un appel à l'autre (une par fil simultané).
+Le délai `timeout` vaut pour tous les moteurs ; l'annulation d'un `Job`
+(jobs.py) tue le processus tesseract, alors qu'un appel tesserocr en cours
+va à son terme avant que le travail ne s'arrête.
+"""
+
+import importlib.util
+import threading
+import time
+from contextlib import contextmanager
+
+from src.core.engine import TRANSPORTS, recognize_many, recognize_pipe, resolve_tesseract_cmd, tesseract_version
+from src.core.jobs import current_job
+from src.core.layout import parse_tsv
+from src.core.lazy import lazy_import
+
+cv2 = lazy_import('cv2')
+np = lazy_import('numpy')
+pytesseract = lazy_import('pytesseract')
+tesserocr = lazy_import('tesserocr')
+
+# Noms acceptés par `get_backend` (et les options --engine / OCR_ENGINE)
+ENGINES = ('auto', 'tesseract', 'tesserocr', 'fake')
+
+# Instances partagées dans le processus : (nom, transport) -> moteur
+_instances = {}
+_instances_lock = threading.Lock()
+
+
+class OCRBackend:
+    """Interface d'un moteur OCR : images prétraitées (NumPy) en entrée, texte en sortie."""
+
+    name = ''
+
+    def recognize(self, img, lang=None, timeout=None) -> str:
+        """Texte d'une image ; erreur au-delà de `timeout` secondes."""
+        raise NotImplementedError
+
+    def recognize_many(self, images, lang=None, timeout=None) -> list:
+        """Textes de plusieurs images, dans l'ordre ; `timeout` vaut pour l'ensemble.
+
+        Par défaut les images sont lues l'une après l'autre.
+        """
+        return _one_by_one(self.recognize, images, lang, timeout)
+
+    def recognize_layout(self, img, lang=None, timeout=None):
+        """Blocs, lignes, mots, rectangles et confiances d'une image (`Layout`, voir layout.py).
+
+        Une seule reconnaissance : le texte s'obtient par `layout.text()`.
+        """
+        raise NotImplementedError
+
+    def recognize_layouts(self, images, lang=None, timeout=None) -> list:
+        """`Layout` de plusieurs images, dans l'ordre ; `timeout` vaut pour l'ensemble."""
+        return _one_by_one(self.recognize_layout, images, lang, timeout)
+
+    def version(self) -> str:
+        """Version du moteur, intégrée aux clés du cache de résultats."""
+        raise NotImplementedError
+
+
+class TesseractCLI(OCRBackend):
+    """Exécutable tesseract, un processus par appel (comportement historique)."""
+
+    name = 'tesseract'
+
+    def __init__(self, transport: str = 'file'):
+        if transport not in TRANSPORTS:
+            raise ValueError(f"Transport inconnu : {transport} (choix : {', '.join(TRANSPORTS)})")
+        self.transport = transport
+
+    def recognize(self, img, lang=None, timeout=None) -> str:
+        if self.transport == 'pipe':
+            return recognize_pipe(img, lang, timeout=timeout)
+        if current_job() is not None:
+            # Dans un Job, passage par engine.py : l'annulation tue le processus
+            return recognize_many([img], lang, timeout=timeout)[0]
+
+        pytesseract.pytesseract.tesseract_cmd = resolve_tesseract_cmd()
+        try:
+            return pytesseract.image_to_string(img, lang=lang, timeout=timeout or 0)
+        except Exception as e:
+            raise RuntimeError(f"Erreur lors de l'appel à pytesseract: {e}")
+
+    def recognize_many(self, images, lang=None, timeout=None) -> list:
+        # Un seul démarrage de tesseract pour tout le groupe (fichier liste)
+        return recognize_many(images, lang=lang, timeout=timeout)
+
+    def recognize_layout(self, img, lang=None, timeout=None):
+        if self.transport == 'pipe':
+            tsv = recognize_pipe(img, lang, timeout=timeout, output='tsv')
+        elif current_job() is not None:
+            tsv = recognize_many([img], lang, timeout=timeout, output='tsv')[0]
+        else:
+            pytesseract.pytesseract.tesseract_cmd = resolve_tesseract_cmd()
+            try:
+                tsv = pytesseract.image_to_data(img, lang=lang, timeout=timeout or 0)
+            except Exception as e:
+                raise RuntimeError(f"Erreur lors de l'appel à pytesseract: {e}")
+        return parse_tsv(tsv, _size(img))
+
+    def recognize_layouts(self, images, lang=None, timeout=None) -> list:
+        images = list(images)
+        outputs = recognize_many(images, lang=lang, timeout=timeout, output='tsv')
+        return [parse_tsv(tsv, _size(img)) for tsv, img in zip(outputs, images)]
+
+    def version(self) -> str:
+        return tesseract_version()
+
+
+class Tesserocr(OCRBackend):
+    """libtesseract appelée dans le processus ; modèles chargés une fois par langue."""
+
+    name = 'tesserocr'
+
+    def __init__(self):
+        if not has_tesserocr():
+            raise RuntimeError("Moteur 'tesserocr' indisponible : installez-le avec `pip install tesserocr`.")
+        self._idle = {}  # langue -> instances de l'API libres
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def _api(self, lang):
+        """Instance de l'API pour `lang`, réservée au fil appelant le temps de l'appel."""
+        with self._lock:
+            idle = self._idle.setdefault(lang, [])
+            api = idle.pop() if idle else None
+        if api is None:
+            api = tesserocr.PyTessBaseAPI(lang=lang or 'eng')
+        try:
+            yield api
+        finally:
+            with self._lock:
+                self._idle[lang].append(api)
+
+    def recognize(self, img, lang=None, timeout=None) -> str:
+        return self._run(img, lang, timeout, lambda api: api.GetUTF8Text())
+
+    def recognize_layout(self, img, lang=None, timeout=None):
+        return parse_tsv(self._run(img, lang, timeout, lambda api: api.GetTSVText(0)), _size(img))
+
+    def _run(self, img, lang, timeout, read):
+        """Reconnaît `img` puis retourne `read(api)` (texte ou TSV)."""
+        job = current_job()
+        if job is not None:
+            job.check()
+        if img.ndim == 3:
+            img = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+        img = np.ascontiguousarray(img, dtype=np.uint8)
+        h, w = img.shape
+
+        with self._api(lang) as api:
+            api.SetImageBytes(img.tobytes(), w, h, 1, w)
+            # Recognize attend un délai en millisecondes (0 : aucun)
+            if not api.Recognize(int(timeout * 1000) if timeout else 0):
+                api.Clear()
+                if timeout:
+                    raise TimeoutError(f"Tesseract interrompu après {timeout:g} s")
+                raise RuntimeError("Échec de la reconnaissance (tesserocr)")
+            output = read(api)
+            api.Clear()
+
+        if job is not None:
+            job.check()
+        return output
+
+    def version(self) -> str:
+        return f"tesserocr {tesserocr.tesseract_version().splitlines()[0]}"
+
+
+class FakeBackend(OCRBackend):
+    """Moteur factice : décrit l'image (taille, pixels d'encre) sans reconnaître de texte.
+
+    Même image, même texte : sert à tester les modes lot, flux, cache et GUI
+    sans Tesseract, et à mesurer le coût de tout ce qui entoure l'OCR.
+    """
+
+    name = 'fake'
+
+    def _words(self, img, lang):
+        job = current_job()
+        if job is not None:
+            job.check()
+        h, w = img.shape[:2]
+        ink = int(np.count_nonzero(img < 128))
+        return ['fake', f'{w}x{h}', 'ink', str(ink), 'lang', lang or '-']
+
+    def recognize(self, img, lang=None, timeout=None) -> str:
+        return ' '.join(self._words(img, lang)) + '\n'
+
+    def recognize_layout(self, img, lang=None, timeout=None):
+        # Une ligne de mots de même largeur ; le nombre de pixels d'encre est le mot « peu sûr »
+        words = self._words(img, lang)
+        w, h = _size(img)
+        step = max(1, w // len(words))
+        rows = [f"1\t1\t0\t0\t0\t0\t0\t0\t{w}\t{h}\t-1\t",
+                f"2\t1\t1\t0\t0\t0\t0\t0\t{w}\t{h}\t-1\t",
+                f"3\t1\t1\t1\t0\t0\t0\t0\t{w}\t{h}\t-1\t",
+                f"4\t1\t1\t1\t1\t0\t0\t0\t{w}\t{h}\t-1\t"]
+        for n, word in enumerate(words):
+            conf = 40.0 if n == 3 else 95.0
+            rows.append(f"5\t1\t1\t1\t1\t{n + 1}\t{n * step}\t0\t{step}\t{h}\t{conf}\t{word}")
+        return parse_tsv('\n'.join(rows), (w, h))
+
+    def version(self) -> str:
+        return 'fake 1'
+
+
+def _size(img):
+    """(largeur, hauteur) d'une image NumPy."""
+    return img.shape[1], img.shape[0]
+
+
+def _one_by_one(fn, images, lang, timeout) -> list:
+    """Applique `fn` à chaque image ; `timeout` vaut pour l'ensemble."""
+    deadline = time.monotonic() + timeout if timeout else None
+    results = []
+    for img in images:
+        remaining = None
+        if deadline is not None:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutError(f"Délai de {timeout:g} s dépassé")
+        results.append(fn(img, lang, remaining))
+    return results
+
+
+BACKENDS = {'tesseract': TesseractCLI, 'tesserocr': Tesserocr, 'fake': FakeBackend}
+
+
+def has_tesserocr() -> bool:
+    """Vrai si le paquet tesserocr est installé (sans l'importer)."""
+    return importlib.util.find_spec('tesserocr') is not None
+
+
+def available_backends() -> list:
+    """Moteurs utilisables ici (l'exécutable tesseract n'est pas vérifié)."""
+    return [name for name in BACKENDS if name != 'tesserocr' or has_tesserocr()]
+
+
+def get_backend(name=None, transport: str = 'file') -> OCRBackend:
+    """Moteur `name` ('auto' ou None : tesserocr s'il est installé, sinon l'exécutable).
+
+    Les instances sont partagées dans le processus : tesserocr garde ainsi
+    ses modèles chargés d'un appel à l'autre. `transport` ne concerne que
+    le moteur 'tesseract'.
+    """
+    name = name or 'auto'
+    if name == 'auto':
+        name = 'tesserocr' if has_tesserocr() else 'tesseract'
+    if name not in BACKENDS:
+        raise ValueError(f"Moteur inconnu : {name} (choix : {', '.join(ENGINES)})")
+
+    key = (name, transport if name == 'tesseract' else None)
+    with _instances_lock:
+        backend = _instances.get(key)
+        if backend is None:
+            backend = TesseractCLI(transport) if name == 'tesseract' else BACKENDS[name]()
+            _instances[key] = backend
+    return backend
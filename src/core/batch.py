@@ -0,0 +1,390 @@
+"""
+Traitement par lots pour le mini-projet OCR
+- `collect_image_paths(inputs)` : développe dossiers, motifs glob, listes `@fichier`
+  et documents multipages (TIFF, PDF : une référence par page)
+- `ocr_file(path)` : OCR d'une image avec isolation des erreurs
+- `ocr_group(paths)` : OCR de plusieurs images en un seul appel Tesseract
+- `run_batch(paths, workers, ordered, group)` : répartit les images sur un pool de processus
+- `ocr_document(path, workers)` : OCR des pages d'un document en parallèle, dans l'ordre
+- `BatchSummary` : statistiques de débit affichées en fin de lot
+
+Chaque image est traitée indépendamment : une erreur sur un fichier est
+enregistrée dans son résultat et n'interrompt pas le reste du lot.
+"""
+
+import glob
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from src.core.documents import expand_documents, split_page_ref
+from src.core.trace import Trace, record
+
+# Extensions reconnues lors du parcours d'un dossier
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp', '.tif', '.tiff', '.pdf', '.pbm', '.pgm', '.ppm', '.pnm')
+
+
+def collect_image_paths(inputs):
+    """Transforme une liste d'entrées en liste ordonnée de chemins d'images.
+
+    Chaque entrée peut être :
+    - un dossier (parcouru récursivement, seules les extensions connues sont gardées)
+    - un motif glob (`scans/*.png`, `scans/**/*.jpg`)
+    - une liste de fichiers `@liste.txt` (un chemin par ligne)
+    - un chemin de fichier simple
+
+    Les doublons sont supprimés en conservant l'ordre d'apparition. Les TIFF
+    multipages et les PDF sont remplacés par leurs pages (`scan.pdf#page=2`,
+    voir documents.py), décodées seulement au moment de leur traitement.
+    """
+    paths = []
+    for item in inputs:
+        if item.startswith('@'):
+            with open(item[1:], encoding='utf-8') as f:
+                paths.extend(line.strip() for line in f if line.strip())
+        elif os.path.isdir(item):
+            for root, dirs, files in os.walk(item):
+                dirs.sort()
+                for name in sorted(files):
+                    if name.lower().endswith(IMAGE_EXTENSIONS):
+                        paths.append(os.path.join(root, name))
+        elif glob.has_magic(item):
+            paths.extend(sorted(glob.glob(item, recursive=True)))
+        else:
+            paths.append(item)
+
+    return expand_documents(list(dict.fromkeys(paths)))
+
+
+def default_workers() -> int:
+    """Nombre de processus par défaut : les cœurs réellement disponibles."""
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0)) or 1
+    return os.cpu_count() or 1
+
+
+def ocr_file(path: str, options=None) -> dict:
+    """OCR d'une seule image (load_image → preprocess_image → Tesseract).
+
+    `options` est transmis à `extract_text_from_image` (langue, cache...) ;
+    avec `trace=True`, le résultat contient aussi la `Trace` de l'image,
+    avec `layout=True`, le `Layout` reconnu (mots, rectangles, confiances).
+    Ne lève jamais d'exception : le résultat contient `error` en cas d'échec.
+    """
+    # Import tardif : main.py importe ce module
+    from src.core.main import extract_text_from_image
+
+    options = dict(options or {})
+    trace = Trace(path) if options.pop('trace', False) else None
+
+    info = {}
+    start = time.perf_counter()
+    try:
+        text = extract_text_from_image(path, timings=trace, info=info, **options)
+        error = None
+    except Exception as e:
+        text = ''
+        error = str(e)
+
+    result = {
+        'path': path,
+        'text': text,
+        'error': error,
+        'duration': time.perf_counter() - start,
+    }
+    if 'region' in info:
+        result['region'] = info['region']
+    if 'layout' in info:
+        result['layout'] = info['layout']
+    if 'refine' in info:
+        result['refine'] = info['refine']
+    if 'duplicate' in info:
+        result['duplicate'] = info['duplicate']
+    if trace is not None:
+        result['trace'] = trace.finish()
+    return result
+
+
+def ocr_group(paths, options=None) -> list:
+    """OCR d'un groupe d'images avec un seul démarrage de Tesseract.
+
+    Les images illisibles sont écartées avant l'appel groupé, celles déjà
+    présentes dans le cache (ou, avec `near_dup`, proches d'une image déjà
+    lue) ne sont pas soumises ; si l'appel groupé échoue, chaque image est
+    retraitée seule pour isoler le fautif.
+    """
+    from src.core.dedup import hamming
+    from src.core.documents import load_page
+    from src.core.backends import get_backend
+    from src.core.functions import load_image, preprocess_image
+    from src.core.layout import Layout
+    from src.core.lookup import ResultLookup, decode, read_params
+    from src.core.lowmem import low_memory_source
+    from src.core.pipeline import get_pipeline
+    from src.core.refine import refine_layout
+    from src.core.regions import crop_to_text
+    from src.core.resolution import choose_reduce_factor
+
+    options = options or {}
+    tracing = options.get('trace', False)
+    lang = options.get('lang')
+    x_height = options.get('x_height', 0)
+    regions = options.get('regions', False)
+    timeout = options.get('timeout')
+    layout = options.get('layout', False)
+    refine = options.get('refine', 0)
+    memory_limit = options.get('memory_limit', 0)
+    structured = layout or refine
+    pipeline = get_pipeline(options.get('pipeline'), x_height)
+    backend = get_backend(options.get('engine'), options.get('transport', 'file'))
+    near_dup = options.get('near_dup')
+    near_dup_action = options.get('near_dup_action', 'flag')
+    known = None
+    if options.get('cache_dir'):
+        # Images lues entières (pas de bandes dans un groupe) : mêmes clés qu'avec `extract_text_from_image`
+        known = ResultLookup(options['cache_dir'], options['cache_max_bytes'],
+                             read_params(pipeline, 0, regions, structured, refine),
+                             lang, backend.version(), near_dup, near_dup_action)
+
+    def reuse(result, stored, size=None):
+        """Remplit `result` depuis un résultat stocké (JSON d'un `Layout` en mode structuré)."""
+        result['text'], found = decode(stored, structured)
+        if layout:
+            result['layout'] = found if found is not None else Layout.empty(size)
+
+    start = time.perf_counter()
+    results = []
+    ready = []
+    twins = []  # (résultat, résultat de l'image proche soumise dans ce groupe, distance)
+    for path in paths:
+        result = {'path': path, 'text': '', 'error': None, 'duration': 0.0}
+        trace = None
+        if tracing:
+            trace = result['trace'] = Trace(path)
+        results.append(result)
+        try:
+            source, page = split_page_ref(path)
+            key = known.key(source, page) if known is not None else None
+            text = known.get(key) if known is not None else None
+            if text is not None:
+                reuse(result, text)
+                continue
+            if memory_limit and low_memory_source(source, page, pipeline, memory_limit) is not None:
+                # Image au-delà du plafond mémoire : prétraitée par bandes, hors du groupe
+                results[-1] = ocr_file(path, options)
+                continue
+            load_start = time.perf_counter()
+            factor = 1
+            if page:
+                img = load_page(source, page, gray=pipeline.gray_input)
+            else:
+                factor = choose_reduce_factor(path, x_height)
+                img = load_image(path, factor, pipeline.gray_input)
+            if trace is not None:
+                record(trace, 'load', time.perf_counter() - load_start, shape=img.shape)
+                if not page:
+                    trace.bytes_read += os.path.getsize(path)
+            processed = preprocess_image(img, pipeline, trace)
+            # Pour ramener les rectangles du `Layout` à l'image d'origine
+            geometry = (processed.shape, img.shape, factor, (0, 0))
+            fingerprint = known.fingerprint(processed) if known is not None else None
+            if fingerprint is not None:
+                # Quasi-doublon d'une image déjà lue : signalé (ou résultat repris) sans OCR
+                found = known.near_duplicate(fingerprint)
+                if found is not None:
+                    match, stored = found
+                    result['duplicate'] = {'path': match['path'], 'distance': match['distance']}
+                    reuse(result, stored, (img.shape[1] * factor, img.shape[0] * factor))
+                    continue
+                # Copie d'une image de ce même groupe : son résultat sera repris après l'appel
+                twin = min(((hamming(fingerprint, entry[5]), entry[0]) for entry in ready),
+                           key=lambda pair: pair[0], default=None)
+                if twin is not None and twin[0] <= near_dup:
+                    twins.append((result, twin[1], twin[0]))
+                    if near_dup_action != 'reuse' and layout:
+                        result['layout'] = Layout.empty((img.shape[1] * factor, img.shape[0] * factor))
+                    continue
+            if regions:
+                region_start = time.perf_counter()
+                cropped, result['region'], offset = crop_to_text(processed)
+                record(trace, 'regions', time.perf_counter() - region_start, region=result['region'])
+                if cropped is None:
+                    # Page blanche : écartée de l'appel groupé
+                    empty = ''
+                    if structured:
+                        empty = Layout.empty((img.shape[1] * factor, img.shape[0] * factor))
+                        if layout:
+                            result['layout'] = empty
+                    if known is not None:
+                        known.put(key, empty, fingerprint, path)
+                    continue
+                processed = cropped
+                geometry = geometry[:3] + (offset,)
+            ready.append((result, key, processed, geometry, img if refine else None, fingerprint))
+        except Exception as e:
+            result['error'] = str(e)
+
+    ocr_start = time.perf_counter()
+    try:
+        # Délai proportionnel au nombre d'images du groupe
+        group_timeout = timeout * len(ready) if timeout else None
+        images = [entry[2] for entry in ready]
+        if not ready:
+            outputs = []
+        elif structured:
+            outputs = backend.recognize_layouts(images, lang=lang, timeout=group_timeout)
+        else:
+            outputs = backend.recognize_many(images, lang=lang, timeout=group_timeout)
+    except Exception:
+        return [ocr_file(path, options) for path in paths]
+    ocr_share = (time.perf_counter() - ocr_start) / max(1, len(ready))
+
+    entries = []  # (clé, résultat, empreinte, chemin) à enregistrer
+    for (result, key, img, geometry, decoded, fingerprint), output in zip(ready, outputs):
+        if tracing:
+            # Un seul appel Tesseract pour le groupe : temps réparti entre ses images
+            record(result['trace'], 'ocr', ocr_share, shape=img.shape, group=len(ready))
+        if structured:
+            found = output.to_source(*geometry)
+            if refine:
+                # Lignes faibles relues avec le prétraitement lourd (appel propre à l'image)
+                info = {}
+                try:
+                    found = refine_layout(decoded, found, backend, refine, lang, timeout,
+                                          factor=geometry[2], timings=result.get('trace'), info=info)
+                except Exception as e:
+                    result['error'] = str(e)
+                    continue
+                result['refine'] = info['refine']
+            if layout:
+                result['layout'] = found
+            result['text'] = found.text()
+            output = found
+        else:
+            result['text'] = output
+        entries.append((key, output, fingerprint, result['path']))
+    if known is not None:
+        known.put_many(entries)
+    for result, original, distance in twins:
+        result['duplicate'] = {'path': original['path'], 'distance': distance}
+        if near_dup_action == 'reuse':
+            result['text'] = original['text']
+            result['error'] = original['error']
+            if 'layout' in original:
+                result['layout'] = original['layout']
+
+    # Le temps du groupe est réparti uniformément entre ses images
+    duration = (time.perf_counter() - start) / len(paths)
+    for result in results:
+        result['duration'] = duration
+        if tracing:
+            result['trace'].finish()
+    return results
+
+
+def run_batch(paths, workers=None, ordered=True, group=1, options=None):
+    """Traite `paths` sur un pool de `workers` processus et produit les résultats.
+
+    - `ordered=True` : les résultats sortent dans l'ordre des chemins
+    - `ordered=False` : les résultats sortent dès qu'ils sont prêts
+    - `group > 1` : chaque tâche soumet `group` images à un seul processus Tesseract
+    - `options` : paramètres d'OCR transmis à chaque tâche (langue, cache...) ;
+      avec `memory_limit`, pas plus de processus que la mémoire disponible n'en contient
+
+    Générateur : les résultats peuvent être écrits au fil de l'eau.
+    """
+    from src.core.lowmem import workers_for_memory
+
+    workers = workers_for_memory(workers or default_workers(), (options or {}).get('memory_limit', 0))
+    group = max(1, group)
+    chunks = [paths[i:i + group] for i in range(0, len(paths), group)]
+
+    if workers == 1 or len(chunks) <= 1:
+        for chunk in chunks:
+            yield from _ocr_chunk(chunk, options)
+        return
+
+    with ProcessPoolExecutor(max_workers=min(workers, len(chunks))) as pool:
+        futures = {pool.submit(_ocr_chunk, chunk, options): chunk for chunk in chunks}
+        iterator = futures if ordered else as_completed(futures)
+        for future in iterator:
+            try:
+                yield from future.result()
+            except Exception as e:
+                # Processus de travail mort (mémoire, signal...) : on isole l'erreur
+                for path in futures[future]:
+                    yield {'path': path, 'text': '', 'error': str(e), 'duration': 0.0}
+
+
+def ocr_document(path: str, workers=None, options=None) -> list:
+    """OCR de toutes les pages d'un document (TIFF multipage, PDF ou image simple).
+
+    Les pages sont réparties sur le pool de processus ; retourne un résultat
+    par page, dans l'ordre des pages.
+    """
+    return list(run_batch(expand_documents([path]), workers=workers, ordered=True, options=options))
+
+
+def _ocr_chunk(paths, options=None) -> list:
+    """Tâche exécutée par le pool : une image seule ou un groupe d'images."""
+    if len(paths) == 1:
+        return [ocr_file(paths[0], options)]
+    return ocr_group(paths, options)
+
+
+class BatchSummary:
+    """Accumule les résultats d'un lot et calcule le débit final."""
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.images = 0
+        self.errors = 0
+        self.ocr_time = 0.0
+        self.regions = {}  # état de détection ('blank', 'crop', 'full') -> nombre d'images
+        self.refined = {'images': 0, 'lines': 0, 'improved': 0}  # reprise des lignes faibles (refine.py)
+        self.duplicates = 0  # quasi-doublons repris ou signalés sans OCR (dedup.py)
+
+    def add(self, result: dict):
+        self.images += 1
+        self.ocr_time += result['duration']
+        if result['error']:
+            self.errors += 1
+        region = result.get('region')
+        if region:
+            self.regions[region] = self.regions.get(region, 0) + 1
+        if result.get('duplicate'):
+            self.duplicates += 1
+        refine = result.get('refine')
+        if refine:
+            self.refined['images'] += refine['lines'] > 0
+            self.refined['lines'] += refine['lines']
+            self.refined['improved'] += refine['improved']
+
+    def report(self) -> str:
+        """Retourne le résumé (images/s, temps total) prêt à afficher."""
+        wall = time.perf_counter() - self.start
+        rate = self.images / wall if wall > 0 else 0.0
+        mean = self.ocr_time / self.images if self.images else 0.0
+        report = (
+            f"Images traitées : {self.images} ({self.errors} erreur(s))\n"
+            f"Temps total     : {wall:.2f} s\n"
+            f"Débit           : {rate:.2f} images/s\n"
+            f"Temps moyen     : {mean:.2f} s/image"
+        )
+        if self.regions:
+            # Pourcentages rapportés aux images analysées (hors cache et erreurs)
+            analysed = sum(self.regions.values())
+            blank = self.regions.get('blank', 0)
+            cropped = self.regions.get('crop', 0)
+            report += (
+                f"\nPages blanches  : {blank} ({100 * blank / analysed:.0f} %, OCR ignoré)\n"
+                f"Recadrées       : {cropped} ({100 * cropped / analysed:.0f} %)"
+            )
+        if self.refined['images']:
+            report += (
+                f"\nLignes reprises : {self.refined['lines']} sur {self.refined['images']} image(s), "
+                f"{self.refined['improved']} améliorée(s)"
+            )
+        if self.duplicates:
+            report += f"\nQuasi-doublons  : {self.duplicates} ({100 * self.duplicates / self.images:.0f} %, OCR évité)"
+        return report
@@ -0,0 +1,164 @@
+"""
+Cache disque des résultats OCR
+- `cache_key(...)` : clé dérivée du contenu de l'image et des paramètres OCR
+- `result_key(source, params, lang, version)` : clé d'une image (chemin ou octets) pour le moteur courant
+- `OCRCache` : stockage SQLite borné en taille avec éviction LRU
+- `open_cache(directory)` : instance partagée par processus
+
+La clé combine le hash SHA-256 des octets de l'image, les paramètres de
+prétraitement, la langue et la version de Tesseract : un document déjà
+soumis devient une simple lecture. SQLite (mode WAL) gère les accès
+concurrents de plusieurs processus de travail sur le même dossier.
+"""
+
+import hashlib
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+
+from src.core.engine import tesseract_version
+
+# Taille maximale par défaut du cache (octets de texte stockés)
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    text TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    last_access REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_last_access ON entries(last_access);
+CREATE TABLE IF NOT EXISTS stats (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO stats VALUES ('hits', 0), ('misses', 0), ('bytes', 0);
+"""
+
+
+def file_digest(path: str) -> str:
+    """Hash SHA-256 du contenu d'un fichier, lu par blocs."""
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            h.update(block)
+    return h.hexdigest()
+
+
+def cache_key(image_digest: str, params: str, lang, version: str) -> str:
+    """Construit la clé de cache d'un résultat OCR."""
+    raw = '\x00'.join([image_digest, params, lang or '', version])
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+def result_key(source, params: str, lang=None, version=None) -> str:
+    """Clé de cache d'une image (chemin ou contenu encodé).
+
+    `version` : version du moteur OCR (`OCRBackend.version()`), par défaut celle de l'exécutable tesseract.
+    """
+    digest = file_digest(source) if isinstance(source, str) else hashlib.sha256(source).hexdigest()
+    return cache_key(digest, params, lang, version or tesseract_version())
+
+
+class OCRCache:
+    """Cache clé → texte sur disque, borné par `max_bytes` (éviction LRU)."""
+
+    def __init__(self, directory: str, max_bytes: int = DEFAULT_MAX_BYTES):
+        os.makedirs(directory, exist_ok=True)
+        self.path = os.path.join(directory, 'ocr_cache.sqlite3')
+        self.max_bytes = max_bytes
+        # Compteurs de la session courante (les totaux sont dans la base)
+        self.hits = 0
+        self.misses = 0
+
+        self.db = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        self.db.execute('PRAGMA journal_mode=WAL')
+        self.db.execute('PRAGMA synchronous=NORMAL')
+        self.db.executescript(_SCHEMA)
+
+    def get(self, key: str):
+        """Retourne le texte en cache ou None ; met à jour l'accès LRU."""
+        row = self.db.execute('SELECT text FROM entries WHERE key = ?', (key,)).fetchone()
+        counter = 'hits' if row else 'misses'
+        with self._transaction():
+            if row:
+                self.db.execute('UPDATE entries SET last_access = ? WHERE key = ?', (time.time(), key))
+            self.db.execute('UPDATE stats SET value = value + 1 WHERE name = ?', (counter,))
+
+        if row:
+            self.hits += 1
+            return row[0]
+        self.misses += 1
+        return None
+
+    def put(self, key: str, text: str):
+        """Enregistre un résultat puis évince les entrées les plus anciennes si besoin."""
+        size = len(text.encode('utf-8'))
+        with self._transaction():
+            old = self.db.execute('SELECT size FROM entries WHERE key = ?', (key,)).fetchone()
+            self.db.execute(
+                'INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?)',
+                (key, text, size, time.time()),
+            )
+            delta = size - (old[0] if old else 0)
+            self.db.execute("UPDATE stats SET value = value + ? WHERE name = 'bytes'", (delta,))
+            self._evict()
+
+    def _evict(self):
+        """Supprime les entrées les moins récemment utilisées jusqu'à 90 % du plafond."""
+        total = self.db.execute("SELECT value FROM stats WHERE name = 'bytes'").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        target = int(self.max_bytes * 0.9)
+        freed = 0
+        victims = []
+        for key, size in self.db.execute('SELECT key, size FROM entries ORDER BY last_access'):
+            if total - freed <= target:
+                break
+            victims.append((key,))
+            freed += size
+        self.db.executemany('DELETE FROM entries WHERE key = ?', victims)
+        self.db.execute("UPDATE stats SET value = value - ? WHERE name = 'bytes'", (freed,))
+
+    def stats(self) -> dict:
+        """Statistiques cumulées (tous processus) et de la session courante."""
+        totals = dict(self.db.execute('SELECT name, value FROM stats'))
+        entries = self.db.execute('SELECT COUNT(*) FROM entries').fetchone()[0]
+        return {
+            'entries': entries,
+            'bytes': totals['bytes'],
+            'hits': totals['hits'],
+            'misses': totals['misses'],
+            'session_hits': self.hits,
+            'session_misses': self.misses,
+        }
+
+    @contextmanager
+    def _transaction(self):
+        """Transaction en écriture immédiate (verrou pris dès le début)."""
+        self.db.execute('BEGIN IMMEDIATE')
+        try:
+            yield
+        except BaseException:
+            self.db.execute('ROLLBACK')
+            raise
+        self.db.execute('COMMIT')
+
+    def close(self):
+        self.db.close()
+
+
+# Une instance par (processus, dossier) : les connexions SQLite ne doivent
+# pas être partagées entre processus après un fork
+_instances = {}
+
+
+def open_cache(directory: str, max_bytes: int = DEFAULT_MAX_BYTES) -> OCRCache:
+    """Retourne l'instance de cache du processus courant pour `directory`."""
+    key = (os.getpid(), os.path.abspath(directory))
+    if key not in _instances:
+        _instances[key] = OCRCache(directory, max_bytes)
+    return _instances[key]
@@ -0,0 +1,206 @@
+"""
+Index des quasi-doublons (rescans, fax, JPEG réenregistrés)
+- `phash(img)` : empreinte perceptuelle (pHash 256 bits) d'une image prétraitée
+- `hamming(a, b)` : nombre de bits différents entre deux empreintes
+- `near_dup_scope(params, lang, version)` : portée des empreintes (paramètres de lecture)
+- `NearDuplicateIndex` : empreintes stockées dans SQLite, recherche par distance de Hamming
+- `open_index(directory)` : instance partagée par processus (dossier du cache de résultats)
+
+Deux scans d'une même page n'ont jamais les mêmes octets : le cache de
+résultats (cache.py) ne les reconnaît pas. L'empreinte est calculée sur
+la zone de texte (regions.py) de l'image binarisée, réduite à 64 × 64 :
+les 16 × 16 basses fréquences de sa DCT sont comparées à leur médiane.
+Compression JPEG, bruit, léger décalage ou changement de résolution ne
+modifient qu'une vingtaine de bits sur 256, alors que deux pages
+différentes en diffèrent de plus de 80 (une dHash, qui compare des cases
+voisines presque toutes blanches, ne sépare pas des pages de texte).
+
+Recherche par hachage multi-index : l'empreinte est découpée en 8
+morceaux de 32 bits, chacun indexé dans SQLite. Deux empreintes à
+distance `d` ont au moins un morceau à distance `d // 8` au plus
+(principe des tiroirs) : on ne lit que les entrées dont un morceau est à
+cette distance de celui de la requête (529 valeurs par morceau pour
+d <= 23), puis la distance exacte est vérifiée. Avec des morceaux de 32
+bits, presque aucune entrée étrangère n'est lue : une recherche coûte
+quelques millisecondes, que l'index compte mille ou un million
+d'empreintes (voir utils/bench_dedup.py).
+"""
+
+import functools
+import itertools
+import os
+import sqlite3
+import time
+
+from src.core.cache import cache_key
+from src.core.lazy import lazy_import
+from src.core.regions import detect_text_region
+
+cv2 = lazy_import('cv2')
+np = lazy_import('numpy')
+
+# Côté de l'image réduite et du bloc de basses fréquences gardé : HASH_SIZE² bits
+DCT_SIZE = 64
+HASH_SIZE = 16
+HASH_BITS = HASH_SIZE * HASH_SIZE
+
+# Morceaux indexés séparément (hachage multi-index)
+CHUNKS = 8
+CHUNK_BITS = HASH_BITS // CHUNKS
+
+# Distance de Hamming par défaut (sur 256 bits) jusqu'à laquelle deux images sont des doublons.
+# Assez large pour un rescan ou un fax, donc aussi pour deux exemplaires remplis d'un même
+# formulaire : le résultat d'un doublon n'est repris qu'à la demande (near_dup_action='reuse')
+DEFAULT_DISTANCE = 20
+
+# Au-delà, chaque morceau demanderait des milliers de voisins à énumérer
+MAX_DISTANCE = 3 * CHUNKS - 1
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS fingerprints (
+    id INTEGER PRIMARY KEY,
+    scope TEXT NOT NULL,
+    hash BLOB NOT NULL,
+    key TEXT NOT NULL,
+    path TEXT,
+    added REAL NOT NULL,
+    {chunks}
+);
+{indexes}
+""".format(
+    chunks=',\n    '.join(f'c{i} INTEGER NOT NULL' for i in range(CHUNKS)),
+    indexes='\n'.join(f'CREATE INDEX IF NOT EXISTS fingerprints_c{i} ON fingerprints(c{i});'
+                      for i in range(CHUNKS)),
+)
+
+
+def phash(binary) -> int:
+    """Empreinte pHash (HASH_BITS bits) de la zone de texte d'une image binarisée.
+
+    Une page blanche donne toujours la même empreinte.
+    """
+    if binary.ndim == 3:
+        binary = cv2.cvtColor(binary, cv2.COLOR_BGR2GRAY)
+    region = detect_text_region(binary)
+    if region is not None:
+        # Marges et position de la page sur le scanner ignorées
+        x, y, w, h = region
+        binary = binary[y:y + h, x:x + w]
+    small = cv2.resize(binary, (DCT_SIZE, DCT_SIZE), interpolation=cv2.INTER_AREA).astype(np.float32)
+    low = cv2.dct(small)[:HASH_SIZE, :HASH_SIZE].ravel()
+    # Médiane hors composante continue (luminosité moyenne)
+    bits = low > np.median(low[1:])
+    return int.from_bytes(np.packbits(bits).tobytes(), 'big')
+
+
+def hamming(a: int, b: int) -> int:
+    return bin(a ^ b).count('1')
+
+
+def near_dup_scope(params: str, lang, version: str) -> str:
+    """Portée d'une empreinte : seules les images lues avec les mêmes paramètres sont comparées."""
+    return cache_key('near-dup', params, lang, version)
+
+
+def _chunks(fingerprint: int):
+    """Les CHUNKS morceaux de CHUNK_BITS bits de l'empreinte, poids fort en premier."""
+    mask = (1 << CHUNK_BITS) - 1
+    return [(fingerprint >> (CHUNK_BITS * (CHUNKS - 1 - i))) & mask for i in range(CHUNKS)]
+
+
+@functools.lru_cache(maxsize=None)
+def _flip_masks(radius: int) -> tuple:
+    """Masques XOR de 0 à `radius` bits parmi CHUNK_BITS (calculés une fois)."""
+    masks = [0]
+    for r in range(1, radius + 1):
+        for bits in itertools.combinations(range(CHUNK_BITS), r):
+            masks.append(sum(1 << bit for bit in bits))
+    return tuple(masks)
+
+
+def _neighbours(value: int, radius: int) -> list:
+    """Valeurs à distance de Hamming <= `radius` de `value` (morceau de CHUNK_BITS bits)."""
+    return [value ^ mask for mask in _flip_masks(radius)]
+
+
+class NearDuplicateIndex:
+    """Empreintes des images déjà lues : (portée, empreinte) -> clé de résultat du cache.
+
+    `scope` isole les paramètres de lecture (prétraitement, langue, moteur) :
+    un résultat n'est réutilisé que pour une image lue de la même façon.
+    """
+
+    def __init__(self, directory: str):
+        os.makedirs(directory, exist_ok=True)
+        self.path = os.path.join(directory, 'near_duplicates.sqlite3')
+        self.db = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        self.db.execute('PRAGMA journal_mode=WAL')
+        self.db.execute('PRAGMA synchronous=NORMAL')
+        self.db.executescript(_SCHEMA)
+
+    def add(self, fingerprint: int, scope: str, key: str, path=None):
+        """Enregistre l'empreinte d'une image lue et la clé de son résultat."""
+        self.add_many([(fingerprint, scope, key, path)])
+
+    def add_many(self, entries):
+        """Enregistre des `(empreinte, portée, clé, chemin)` en une transaction."""
+        now = time.time()
+        rows = [(scope, fingerprint.to_bytes(HASH_BITS // 8, 'big'), key, path, now, *_chunks(fingerprint))
+                for fingerprint, scope, key, path in entries]
+        columns = ', '.join(f'c{i}' for i in range(CHUNKS))
+        marks = ', '.join('?' * (5 + CHUNKS))
+        self.db.execute('BEGIN IMMEDIATE')
+        try:
+            self.db.executemany(
+                f'INSERT INTO fingerprints (scope, hash, key, path, added, {columns}) VALUES ({marks})', rows)
+        except BaseException:
+            self.db.execute('ROLLBACK')
+            raise
+        self.db.execute('COMMIT')
+
+    def search(self, fingerprint: int, scope: str, max_distance: int = DEFAULT_DISTANCE) -> list:
+        """Entrées de `scope` à distance <= `max_distance`, les plus proches en premier.
+
+        Chaque entrée : `{'key', 'path', 'distance'}`.
+        """
+        if not 0 <= max_distance <= MAX_DISTANCE:
+            raise ValueError(f"Distance hors limites : {max_distance} (0 à {MAX_DISTANCE})")
+        radius = max_distance // CHUNKS
+        found = {}
+        for i, value in enumerate(_chunks(fingerprint)):
+            candidates = _neighbours(value, radius)
+            marks = ', '.join('?' * len(candidates))
+            rows = self.db.execute(
+                f'SELECT id, hash, key, path FROM fingerprints WHERE c{i} IN ({marks}) AND scope = ?',
+                (*candidates, scope),
+            )
+            for row_id, stored, key, path in rows:
+                if row_id in found:
+                    continue
+                distance = hamming(fingerprint, int.from_bytes(stored, 'big'))
+                if distance <= max_distance:
+                    found[row_id] = {'key': key, 'path': path, 'distance': distance}
+        return sorted(found.values(), key=lambda entry: entry['distance'])
+
+    def nearest(self, fingerprint: int, scope: str, max_distance: int = DEFAULT_DISTANCE):
+        """Entrée la plus proche à distance <= `max_distance`, ou None."""
+        matches = self.search(fingerprint, scope, max_distance)
+        return matches[0] if matches else None
+
+    def __len__(self):
+        return self.db.execute('SELECT COUNT(*) FROM fingerprints').fetchone()[0]
+
+    def close(self):
+        self.db.close()
+
+
+# Une instance par (processus, dossier), comme le cache de résultats
+_instances = {}
+
+
+def open_index(directory: str) -> NearDuplicateIndex:
+    """Retourne l'index du processus courant pour `directory`."""
+    key = (os.getpid(), os.path.abspath(directory))
+    if key not in _instances:
+        _instances[key] = NearDuplicateIndex(directory)
+    return _instances[key]
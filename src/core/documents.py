@@ -0,0 +1,169 @@
+"""
+Documents multipages : TIFF et PDF
+- `page_count(path)` : nombre de pages (OpenCV pour TIFF, Poppler pour PDF)
+- `page_ref(path, page)` / `split_page_ref(ref)` : référence `scan.tif#page=3` d'une page
+- `output_stem(ref, base)` : nom de base des fichiers de sortie (`scan_p0003`, `lot1/scan_p0003` sous `base`)
+- `output_base(dirs)` : dossier commun, dont les sous-dossiers sont reproduits dans la sortie
+- `page_key(ref)` : identité d'une page dans les sorties (chemin absolu, numéro)
+- `load_page(path, page)` : décode une seule page
+- `iter_pages(path)` : pages une à une (générateur)
+- `expand_documents(paths)` : remplace chaque document multipage par ses pages
+
+`cv2.imread` ne lit que la première page d'un TIFF et ne lit pas les PDF.
+Un document est donc découpé en références de page, traitées comme des
+images indépendantes par le mode lot : chaque processus de travail décode
+uniquement sa page (`cv2.imreadmulti` avec début et nombre de pages,
+`pdftoppm -f N -l N`), si bien qu'un TIFF de 500 pages n'est jamais
+entièrement en mémoire et que les pages sont lues en parallèle.
+
+Les PDF nécessitent Poppler (`pdftoppm`, `pdfinfo`) dans le PATH :
+Linux `sudo apt install poppler-utils`, Windows via conda ou les binaires
+« poppler-windows ».
+"""
+
+import os
+import re
+import shutil
+import subprocess
+
+from src.core.lazy import lazy_import
+
+cv2 = lazy_import('cv2')
+np = lazy_import('numpy')
+
+# Extensions pouvant contenir plusieurs pages
+MULTIPAGE_EXTENSIONS = ('.tif', '.tiff', '.pdf')
+
+# Résolution de rastérisation des PDF (points par pouce)
+PDF_DPI = 300
+
+# Séparateur des références de page : `document.pdf#page=12`
+_PAGE_REF = re.compile(r'^(.*)#page=(\d+)$')
+
+
+def page_ref(path: str, page: int) -> str:
+    """Référence de la page `page` (numérotée à partir de 1) de `path`."""
+    return f"{path}#page={page}"
+
+
+def split_page_ref(ref: str):
+    """`'scan.tif#page=3'` -> `('scan.tif', 3)` ; un chemin simple -> `(chemin, None)`."""
+    match = _PAGE_REF.match(ref)
+    if match:
+        return match.group(1), int(match.group(2))
+    return ref, None
+
+
+def output_stem(ref: str, base=None) -> str:
+    """`'dossier/scan.pdf#page=3'` -> `'scan_p0003'` ; `'dossier/photo.png'` -> `'photo'`.
+
+    Avec `base` (dossier), le chemin relatif à `base` est gardé : `'base/a/photo.png'`
+    -> `'a/photo'`, pour que deux `photo.png` de sous-dossiers différents ne
+    s'écrasent pas dans le dossier de sortie. Hors de `base` : nom seul.
+    """
+    path, page = split_page_ref(ref)
+    name = os.path.basename(path)
+    if base:
+        try:
+            rel = os.path.relpath(os.path.abspath(path), base)
+        except ValueError:  # autre lecteur (Windows)
+            rel = None
+        if rel and rel.split(os.sep)[0] != os.pardir:
+            name = rel
+    stem = os.path.splitext(name)[0]
+    return f"{stem}_p{page:04d}" if page else stem
+
+
+def output_base(dirs):
+    """Dossier commun à `dirs` (base de `output_stem`), ou None (aucun dossier, lecteurs différents)."""
+    try:
+        return os.path.commonpath([os.path.abspath(d) for d in dirs])
+    except ValueError:
+        return None
+
+
+def page_key(ref: str, page=None):
+    """`'scan.pdf#page=3'` -> `('/.../scan.pdf', 3)` ; image simple : page 1 (ou `page` si donnée)."""
+    if page is None:
+        ref, page = split_page_ref(ref)
+    return os.path.abspath(ref), page or 1
+
+
+def is_pdf(path: str) -> bool:
+    return path.lower().endswith('.pdf')
+
+
+def _poppler(tool: str) -> str:
+    cmd = shutil.which(tool)
+    if not cmd:
+        raise RuntimeError(
+            f"'{tool}' (Poppler) introuvable : nécessaire pour lire les PDF.\n"
+            "Linux : `sudo apt install poppler-utils` ; Windows : installez Poppler et ajoutez son dossier bin au PATH."
+        )
+    return cmd
+
+
+def page_count(path: str) -> int:
+    """Nombre de pages de `path` (1 pour une image simple)."""
+    if is_pdf(path):
+        proc = subprocess.run([_poppler('pdfinfo'), path], capture_output=True, text=True, errors='replace')
+        match = re.search(r'^Pages:\s+(\d+)', proc.stdout, re.MULTILINE)
+        if proc.returncode != 0 or not match:
+            raise ValueError(f"PDF illisible : {path} ({proc.stderr.strip()})")
+        return int(match.group(1))
+    if path.lower().endswith(MULTIPAGE_EXTENSIONS):
+        # imcount parcourt les en-têtes de page sans décoder les images
+        return max(1, cv2.imcount(path))
+    return 1
+
+
+def load_page(path: str, page: int, dpi: int = PDF_DPI, gray: bool = False):
+    """Décode la page `page` (à partir de 1) de `path` au format BGR, sans lire les autres.
+
+    `gray=True` : page décodée (ou rastérisée) directement en niveaux de gris.
+    """
+    flag = cv2.IMREAD_GRAYSCALE if gray else cv2.IMREAD_COLOR
+    if is_pdf(path):
+        args = [_poppler('pdftoppm'), '-f', str(page), '-l', str(page), '-r', str(dpi),
+                '-png', '-singlefile'] + (['-gray'] if gray else []) + [path]
+        proc = subprocess.run(args, capture_output=True)
+        img = None
+        if proc.returncode == 0 and proc.stdout:
+            img = cv2.imdecode(np.frombuffer(proc.stdout, np.uint8), flag)
+        if img is None:
+            raise ValueError(f"Page {page} illisible : {path} ({proc.stderr.decode(errors='replace').strip()})")
+        return img
+
+    ok, pages = cv2.imreadmulti(path, page - 1, 1, flags=flag)
+    if not ok or not pages:
+        raise FileNotFoundError(f"Impossible de lire la page {page} : {path}")
+    return pages[0]
+
+
+def iter_pages(path: str):
+    """Produit `(numéro, image)` pour chaque page ; une seule page décodée à la fois."""
+    for page in range(1, page_count(path) + 1):
+        yield page, load_page(path, page)
+
+
+def expand_documents(paths):
+    """Remplace chaque TIFF multipage ou PDF par ses références de page, dans l'ordre.
+
+    Un document illisible est gardé tel quel (PDF : sa première page) :
+    l'erreur sera rapportée lors de son traitement, comme pour une image.
+    """
+    expanded = []
+    for path in paths:
+        if not path.lower().endswith(MULTIPAGE_EXTENSIONS) or not os.path.isfile(path):
+            expanded.append(path)
+            continue
+        try:
+            count = page_count(path)
+        except Exception:
+            expanded.append(page_ref(path, 1) if is_pdf(path) else path)
+            continue
+        if count == 1 and not is_pdf(path):
+            expanded.append(path)
+        else:
+            expanded.extend(page_ref(path, page) for page in range(1, count + 1))
+    return expanded
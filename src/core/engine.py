@@ -0,0 +1,214 @@
+"""
+Moteur Tesseract pour le mini-projet OCR
+- `configure_tesseract(path)` : exécutable choisi par la configuration
+- `resolve_tesseract_cmd()` : commande effective (configurée ou trouvée)
+- `tesseract_version()`, `tesseract_languages()` : version et langues (sonde mémorisée sur disque)
+- `recognize_many(images)` : OCR de plusieurs images en un seul appel Tesseract
+- `recognize_pipe(img)` : OCR sans fichier temporaire (PNM sur stdin, texte sur stdout)
+
+Avec `output='tsv'`, ces fonctions retournent la sortie TSV de Tesseract
+(mots, rectangles, confiances ; voir layout.py) au lieu du texte.
+
+Les appels à Tesseract acceptent un délai `timeout` (secondes) au-delà
+duquel le processus est tué ; lancés depuis un `Job` (jobs.py), ils sont
+aussi tués dès l'annulation du travail.
+
+Chaque appel à `pytesseract.image_to_string` lance un processus `tesseract` et
+recharge le modèle de langue. Pour de petites images ce coût fixe dépasse
+celui de la reconnaissance : `recognize_many` soumet un lot d'images via un
+fichier liste (une image par ligne), Tesseract ne démarre qu'une fois, puis
+le texte est redécoupé par image grâce au séparateur de page.
+
+`pytesseract` encode aussi chaque image dans un fichier temporaire que
+Tesseract relit, puis écrit le résultat dans un second fichier :
+`recognize_pipe` transmet l'image binarisée en PNM non compressé sur
+l'entrée standard et lit le texte sur la sortie standard.
+"""
+
+import os
+import shlex
+import subprocess
+import tempfile
+
+from src.core.jobs import current_job
+from src.core.layout import split_tsv_pages
+from src.core.lazy import lazy_import
+from src.core.probe import probe_tesseract
+
+cv2 = lazy_import('cv2')
+np = lazy_import('numpy')
+
+# Séparateur de page écrit par Tesseract entre les images (valeur par défaut)
+PAGE_SEPARATOR = '\f'
+
+# Transports disponibles entre le prétraitement et Tesseract
+# - 'file' : pytesseract (fichiers temporaires, comportement historique)
+# - 'pipe' : PNM sur stdin, texte sur stdout, aucun fichier écrit
+TRANSPORTS = ('file', 'pipe')
+
+# Variable d'environnement de l'exécutable configuré (héritée par les processus de travail)
+TESSERACT_ENV = 'TESSERACT_CMD'
+
+
+def configure_tesseract(path=None):
+    """Définit l'exécutable tesseract à utiliser (ignoré s'il n'existe pas).
+
+    Passé par l'environnement, le choix vaut aussi pour les processus de travail.
+    """
+    if path:
+        os.environ[TESSERACT_ENV] = path
+    else:
+        os.environ.pop(TESSERACT_ENV, None)
+
+
+def resolve_tesseract_cmd() -> str:
+    """Retourne la commande tesseract utilisable (configurée, sinon trouvée automatiquement).
+
+    La découverte est mémorisée sur disque (voir probe.py) : aucun processus
+    n'est lancé tant que l'exécutable ne change pas.
+    """
+    return probe_tesseract(os.environ.get(TESSERACT_ENV))['cmd']
+
+
+def tesseract_version() -> str:
+    """Première ligne de `tesseract --version` (ex. 'tesseract 5.3.0')."""
+    return probe_tesseract(os.environ.get(TESSERACT_ENV))['version']
+
+
+def tesseract_languages() -> list:
+    """Langues installées (`tesseract --list-langs`)."""
+    return probe_tesseract(os.environ.get(TESSERACT_ENV))['langs']
+
+
+def _run(args, input=None, timeout=None) -> subprocess.CompletedProcess:
+    """Lance Tesseract et attend sa fin ; le processus est tué au-delà de `timeout`.
+
+    Dans un `Job`, le délai restant du travail s'applique aussi et
+    l'annulation du travail tue le processus (JobCancelled / JobTimeout).
+    """
+    job = current_job()
+    if job is not None:
+        job.check()
+        remaining = job.remaining()
+        if remaining is not None:
+            timeout = remaining if timeout is None else min(timeout, remaining)
+
+    proc = subprocess.Popen(
+        args, stdin=subprocess.PIPE if input is not None else subprocess.DEVNULL,
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+    )
+    if job is not None:
+        job.attach(proc)
+    try:
+        out, err = proc.communicate(input, timeout=timeout)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+        proc.communicate()
+        if job is not None:
+            job.check()
+        raise TimeoutError(f"Tesseract interrompu après {timeout:g} s")
+    finally:
+        if job is not None:
+            job.detach(proc)
+
+    if job is not None:
+        # Processus tué par une annulation : l'erreur de Tesseract n'a pas d'intérêt
+        job.check()
+    return subprocess.CompletedProcess(args, proc.returncode, out, err)
+
+
+def split_pages(output: str, count: int):
+    """Redécoupe la sortie texte de Tesseract en `count` textes.
+
+    Selon la version, Tesseract écrit le séparateur après chaque page
+    (4.0) ou seulement entre les pages (4.1+) : les deux cas sont gérés.
+    """
+    parts = output.split(PAGE_SEPARATOR)
+    if len(parts) == count + 1 and not parts[-1].strip():
+        parts = parts[:-1]
+    if len(parts) != count:
+        raise RuntimeError(
+            f"Sortie Tesseract inattendue : {len(parts)} page(s) pour {count} image(s)"
+        )
+    return parts
+
+
+def recognize_many(images, lang=None, config='', timeout=None, output='txt') -> list:
+    """Extrait le texte de plusieurs images prétraitées en un seul appel Tesseract.
+
+    `images` : liste de tableaux NumPy (sortie de `preprocess_image`) ;
+    `timeout` : délai maximal de l'appel groupé, en secondes ;
+    `output` : 'txt' (texte) ou 'tsv' (sortie structurée, voir layout.py).
+    Retourne une liste de sorties, dans le même ordre que `images`.
+    """
+    images = list(images)
+    if not images:
+        return []
+
+    cmd = resolve_tesseract_cmd()
+    with tempfile.TemporaryDirectory(prefix='ocr_') as tmp:
+        # Une image par fichier, puis le fichier liste lu par Tesseract
+        names = []
+        for i, img in enumerate(images):
+            name = os.path.join(tmp, f'image_{i:05d}.png')
+            if not cv2.imwrite(name, img):
+                raise RuntimeError(f"Impossible d'écrire l'image temporaire {name}")
+            names.append(name)
+
+        list_file = os.path.join(tmp, 'images.txt')
+        with open(list_file, 'w', encoding='utf-8') as f:
+            f.write('\n'.join(names) + '\n')
+
+        out_base = os.path.join(tmp, 'resultat')
+        args = [cmd, list_file, out_base]
+        if lang:
+            args += ['-l', lang]
+        args += shlex.split(config) + [output]
+
+        proc = _run(args, timeout=timeout)
+        if proc.returncode != 0:
+            raise RuntimeError(
+                f"Erreur Tesseract ({proc.returncode}) : {proc.stderr.decode('utf-8', 'replace').strip()}"
+            )
+
+        with open(f'{out_base}.{output}', encoding='utf-8') as f:
+            result = f.read()
+
+    if output == 'tsv':
+        return split_tsv_pages(result, len(images))
+    return split_pages(result, len(images))
+
+
+def encode_pnm(img) -> bytes:
+    """Encode une image 8 bits en PNM brut, sans compression.
+
+    Une image binaire (0/255, sortie d'Otsu) devient un PBM de 1 bit par
+    pixel ; sinon un PGM de 8 bits par pixel.
+    """
+    if img.ndim == 3:
+        img = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+    h, w = img.shape
+
+    if cv2.countNonZero(cv2.inRange(img, 1, 254)) == 0:
+        # PBM : 1 = noir, lignes complétées à l'octet
+        bits = np.packbits(img == 0, axis=1)
+        return b'P4\n%d %d\n' % (w, h) + bits.tobytes()
+
+    return b'P5\n%d %d\n255\n' % (w, h) + np.ascontiguousarray(img).tobytes()
+
+
+def recognize_pipe(img, lang=None, config='', timeout=None, output='txt') -> str:
+    """Extrait le texte (ou la sortie TSV) d'une image prétraitée sans passer par le disque."""
+    args = [resolve_tesseract_cmd(), 'stdin', 'stdout']
+    if lang:
+        args += ['-l', lang]
+    args += shlex.split(config)
+    if output != 'txt':
+        args.append(output)
+
+    proc = _run(args, input=encode_pnm(img), timeout=timeout)
+    if proc.returncode != 0:
+        raise RuntimeError(
+            f"Erreur Tesseract ({proc.returncode}) : {proc.stderr.decode('utf-8', 'replace').strip()}"
+        )
+    return proc.stdout.decode('utf-8')
@@ -0,0 +1,146 @@
+"""
+Exports d'un résultat OCR structuré (layout.py)
+- `to_text(layout)` : texte brut
+- `to_hocr(layout, source)` : hOCR 1.2 (XHTML), lisible par hocr-tools, OCRmyPDF...
+- `to_alto(layout, source)` : ALTO XML v4 (bibliothèques numériques)
+- `to_json(layout)` : colonnes du `Layout` en JSON (rechargeable par `Layout.from_json`)
+- `export(layout, fmt, source)` : export au format `fmt` ; `FORMATS` : formats et suffixes de fichier
+
+Tous les exports partent du même `Layout` : une seule reconnaissance,
+quel que soit le nombre de formats écrits.
+"""
+
+import os
+from xml.sax.saxutils import escape, quoteattr
+
+# Format -> suffixe du fichier de sortie (`<nom><suffixe>`)
+FORMATS = {
+    'txt': '_ocr.txt',
+    'hocr': '_ocr.hocr',
+    'alto': '_ocr.alto.xml',
+    'json': '_ocr.json',
+}
+
+
+def _bbox(box) -> str:
+    """Rectangle hOCR : `bbox x0 y0 x1 y1`."""
+    x, y, w, h = (int(v) for v in box)
+    return f"bbox {x} {y} {x + w} {y + h}"
+
+
+def _union(boxes):
+    """Rectangle englobant (x, y, l, h) d'un tableau (N, 4)."""
+    x0, y0 = boxes[:, 0].min(), boxes[:, 1].min()
+    x1, y1 = (boxes[:, 0] + boxes[:, 2]).max(), (boxes[:, 1] + boxes[:, 3]).max()
+    return x0, y0, x1 - x0, y1 - y0
+
+
+def _structure(layout):
+    """Blocs -> paragraphes -> lignes non vides : [(bloc, [(paragraphe, [ligne, ...]), ...]), ...]."""
+    blocks = []
+    for line in range(len(layout.line_boxes)):
+        if not len(layout.line_words(line)):
+            continue
+        block, par = int(layout.line_block[line]), int(layout.line_par[line])
+        if not blocks or blocks[-1][0] != block:
+            blocks.append((block, []))
+        pars = blocks[-1][1]
+        if not pars or pars[-1][0] != par:
+            pars.append((par, []))
+        pars[-1][1].append(line)
+    return blocks
+
+
+def to_text(layout, source: str = '') -> str:
+    return layout.text()
+
+
+def to_json(layout, source: str = '') -> str:
+    return layout.to_json()
+
+
+def to_hocr(layout, source: str = '') -> str:
+    """Document hOCR d'une page."""
+    width, height = layout.size
+    page_title = quoteattr(f'image "{source}"; bbox 0 0 {width} {height}')
+    out = [
+        '<?xml version="1.0" encoding="UTF-8"?>',
+        '<!DOCTYPE html PUBLIC "-//W3C//DTD XHTML 1.0 Transitional//EN"'
+        ' "http://www.w3.org/TR/xhtml1/DTD/xhtml1-transitional.dtd">',
+        '<html xmlns="http://www.w3.org/1999/xhtml" xml:lang="fr" lang="fr">',
+        ' <head>',
+        f'  <title>{escape(os.path.basename(source))}</title>',
+        '  <meta http-equiv="Content-Type" content="text/html;charset=utf-8"/>',
+        '  <meta name="ocr-system" content="OCR-CV-Mini-Projet"/>',
+        '  <meta name="ocr-capabilities" content="ocr_page ocr_carea ocr_par ocr_line ocrx_word ocrp_wconf"/>',
+        ' </head>',
+        ' <body>',
+        f'  <div class="ocr_page" id="page_1" title={page_title}>',
+    ]
+    for block, pars in _structure(layout):
+        out.append(f'   <div class="ocr_carea" id="block_{block + 1}" title="{_bbox(layout.block_boxes[block])}">')
+        for par, lines in pars:
+            par_box = _union(layout.line_boxes[lines])
+            out.append(f'    <p class="ocr_par" id="par_{par + 1}" title="{_bbox(par_box)}">')
+            for line in lines:
+                out.append(f'     <span class="ocr_line" id="line_{line + 1}" title="{_bbox(layout.line_boxes[line])}">')
+                for i in layout.line_words(line):
+                    title = f"{_bbox(layout.boxes[i])}; x_wconf {int(round(float(layout.conf[i])))}"
+                    out.append(f'      <span class="ocrx_word" id="word_{i + 1}" title="{title}">'
+                               f'{escape(layout.words[i])}</span>')
+                out.append('     </span>')
+            out.append('    </p>')
+        out.append('   </div>')
+    out += ['  </div>', ' </body>', '</html>', '']
+    return '\n'.join(out)
+
+
+def _alto_pos(box) -> str:
+    x, y, w, h = (int(v) for v in box)
+    return f'HPOS="{x}" VPOS="{y}" WIDTH="{w}" HEIGHT="{h}"'
+
+
+def to_alto(layout, source: str = '') -> str:
+    """Document ALTO v4 d'une page (coordonnées en pixels, WC : confiance 0-1)."""
+    width, height = layout.size
+    out = [
+        '<?xml version="1.0" encoding="UTF-8"?>',
+        '<alto xmlns="http://www.loc.gov/standards/alto/ns-v4#"'
+        ' xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance"'
+        ' xsi:schemaLocation="http://www.loc.gov/standards/alto/ns-v4# http://www.loc.gov/alto/v4/alto-4-2.xsd">',
+        ' <Description>',
+        '  <MeasurementUnit>pixel</MeasurementUnit>',
+        '  <sourceImageInformation>',
+        f'   <fileName>{escape(source)}</fileName>',
+        '  </sourceImageInformation>',
+        ' </Description>',
+        ' <Layout>',
+        f'  <Page ID="page_1" PHYSICAL_IMG_NR="1" WIDTH="{width}" HEIGHT="{height}">',
+        f'   <PrintSpace HPOS="0" VPOS="0" WIDTH="{width}" HEIGHT="{height}">',
+    ]
+    for block, pars in _structure(layout):
+        out.append(f'    <TextBlock ID="block_{block + 1}" {_alto_pos(layout.block_boxes[block])}>')
+        for _, lines in pars:
+            for line in lines:
+                out.append(f'     <TextLine ID="line_{line + 1}" {_alto_pos(layout.line_boxes[line])}>')
+                words = layout.line_words(line)
+                for n, i in enumerate(words):
+                    if n:
+                        out.append('      <SP/>')
+                    wc = max(0.0, float(layout.conf[i])) / 100
+                    out.append(f'      <String ID="word_{i + 1}" CONTENT={quoteattr(layout.words[i])} '
+                               f'{_alto_pos(layout.boxes[i])} WC="{wc:.2f}"/>')
+                out.append('     </TextLine>')
+        out.append('    </TextBlock>')
+    out += ['   </PrintSpace>', '  </Page>', ' </Layout>', '</alto>', '']
+    return '\n'.join(out)
+
+
+_EXPORTERS = {'txt': to_text, 'hocr': to_hocr, 'alto': to_alto, 'json': to_json}
+
+
+def export(layout, fmt: str, source: str = '') -> str:
+    """Contenu du fichier `fmt` ('txt', 'hocr', 'alto', 'json') pour `layout`."""
+    if fmt not in _EXPORTERS:
+        raise ValueError(f"Format inconnu : {fmt} (choix : {', '.join(FORMATS)})")
+    return _EXPORTERS[fmt](layout, source)
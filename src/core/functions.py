@@ -1,41 +1,69 @@
 """
 Fonctions utilitaires pour le mini-projet OCR
-- `load_image(path)` : lit une image avec OpenCV
-- `preprocess_image(img)` : conversion en niveaux de gris + seuillage
+- `load_image(path, reduce, gray)` : lit une image avec OpenCV (éventuellement à 1/2, 1/4, 1/8,
+  ou directement en niveaux de gris)
+- `decode_image(data, reduce, gray)` : idem depuis le contenu encodé (octets PNG, JPEG...)
+- `preprocess_image(img, pipeline)` : conversion en niveaux de gris + seuillage
+  (ou tout pipeline configurable, voir pipeline.py)
 
 Les commentaires expliquent brièvement chaque étape.
 """
 
-import cv2
+from src.core.lazy import lazy_import
+from src.core.pipeline import get_pipeline
+from src.core.resolution import REDUCED_COLOR, REDUCED_GRAYSCALE
 
+cv2 = lazy_import('cv2')
+np = lazy_import('numpy')
 
-def load_image(path: str):
+
+def _imread_flag(reduce: int, gray: bool) -> int:
+    """Drapeau de décodage OpenCV (valeurs de cv2.IMREAD_* : OpenCV n'est pas chargé ici)."""
+    if reduce > 1:
+        return (REDUCED_GRAYSCALE if gray else REDUCED_COLOR)[reduce]
+    return 0 if gray else 1  # IMREAD_GRAYSCALE / IMREAD_COLOR
+
+
+def load_image(path: str, reduce: int = 1, gray: bool = False):
     """Lit une image depuis `path` et vérifie qu'elle existe.
 
-    Retourne l'image au format BGR (OpenCV).
+    `reduce` (2, 4 ou 8) décode directement à taille réduite : pour un JPEG,
+    la réduction a lieu pendant le décodage, bien plus vite qu'un resize.
+    `gray=True` décode directement en niveaux de gris (un octet par pixel au
+    lieu de trois) : à utiliser quand le prétraitement commence par `gray`.
+
+    Retourne l'image au format BGR (OpenCV), ou en niveaux de gris.
     """
-    img = cv2.imread(path)
+    img = cv2.imread(path, _imread_flag(reduce, gray))
     if img is None:
         raise FileNotFoundError(f"Impossible de lire l'image: {path}")
     return img
 
 
-def preprocess_image(img):
-    """Applique un prétraitement simple pour améliorer l'OCR:
+def decode_image(data: bytes, reduce: int = 1, gray: bool = False):
+    """Décode une image depuis son contenu encodé (PNG, JPEG...) en mémoire.
+
+    Retourne l'image au format BGR (OpenCV) ou en niveaux de gris, comme `load_image`.
+    """
+    buf = np.frombuffer(data, dtype=np.uint8)
+    img = cv2.imdecode(buf, _imread_flag(reduce, gray))
+    if img is None:
+        raise ValueError("Contenu d'image invalide ou format non supporté")
+    return img
+
+
+def preprocess_image(img, pipeline=None, timings=None):
+    """Applique un prétraitement pour améliorer l'OCR.
 
+    Par défaut, le prétraitement simple historique :
     1. Conversion en niveaux de gris
-    2. (Optionnel) Flou gaussien pour réduire le bruit
+    2. Flou gaussien 5x5 pour réduire le bruit
     3. Binarisation (seuillage) avec Otsu pour obtenir une image binaire
 
+    `pipeline` remplace ces étapes par une description comme
+    `"gray | denoise h=10 | sauvola window=31"` (voir pipeline.py).
+    `timings` : liste qui reçoit `(étape, secondes)` pour chaque étape.
+
     Retourne l'image seuillée (noir/blanc) adaptée à `pytesseract`.
     """
-    # Conversion en niveaux de gris
-    gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-
-    # Réduction du bruit (aide parfois pour l'OCR)
-    blurred = cv2.GaussianBlur(gray, (5, 5), 0)
-
-    # Binarisation avec Otsu (détermine automatiquement le meilleur seuil)
-    _, thresh = cv2.threshold(blurred, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
-
-    return thresh
+    return get_pipeline(pipeline).run(img, timings)
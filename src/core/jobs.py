@@ -0,0 +1,136 @@
+"""
+Travaux OCR annulables avec délai maximal
+- `Job(fn, *args, timeout=..., **kwargs)` : travail exécuté dans un fil, annulable
+- `current_job()` : travail du fil courant (engine.py y rattache ses processus Tesseract)
+- `JobCancelled`, `JobTimeout` : exceptions levées dans le fil du travail
+
+Annuler un travail, ou dépasser son délai, tue immédiatement le processus
+Tesseract en cours : le fil de travail se termine aussitôt au lieu de
+rester bloqué sur une page pathologique. L'appelant (boucle Tkinter,
+service...) interroge `job.done` / `job.state` sans jamais attendre.
+"""
+
+import threading
+import time
+
+_local = threading.local()
+
+
+class JobCancelled(Exception):
+    """Le travail a été annulé."""
+
+
+class JobTimeout(Exception):
+    """Le travail a dépassé son délai."""
+
+
+def current_job():
+    """Travail exécuté par le fil courant, ou None."""
+    return getattr(_local, 'job', None)
+
+
+class Job:
+    """Appel de `fn(*args, **kwargs)` dans un fil, avec annulation et délai.
+
+    États : 'pending', 'running', puis 'done', 'failed', 'cancelled' ou 'timeout'.
+    """
+
+    def __init__(self, fn, *args, timeout=None, **kwargs):
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.timeout = timeout or None
+        self.state = 'pending'
+        self.result = None
+        self.error = None
+        self.started = None
+        self.finished = None
+        self._deadline = None
+        self._procs = set()
+        self._lock = threading.Lock()
+
+    def start(self):
+        """Lance le travail dans un fil démon et retourne le travail."""
+        threading.Thread(target=self.run, daemon=True).start()
+        return self
+
+    def run(self):
+        """Exécute le travail dans le fil courant (normalement via `start`)."""
+        self.started = time.monotonic()
+        if self.timeout:
+            self._deadline = self.started + self.timeout
+        self.state = 'running'
+        _local.job = self
+        try:
+            result = self.fn(*self.args, **self.kwargs)
+            with self._lock:
+                if self.state == 'running':
+                    self.state, self.result = 'done', result
+        except Exception as e:
+            with self._lock:
+                if self.state == 'running':
+                    self.state, self.error = 'failed', e
+        finally:
+            _local.job = None
+            self.finished = time.monotonic()
+
+    @property
+    def done(self) -> bool:
+        return self.state not in ('pending', 'running')
+
+    @property
+    def elapsed(self) -> float:
+        if self.started is None:
+            return 0.0
+        return (self.finished or time.monotonic()) - self.started
+
+    def remaining(self):
+        """Secondes restantes avant le délai (None : pas de délai)."""
+        if self._deadline is None:
+            return None
+        return max(0.0, self._deadline - time.monotonic())
+
+    def expired(self) -> bool:
+        return self._deadline is not None and time.monotonic() >= self._deadline
+
+    def check(self):
+        """Lève `JobCancelled` / `JobTimeout` si le travail doit s'arrêter."""
+        if self.state == 'running' and self.expired():
+            self.cancel('timeout')
+        if self.state == 'cancelled':
+            raise JobCancelled("Travail annulé")
+        if self.state == 'timeout':
+            raise JobTimeout(f"Délai de {self.timeout:g} s dépassé")
+
+    def cancel(self, reason: str = 'cancelled') -> bool:
+        """Annule le travail (`reason` : 'cancelled' ou 'timeout') et tue ses processus.
+
+        Retourne False si le travail était déjà terminé.
+        """
+        with self._lock:
+            if self.done:
+                return False
+            self.state = reason
+            procs = list(self._procs)
+        for proc in procs:
+            _kill(proc)
+        return True
+
+    def attach(self, proc):
+        """Rattache un processus au travail (tué immédiatement si déjà annulé)."""
+        with self._lock:
+            self._procs.add(proc)
+            stopped = self.done
+        if stopped:
+            _kill(proc)
+
+    def detach(self, proc):
+        with self._lock:
+            self._procs.discard(proc)
+
+
+def _kill(proc):
+    try:
+        proc.kill()
+    except OSError:
+        pass
@@ -0,0 +1,244 @@
+"""
+Résultat OCR structuré : blocs, lignes et mots avec rectangles et confiances
+- `Layout` : résultat d'une reconnaissance, stocké en tableaux NumPy
+- `parse_tsv(tsv)` : construit un `Layout` depuis la sortie TSV de Tesseract
+- `split_tsv_pages(tsv, count)` : découpe la sortie TSV d'un appel groupé, une par image
+- `Layout.line_confidence()`, `Layout.replace_lines()` : confiance par ligne et fusion
+  de lignes relues (voir refine.py)
+
+Une seule passe de Tesseract (sortie `tsv`) donne le texte, les rectangles
+et les confiances ; texte brut, hOCR, ALTO et JSON (voir export.py) sont
+tous construits depuis ce résultat. Les mots sont rangés en colonnes (un
+tableau par attribut) plutôt qu'en un dict par mot : une page de 500 mots
+tient en quelques kilo-octets et les filtres (confiance, zone) sont
+vectorisés.
+
+Colonnes d'un `Layout` (N mots, M lignes, K blocs) :
+- `words` : liste des N textes ; `boxes` : int32 (N, 4) x, y, largeur, hauteur ;
+  `conf` : float32 (N,) confiance 0-100 ; `word_line` : int32 (N,) ligne du mot
+- `line_boxes` : int32 (M, 4) ; `line_par`, `line_block` : int32 (M,) paragraphe et bloc de la ligne
+- `block_boxes` : int32 (K, 4) ; `size` : (largeur, hauteur) de l'image
+"""
+
+import json
+
+from src.core.lazy import lazy_import
+
+np = lazy_import('numpy')
+
+# Colonnes de la sortie TSV de Tesseract
+_LEVEL, _PAGE, _LEFT, _TEXT = 0, 1, 6, 11
+
+# Niveaux des lignes TSV
+_BLOCK, _PAR, _LINE, _WORD = 2, 3, 4, 5
+
+
+def _boxes(rows):
+    return np.array(rows, dtype=np.int32).reshape(-1, 4)
+
+
+class Layout:
+    """Mots, lignes et blocs d'une image reconnue (voir le docstring du module)."""
+
+    def __init__(self, size, words, boxes, conf, word_line, line_boxes, line_par, line_block, block_boxes):
+        self.size = (int(size[0]), int(size[1]))
+        self.words = list(words)
+        self.boxes = _boxes(boxes)
+        self.conf = np.asarray(conf, dtype=np.float32)
+        self.word_line = np.asarray(word_line, dtype=np.int32)
+        self.line_boxes = _boxes(line_boxes)
+        self.line_par = np.asarray(line_par, dtype=np.int32)
+        self.line_block = np.asarray(line_block, dtype=np.int32)
+        self.block_boxes = _boxes(block_boxes)
+
+    @classmethod
+    def empty(cls, size):
+        """Résultat sans texte (page blanche)."""
+        return cls(size, [], [], [], [], [], [], [], [])
+
+    def __len__(self):
+        return len(self.words)
+
+    # ------------------------------------------------------------------
+    # Texte
+    # ------------------------------------------------------------------
+
+    def spans(self):
+        """(texte brut, int32 (N, 2) début et fin de chaque mot dans ce texte).
+
+        Mots d'une ligne séparés par une espace, lignes par un saut de ligne,
+        paragraphes par une ligne vide (comme la sortie texte de Tesseract).
+        """
+        spans = np.zeros((len(self.words), 2), dtype=np.int32)
+        parts = []
+        pos = 0
+        previous = None
+        for i, word in enumerate(self.words):
+            line = self.word_line[i]
+            if previous is not None:
+                if line == previous:
+                    sep = ' '
+                elif self.line_par[line] != self.line_par[previous]:
+                    sep = '\n\n'
+                else:
+                    sep = '\n'
+                parts.append(sep)
+                pos += len(sep)
+            parts.append(word)
+            spans[i] = (pos, pos + len(word))
+            pos += len(word)
+            previous = line
+        return (''.join(parts) + '\n' if parts else ''), spans
+
+    def text(self) -> str:
+        return self.spans()[0]
+
+    def low_confidence(self, threshold: float = 60):
+        """Indices des mots dont la confiance est inférieure à `threshold`."""
+        return np.flatnonzero(self.conf < threshold)
+
+    def mean_confidence(self) -> float:
+        """Confiance moyenne des mots (100 pour une page sans mot)."""
+        return float(self.conf.mean()) if len(self.conf) else 100.0
+
+    def line_words(self, line: int):
+        """Indices des mots de la ligne `line` (les mots sont rangés par ligne)."""
+        start, end = np.searchsorted(self.word_line, [line, line + 1])
+        return range(start, end)
+
+    def line_confidence(self):
+        """float (M,) : confiance moyenne des mots de chaque ligne (100 pour une ligne sans mot)."""
+        count = np.bincount(self.word_line, minlength=len(self.line_boxes))
+        total = np.bincount(self.word_line, weights=self.conf, minlength=len(self.line_boxes))
+        return np.divide(total, count, out=np.full(len(count), 100.0), where=count > 0)
+
+    def replace_lines(self, replacements: dict):
+        """Copie où les mots de chaque ligne de `replacements` ({ligne: Layout}) sont
+        remplacés par tous les mots du `Layout` associé (mêmes coordonnées que `self`)."""
+        words, boxes, conf, word_line = [], [], [], []
+        for line in range(len(self.line_boxes)):
+            source = replacements.get(line, self)
+            indices = range(len(source)) if line in replacements else self.line_words(line)
+            for i in indices:
+                words.append(source.words[i])
+                boxes.append(source.boxes[i])
+                conf.append(source.conf[i])
+                word_line.append(line)
+        return Layout(self.size, words, boxes, conf, word_line,
+                      self.line_boxes, self.line_par, self.line_block, self.block_boxes)
+
+    # ------------------------------------------------------------------
+    # Coordonnées
+    # ------------------------------------------------------------------
+
+    def transform(self, sx: float = 1.0, sy: float = 1.0, dx: int = 0, dy: int = 0, size=None):
+        """Copie dont les rectangles sont décalés de (dx, dy) puis mis à l'échelle (sx, sy)."""
+        def apply(boxes):
+            out = boxes.astype(np.float64)
+            out[:, 0] = (out[:, 0] + dx) * sx
+            out[:, 1] = (out[:, 1] + dy) * sy
+            out[:, 2] *= sx
+            out[:, 3] *= sy
+            return np.rint(out).astype(np.int32)
+
+        return Layout(
+            size or self.size, self.words, apply(self.boxes), self.conf, self.word_line,
+            apply(self.line_boxes), self.line_par, self.line_block, apply(self.block_boxes),
+        )
+
+    def to_source(self, processed_shape, image_shape, factor: int = 1, offset=(0, 0)):
+        """Ramène les rectangles à l'image d'origine.
+
+        `processed_shape` : forme de l'image prétraitée avant recadrage ;
+        `image_shape` : forme de l'image décodée ; `factor` : facteur de
+        décodage réduit (resolution.py) ; `offset` : origine du recadrage (regions.py).
+        """
+        width, height = image_shape[1] * factor, image_shape[0] * factor
+        sx = width / processed_shape[1]
+        sy = height / processed_shape[0]
+        return self.transform(sx, sy, offset[0], offset[1], size=(width, height))
+
+    # ------------------------------------------------------------------
+    # Sérialisation (cache, export JSON)
+    # ------------------------------------------------------------------
+
+    def to_dict(self) -> dict:
+        """Colonnes sérialisables en JSON (rectangles aplatis : x, y, l, h, x, y, ...)."""
+        return {
+            'size': list(self.size),
+            'words': self.words,
+            'boxes': self.boxes.ravel().tolist(),
+            'conf': [round(c, 2) for c in self.conf.tolist()],
+            'word_line': self.word_line.tolist(),
+            'line_boxes': self.line_boxes.ravel().tolist(),
+            'line_par': self.line_par.tolist(),
+            'line_block': self.line_block.tolist(),
+            'block_boxes': self.block_boxes.ravel().tolist(),
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict):
+        return cls(
+            data['size'], data['words'], data['boxes'], data['conf'], data['word_line'],
+            data['line_boxes'], data['line_par'], data['line_block'], data['block_boxes'],
+        )
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_dict(), ensure_ascii=False, separators=(',', ':'))
+
+    @classmethod
+    def from_json(cls, text: str):
+        return cls.from_dict(json.loads(text))
+
+
+def parse_tsv(tsv: str, size=None) -> Layout:
+    """Construit un `Layout` depuis la sortie TSV de Tesseract (une image).
+
+    `size` : (largeur, hauteur) de l'image ; par défaut, celle de la ligne de page.
+    """
+    words, boxes, conf, word_line = [], [], [], []
+    line_boxes, line_par, line_block, block_boxes = [], [], [], []
+    par = -1
+    page_size = size
+
+    for row in tsv.splitlines():
+        cols = row.split('\t')
+        if len(cols) < _TEXT or not cols[_LEVEL].isdigit():
+            continue  # en-tête ou ligne vide
+        level = int(cols[_LEVEL])
+        box = [int(v) for v in cols[_LEFT:_LEFT + 4]]
+        if level == 1:
+            if page_size is None:
+                page_size = (box[2], box[3])
+        elif level == _BLOCK:
+            block_boxes.append(box)
+        elif level == _PAR:
+            par += 1
+        elif level == _LINE:
+            line_boxes.append(box)
+            line_par.append(par)
+            line_block.append(len(block_boxes) - 1)
+        elif level == _WORD:
+            text = cols[_TEXT].strip() if len(cols) > _TEXT else ''
+            if not text:
+                continue
+            words.append(text)
+            boxes.append(box)
+            conf.append(float(cols[_TEXT - 1]))
+            word_line.append(len(line_boxes) - 1)
+
+    return Layout(page_size or (0, 0), words, boxes, conf, word_line,
+                  line_boxes, line_par, line_block, block_boxes)
+
+
+def split_tsv_pages(tsv: str, count: int) -> list:
+    """Découpe la sortie TSV d'un appel groupé en `count` sorties, une par image (colonne page_num)."""
+    pages = [[] for _ in range(count)]
+    for row in tsv.splitlines():
+        cols = row.split('\t', 2)
+        if len(cols) < 2 or not cols[_PAGE].isdigit():
+            continue
+        page = int(cols[_PAGE]) - 1
+        if 0 <= page < count:
+            pages[page].append(row)
+    return ['\n'.join(rows) for rows in pages]
@@ -0,0 +1,43 @@
+"""
+Imports différés des bibliothèques lourdes
+- `lazy_import(name)` : module chargé au premier accès à l'un de ses attributs
+
+OpenCV, NumPy et pytesseract coûtent chacun 150 à 200 ms à importer. Les
+modules de `src/core` les déclarent avec `lazy_import` : importer `main`
+ou ouvrir la fenêtre de la GUI ne les charge pas, et `--help`, une erreur
+d'arguments ou l'affichage de la fenêtre sont immédiats. Le premier appel
+à `cv2.imread` (par exemple) paie l'import, une seule fois par processus.
+"""
+
+import importlib
+import sys
+import threading
+import types
+
+_lock = threading.Lock()
+
+
+class _LazyModule(types.ModuleType):
+    """Remplaçant d'un module, qui l'importe au premier attribut demandé."""
+
+    def __getattr__(self, attr):
+        module = sys.modules.get(self.__name__)
+        if module is None:
+            # Verrou : deux fils peuvent toucher le module en même temps (tuiles, GUI)
+            with _lock:
+                module = importlib.import_module(self.__name__)
+        return getattr(module, attr)
+
+    def __dir__(self):
+        return dir(importlib.import_module(self.__name__))
+
+
+def lazy_import(name: str):
+    """Module `name`, importé seulement au premier accès à l'un de ses attributs.
+
+    Si le module est déjà importé, il est retourné tel quel.
+    """
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    return _LazyModule(name)
@@ -0,0 +1,92 @@
+"""
+Résultats déjà connus avant l'OCR : cache disque et quasi-doublons
+- `read_params(pipeline, ...)` : paramètres de lecture inclus dans la clé de cache
+- `decode(stored, structured)` : texte (et `Layout`) d'un résultat stocké
+- `ResultLookup` : clé d'une image, résultat en cache, image proche déjà lue, enregistrement
+
+Partagé par `extract_text_from_image` (main.py) et `ocr_group` (batch.py) :
+une image lue seule ou dans un groupe a la même clé, le résultat de l'un
+est retrouvé par l'autre.
+"""
+
+from src.core.cache import open_cache, result_key
+from src.core.dedup import near_dup_scope, open_index, phash
+from src.core.layout import Layout
+
+
+def read_params(pipeline, tile_height=0, regions=False, structured=False, refine=0) -> str:
+    """Paramètres de lecture d'une clé de cache (hors page) : prétraitement et options qui changent le résultat."""
+    return pipeline.spec + (f" || tiles={tile_height}" if tile_height else "") \
+        + (" || regions" if regions else "") + (" || layout" if structured else "") \
+        + (f" || refine={refine}" if refine else "")
+
+
+def decode(stored: str, structured=False):
+    """`(texte, Layout ou None)` d'un résultat stocké (JSON d'un `Layout` en mode structuré)."""
+    if structured and stored:
+        found = Layout.from_json(stored)
+        return found.text(), found
+    return stored, None
+
+
+class ResultLookup:
+    """Cache de résultats (et index des quasi-doublons) d'une série d'images lues avec les mêmes paramètres.
+
+    `params` : voir `read_params` ; `version` : version du moteur (`OCRBackend.version()`).
+    Avec `near_dup` (distance de Hamming), une image proche d'une image
+    déjà lue est reconnue : `near_dup_action='reuse'` reprend son résultat,
+    `'flag'` la signale avec un texte vide.
+    """
+
+    def __init__(self, cache_dir: str, cache_max_bytes: int, params: str, lang, version: str,
+                 near_dup=None, near_dup_action='flag'):
+        self.cache = open_cache(cache_dir, cache_max_bytes)
+        self.params = params
+        self.lang = lang
+        self.version = version
+        self.near_dup = near_dup
+        self.reuse = near_dup_action == 'reuse'
+        self.index = self.scope = None
+        if near_dup is not None:
+            self.index = open_index(cache_dir)
+            self.scope = near_dup_scope(params, lang, version)
+
+    def key(self, source, page=None) -> str:
+        """Clé de cache de `source` (chemin ou octets), ou de sa page `page`."""
+        return result_key(source, self.params + (f" || page={page}" if page else ""), self.lang, self.version)
+
+    def get(self, key: str):
+        """Résultat stocké sous `key`, ou None."""
+        return self.cache.get(key)
+
+    def fingerprint(self, processed):
+        """Empreinte de l'image prétraitée, ou None sans recherche de quasi-doublons."""
+        return phash(processed) if self.index is not None else None
+
+    def near_duplicate(self, fingerprint):
+        """`(entrée, résultat stocké)` de l'image déjà lue la plus proche, ou None.
+
+        Résultat vide si l'image est seulement signalée (`'flag'`) ; None
+        aussi si le résultat de l'image proche a quitté le cache.
+        """
+        if fingerprint is None:
+            return None
+        match = self.index.nearest(fingerprint, self.scope, self.near_dup)
+        if match is None:
+            return None
+        stored = self.cache.get(match['key']) if self.reuse else ''
+        return (match, stored) if stored is not None else None
+
+    def put(self, key: str, result, fingerprint=None, path=None):
+        """Enregistre `result` (texte ou `Layout`) et l'empreinte éventuelle de son image."""
+        self.put_many([(key, result, fingerprint, path)])
+
+    def put_many(self, entries):
+        """Enregistre des `(clé, résultat, empreinte, chemin)` ; empreintes ajoutées en une transaction."""
+        fingerprints = []
+        for key, result, fingerprint, path in entries:
+            self.cache.put(key, result.to_json() if isinstance(result, Layout) else result)
+            if fingerprint is not None:
+                fingerprints.append((fingerprint, self.scope, key, path))
+        if fingerprints:
+            self.index.add_many(fingerprints)
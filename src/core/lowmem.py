@@ -0,0 +1,389 @@
+"""
+Très grandes images à mémoire bornée (plans, scans A0)
+- `parse_size(text)` : '512M', '2G' -> octets
+- `available_memory()` : mémoire disponible du système (octets, ou None)
+- `workers_for_memory(workers, limit)` : processus qui tiennent dans la mémoire disponible
+- `image_info(path, page)` : largeur, hauteur, canaux lus dans l'en-tête, sans décoder
+- `estimate_peak(info, gray)` : mémoire de pointe du chemin habituel (décodage + prétraitement)
+- `open_bands(path, page)` : source lisible par bandes (TIFF non compressé, PGM/PPM/PBM) projetée en mémoire
+- `band_halo(pipeline)` : lignes de recouvrement nécessaires entre bandes (None si impossible)
+- `low_memory_source(path, page, pipeline, limit)` : source par bandes si l'image dépasse le plafond
+  (pipelines commençant par `gray` : les bandes sont lues en niveaux de gris)
+- `preprocess_bands(source, pipeline)` : prétraitement bande par bande dans un seul tampon de sortie
+
+Décodée en BGR, une page de 20 000 × 14 000 px occupe 840 Mo, plus deux
+tampons de prétraitement de 280 Mo (pipeline.py) : 16 processus n'y
+survivent pas. Ici, les pixels d'un TIFF non compressé ou d'un PNM restent
+dans le fichier (np.memmap, pages du cache système que le noyau peut
+libérer) ; le prétraitement parcourt des bandes horizontales, chacune
+élargie de `band_halo` lignes pour que flous et seuillages locaux voient
+les mêmes voisins que sur l'image entière, et n'écrit que dans le tampon
+de sortie (un octet par pixel). Un seuillage global (Otsu) est appliqué en
+place sur ce tampon une fois toutes les bandes écrites : le résultat est
+identique à celui du chemin habituel.
+
+Avec `memory_limit` (plafond par processus), le nombre de processus du
+lot est ramené à mémoire disponible / plafond, et seules les images dont
+la pointe estimée dépasse le plafond prennent ce chemin.
+"""
+
+import os
+import re
+import struct
+import time
+
+from src.core.lazy import lazy_import
+from src.core.trace import record
+
+cv2 = lazy_import('cv2')
+np = lazy_import('numpy')
+
+# Hauteur des bandes du prétraitement (pixels)
+DEFAULT_BAND_HEIGHT = 512
+
+# Tampons pleine taille du prétraitement, en plus de l'image décodée (voir pipeline.py)
+PIPELINE_BUFFERS = 2
+
+_UNITS = {'': 1, 'K': 1 << 10, 'M': 1 << 20, 'G': 1 << 30, 'T': 1 << 40}
+
+
+def parse_size(text) -> int:
+    """'512M', '2G', '1.5g', '300000000' -> octets."""
+    match = re.fullmatch(r'\s*(\d+(?:\.\d+)?)\s*([KMGT]?)o?B?\s*', str(text), re.IGNORECASE)
+    if not match:
+        raise ValueError(f"Taille invalide : {text!r} (exemples : 512M, 2G)")
+    return int(float(match.group(1)) * _UNITS[match.group(2).upper()])
+
+
+def available_memory():
+    """Mémoire disponible (octets) : MemAvailable sous Linux, mémoire physique ailleurs, ou None."""
+    try:
+        with open('/proc/meminfo') as f:
+            for line in f:
+                if line.startswith('MemAvailable:'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    try:
+        return os.sysconf('SC_PHYS_PAGES') * os.sysconf('SC_PAGE_SIZE')
+    except (AttributeError, ValueError, OSError):
+        return None
+
+
+def workers_for_memory(workers: int, limit: int) -> int:
+    """`workers` ramené au nombre de processus de `limit` octets que la mémoire disponible permet."""
+    available = available_memory() if limit else None
+    if not available:
+        return workers
+    return max(1, min(workers, available // limit))
+
+
+# ============================================================================
+# En-têtes d'images (dimensions sans décodage)
+# ============================================================================
+
+# Tags TIFF utiles
+_WIDTH, _HEIGHT, _BITS, _COMPRESSION, _PHOTOMETRIC = 256, 257, 258, 259, 262
+_STRIP_OFFSETS, _SAMPLES, _ROWS_PER_STRIP, _STRIP_COUNTS, _PLANAR, _TILE_WIDTH = 273, 277, 278, 279, 284, 322
+
+# Type TIFF -> (format struct, taille)
+_TIFF_TYPES = {1: ('B', 1), 3: ('H', 2), 4: ('I', 4), 16: ('Q', 8)}
+
+
+def _tiff_ifd(path: str, page: int = 1):
+    """Tags de la page `page` d'un TIFF classique : {tag: [valeurs]} (None si illisible)."""
+    with open(path, 'rb') as f:
+        head = f.read(8)
+        if head[:4] not in (b'II*\0', b'MM\0*'):
+            return None
+        order = '<' if head[:2] == b'II' else '>'
+        offset = struct.unpack(order + 'I', head[4:8])[0]
+        for _ in range(page - 1):
+            f.seek(offset)
+            count = struct.unpack(order + 'H', f.read(2))[0]
+            f.seek(offset + 2 + 12 * count)
+            offset = struct.unpack(order + 'I', f.read(4))[0]
+            if not offset:
+                return None
+        f.seek(offset)
+        count = struct.unpack(order + 'H', f.read(2))[0]
+        entries = f.read(12 * count)
+        tags = {}
+        for i in range(count):
+            tag, kind, n, value = struct.unpack_from(order + 'HHI4s', entries, 12 * i)
+            if kind not in _TIFF_TYPES:
+                continue
+            fmt, size = _TIFF_TYPES[kind]
+            if n * size > 4:
+                f.seek(struct.unpack(order + 'I', value)[0])
+                value = f.read(n * size)
+            tags[tag] = list(struct.unpack(order + fmt * n, value[:n * size]))
+    return tags
+
+
+def _pnm_header(path: str):
+    """(type, largeur, hauteur, valeur max, début des pixels) d'un PBM/PGM/PPM binaire, ou None."""
+    with open(path, 'rb') as f:
+        data = f.read(1024)
+    magic = data[:2]
+    if magic not in (b'P4', b'P5', b'P6'):
+        return None
+    # Champs séparés par des blancs, commentaires `#` jusqu'à la fin de la ligne
+    fields, pos = [], 2
+    wanted = 2 if magic == b'P4' else 3
+    while len(fields) < wanted:
+        match = re.compile(rb'(?:\s+|#[^\n]*\n)*(\d+)').match(data, pos)
+        if not match:
+            return None
+        fields.append(int(match.group(1)))
+        pos = match.end()
+    # Un seul blanc avant les pixels
+    width, height = fields[:2]
+    maxval = fields[2] if magic != b'P4' else 1
+    return magic.decode(), width, height, maxval, pos + 1
+
+
+def image_info(path: str, page=None):
+    """(largeur, hauteur, canaux) lus dans l'en-tête de `path`, ou None (format non reconnu).
+
+    PNG, JPEG, TIFF (page `page`), BMP et PNM : quelques octets lus, rien n'est décodé.
+    """
+    try:
+        with open(path, 'rb') as f:
+            head = f.read(32)
+            if head[:8] == b'\x89PNG\r\n\x1a\n':
+                width, height, depth, color = struct.unpack('>IIBB', head[16:26])
+                return width, height, {0: 1, 2: 3, 3: 3, 4: 2, 6: 4}.get(color, 3)
+            if head[:2] == b'BM':
+                width, height = struct.unpack('<ii', head[18:26])
+                return width, abs(height), 3
+            if head[:2] == b'\xff\xd8':
+                # Parcours des segments jusqu'au SOF (dimensions de l'image)
+                f.seek(2)
+                while True:
+                    marker = f.read(2)
+                    if len(marker) < 2 or marker[0] != 0xFF:
+                        return None
+                    length = struct.unpack('>H', f.read(2))[0]
+                    if 0xC0 <= marker[1] <= 0xCF and marker[1] not in (0xC4, 0xC8, 0xCC):
+                        _, height, width, channels = struct.unpack('>BHHB', f.read(6))
+                        return width, height, channels
+                    f.seek(length - 2, os.SEEK_CUR)
+        if head[:4] in (b'II*\0', b'MM\0*'):
+            tags = _tiff_ifd(path, page or 1)
+            if tags and _WIDTH in tags and _HEIGHT in tags:
+                return tags[_WIDTH][0], tags[_HEIGHT][0], tags.get(_SAMPLES, [1])[0]
+        header = _pnm_header(path)
+        if header:
+            kind, width, height, _, _ = header
+            return width, height, 3 if kind == 'P6' else 1
+    except (OSError, struct.error):
+        pass
+    return None
+
+
+def estimate_peak(info, gray: bool = True) -> int:
+    """Mémoire de pointe (octets) du chemin habituel pour une image `info` = (l, h, canaux).
+
+    Décodée en niveaux de gris : un octet par pixel quel que soit le fichier ;
+    sinon un octet par canal, trois au moins (BGR, cv2.IMREAD_COLOR).
+    """
+    width, height, channels = info
+    decoded = 1 if gray else max(3, channels)
+    return width * height * (decoded + PIPELINE_BUFFERS)
+
+
+# ============================================================================
+# Sources lisibles par bandes
+# ============================================================================
+
+class BandSource:
+    """Image en niveaux de gris lue par bandes depuis un fichier projeté en mémoire.
+
+    `strips` : [(première ligne, tableau (lignes, octets par ligne))] ;
+    `convert(raw)` : lignes brutes -> niveaux de gris (uint8, fond blanc).
+    S'utilise comme une image en lecture (`shape`, `img[y0:y1, x0:x1]`) :
+    la reprise des lignes (refine.py) y recadre ses lignes sans décoder la page.
+    """
+
+    ndim = 2
+
+    def __init__(self, path: str, width: int, height: int, strips, convert):
+        self.path = path
+        self.shape = (height, width)
+        self.strips = strips
+        self.convert = convert
+        self._buffer = None  # bandes à cheval sur plusieurs blocs du fichier, réutilisé d'un appel à l'autre
+
+    def rows(self, y0: int, y1: int):
+        """Lignes `y0` à `y1` (exclue) en niveaux de gris ; une vue du fichier quand c'est possible.
+
+        Le résultat peut partager le tampon interne : il n'est valable que jusqu'à l'appel suivant.
+        """
+        pieces = []
+        for first, strip in self.strips:
+            lo, hi = max(y0, first), min(y1, first + len(strip))
+            if lo < hi:
+                pieces.append(strip[lo - first:hi - first])
+        if len(pieces) == 1:
+            return self.convert(pieces[0])
+        row_bytes = pieces[0].shape[1]
+        if self._buffer is None or len(self._buffer) < y1 - y0:
+            self._buffer = np.empty((y1 - y0, row_bytes), np.uint8)
+        raw = self._buffer[:y1 - y0]
+        np.concatenate(pieces, out=raw)
+        return self.convert(raw)
+
+    def __getitem__(self, key):
+        ys, xs = key if isinstance(key, tuple) else (key, slice(None))
+        y0, y1, _ = ys.indices(self.shape[0])
+        return self.rows(y0, y1)[:, xs].copy()
+
+
+def _converter(bits: int, samples: int, width: int, white_is_zero: bool):
+    """Fonction lignes brutes -> niveaux de gris pour le codage des pixels du fichier."""
+    if bits == 1:
+        def convert(raw):
+            gray = np.unpackbits(np.asarray(raw), axis=1)[:, :width]
+            if white_is_zero:
+                # 1 = noir (TIFF WhiteIsZero, PBM)
+                np.subtract(1, gray, out=gray)
+            gray *= 255
+            return gray
+    elif samples == 1:
+        def convert(raw):
+            return cv2.bitwise_not(np.asarray(raw)) if white_is_zero else np.asarray(raw)
+    else:
+        code = cv2.COLOR_RGB2GRAY if samples == 3 else cv2.COLOR_RGBA2GRAY
+
+        def convert(raw):
+            return cv2.cvtColor(np.asarray(raw).reshape(len(raw), width, samples), code)
+    return convert
+
+
+def open_bands(path: str, page=None):
+    """Source par bandes de `path` (TIFF non compressé en bandes, PBM/PGM/PPM 8 bits), ou None.
+
+    Les formats compressés (PNG, JPEG, TIFF LZW/CCITT...) doivent être décodés en entier.
+    """
+    try:
+        header = _pnm_header(path)
+        if header:
+            kind, width, height, maxval, start = header
+            if maxval > 255:
+                return None
+            bits, samples = (1, 1) if kind == 'P4' else (8, 3 if kind == 'P6' else 1)
+            row_bytes = (width + 7) // 8 if bits == 1 else width * samples
+            data = np.memmap(path, np.uint8, 'r', offset=start, shape=(height, row_bytes))
+            return BandSource(path, width, height, [(0, data)], _converter(bits, samples, width, kind == 'P4'))
+
+        tags = _tiff_ifd(path, page or 1)
+    except (OSError, ValueError, struct.error):
+        return None
+    if not tags or _STRIP_OFFSETS not in tags or _TILE_WIDTH in tags:
+        return None
+    width, height = tags[_WIDTH][0], tags[_HEIGHT][0]
+    bits = tags.get(_BITS, [1])[0]
+    samples = tags.get(_SAMPLES, [1])[0]
+    photometric = tags.get(_PHOTOMETRIC, [1])[0]
+    if (tags.get(_COMPRESSION, [1])[0] != 1 or tags.get(_PLANAR, [1])[0] != 1
+            or photometric not in (0, 1, 2) or (bits, samples) not in ((1, 1), (8, 1), (8, 3), (8, 4))):
+        return None
+
+    row_bytes = (width + 7) // 8 if bits == 1 else width * samples
+    rows_per_strip = min(tags.get(_ROWS_PER_STRIP, [height])[0], height)
+    flat = np.memmap(path, np.uint8, 'r')
+    strips = []
+    for i, offset in enumerate(tags[_STRIP_OFFSETS]):
+        first = i * rows_per_strip
+        count = min(rows_per_strip, height - first)
+        if count <= 0 or offset + count * row_bytes > len(flat):
+            return None
+        strips.append((first, flat[offset:offset + count * row_bytes].reshape(count, row_bytes)))
+    return BandSource(path, width, height, strips, _converter(bits, samples, width, photometric == 0))
+
+
+# ============================================================================
+# Prétraitement par bandes
+# ============================================================================
+
+def _stage_halo(name: str, params: dict):
+    """Lignes de voisinage lues par une étape locale ; 0 : pixel par pixel ; None : étape globale."""
+    if name == 'gray':
+        return 0
+    if name in ('blur', 'median'):
+        return int(params.get('k', 5 if name == 'blur' else 3)) // 2 + 1
+    if name == 'denoise':
+        return (int(params.get('template', 7)) + int(params.get('search', 21))) // 2 + 1
+    if name == 'adaptive':
+        return int(params.get('block', 31)) // 2 + 1
+    if name == 'sauvola':
+        return int(params.get('window', 25)) // 2 + 1
+    if name == 'morph':
+        return int(params.get('k', 2)) * int(params.get('iterations', 1)) + 1
+    return None
+
+
+def band_halo(pipeline):
+    """Recouvrement (lignes) des bandes pour `pipeline`, ou None s'il ne se découpe pas.
+
+    Le pipeline doit commencer par `gray` (les bandes sont lues en niveaux de
+    gris) et n'enchaîner que des étapes locales (blur, median, denoise,
+    adaptive, sauvola, morph), éventuellement suivies d'un `otsu` final
+    (seuil global appliqué au tampon complet). Les étapes géométriques
+    (resize, normalize, deskew, crop) ont besoin de toute l'image.
+    """
+    if not pipeline.gray_input:
+        return None
+    stages = pipeline.stages[:-1] if pipeline.stages and pipeline.stages[-1][0] == 'otsu' else pipeline.stages
+    halo = 0
+    for name, params in stages:
+        radius = _stage_halo(name, params)
+        if radius is None:
+            return None
+        halo += radius
+    return halo
+
+
+def low_memory_source(path, page, pipeline, limit: int):
+    """Source par bandes si l'image `path` dépasse `limit` octets sur le chemin habituel, sinon None."""
+    if not limit or not isinstance(path, str):
+        return None
+    info = image_info(path, page)
+    if info is None or estimate_peak(info, pipeline.gray_input) <= limit:
+        return None
+    if band_halo(pipeline) is None:
+        return None
+    return open_bands(path, page)
+
+
+def preprocess_bands(source, pipeline, band_height: int = DEFAULT_BAND_HEIGHT, timings=None):
+    """Applique `pipeline` à `source` bande par bande ; retourne l'image prétraitée complète.
+
+    Mémoire : le tampon de sortie (un octet par pixel) et les tampons d'une
+    bande. Lève ValueError si le pipeline ne se découpe pas (voir `band_halo`).
+    """
+    from src.core.pipeline import Pipeline
+
+    halo = band_halo(pipeline)
+    if halo is None:
+        raise ValueError(f"Prétraitement non découpable en bandes : {pipeline.spec}")
+    global_otsu = bool(pipeline.stages) and pipeline.stages[-1][0] == 'otsu'
+    local = Pipeline(pipeline.stages[:-1] if global_otsu else pipeline.stages)
+
+    start = time.perf_counter()
+    height, width = source.shape
+    out = np.empty((height, width), np.uint8)
+    bands = 0
+    for y0 in range(0, height, band_height):
+        y1 = min(height, y0 + band_height)
+        top, bottom = max(0, y0 - halo), min(height, y1 + halo)
+        band = local.run(source.rows(top, bottom))
+        out[y0:y1] = band[y0 - top:y1 - top]
+        band = None  # libérée avant le calcul de la bande suivante
+        bands += 1
+    if global_otsu:
+        # Seuil calculé sur l'histogramme de toute l'image, appliqué en place
+        cv2.threshold(out, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU, dst=out)
+    record(timings, 'bands', time.perf_counter() - start, shape=out.shape, bands=bands)
+    return out
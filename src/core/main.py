@@ -9,108 +9,627 @@ Fichiers:
 Instructions rapides (voir README.md pour plus de détails):
 1) Installer Tesseract (Windows: installez depuis https://github.com/tesseract-ocr/tesseract; Linux: `sudo apt install tesseract-ocr`)
 2) Installer dépendances Python: `pip install opencv-python pytesseract`
-3) (Windows) Si besoin, décommenter et définir `pytesseract.pytesseract.tesseract_cmd` vers le chemin de l'exécutable tesseract
+3) (Windows) Si tesseract n'est ni dans le PATH ni dans "C:\Program Files\Tesseract-OCR", passer `--tesseract CHEMIN`
 4) Générer l'image d'exemple: `python create_sample_image.py` (créera `images/document.png`)
 5) Lancer: `python main.py` (ou `python main.py images/document.png`)
+6) Mode lot: `python main.py data/images/ 'scans/*.png' @liste.txt -j 8`
+7) Mode flux: `find scans -name '*.png' | python main.py --stream > resultats.jsonl`
+8) Documents multipages: `python main.py rapport.pdf -j 8` (une page par processus, Poppler requis pour les PDF)
+9) Traçage: `python main.py scans/ --trace trace.json` (à ouvrir dans chrome://tracing)
+10) Sortie structurée: `python main.py scans/ --format txt,hocr,alto,json` (une seule reconnaissance, voir export.py)
+11) Reprise des lignes peu sûres: `python main.py scans/ --refine 60` (prétraitement lourd sur ces lignes seulement, voir refine.py)
+12) Rescans et doublons: `python main.py arrivees/ --cache .ocr_cache --near-dup` (signalés sans OCR ; `--near-dup-action reuse` : résultat repris, voir dedup.py)
+13) Très grandes images: `python main.py plans/ -j 16 --memory-limit 1G` (prétraitement par bandes, voir lowmem.py)
+14) Recherche: `python main.py scans/ --index textes.sqlite3` puis `python -m src.core.search textes.sqlite3 "facture été"`
+15) Sorties groupées: `python main.py scans/ -o res --sink jsonl` (ou `sqlite:res.db`, reprise sans doublon, voir sinks.py)
+
+OpenCV et pytesseract ne sont importés qu'au premier usage (voir lazy.py) et
+la détection de Tesseract est mémorisée sur disque (voir probe.py).
 
 """
 
+import argparse
+import glob
 import os
 import sys
-import cv2
-import pytesseract
-import shutil
-import platform
 import io
-from src.core.functions import load_image, preprocess_image
+import time
+from src.core.functions import decode_image, load_image, preprocess_image
+from src.core.layout import Layout
+from src.core.lookup import ResultLookup, decode, read_params
+from src.core.lowmem import low_memory_source, parse_size, preprocess_bands, workers_for_memory
+from src.core.batch import BatchSummary, collect_image_paths, default_workers, run_batch
+from src.core.cache import DEFAULT_MAX_BYTES, open_cache
+from src.core.dedup import DEFAULT_DISTANCE, MAX_DISTANCE
+from src.core.documents import MULTIPAGE_EXTENSIONS, load_page, output_base, page_count, page_key, split_page_ref
+from src.core.backends import ENGINES, get_backend
+from src.core.export import FORMATS
+from src.core.engine import TRANSPORTS, configure_tesseract, tesseract_languages
+from src.core.pipeline import get_pipeline
+from src.core.refine import DEFAULT_THRESHOLD, refine_layout
+from src.core.regions import crop_to_text
+from src.core.resolution import choose_reduce_factor
+from src.core.search import INDEX_BATCH, open_search_index
+from src.core.sinks import TextDirSink, open_sink, parse_sink
+from src.core.stream import run_stream
+from src.core.tiling import ocr_tiled
+from src.core.trace import Trace, record, summary_table, write_chrome_trace, write_json
 
 # Configure UTF-8 pour l'affichage des caractères accentués sur Windows PowerShell
 if sys.platform == 'win32':
     sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
     sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8')
 
-# --- Si vous êtes sous Windows et tesseract n'est pas dans le PATH,
-#     décommentez et modifiez la ligne ci-dessous en remplaçant le chemin
 
-pytesseract.pytesseract.tesseract_cmd = r"C:\Program Files\Tesseract-OCR\tesseract.exe"
+def extract_text_from_image(image_path: str, lang=None, cache_dir=None,
+                            cache_max_bytes=DEFAULT_MAX_BYTES, transport='file',
+                            tile_height=0, tile_workers=None, pipeline=None,
+                            x_height=0, regions=False, timeout=None, engine=None,
+                            layout=False, refine=0, near_dup=None, near_dup_action='flag',
+                            memory_limit=0, timings=None, info=None) -> str:
+    """Lit l'image, applique le prétraitement, puis extrait le texte avec le moteur OCR.
+
+    `image_path` est un chemin de fichier, une page de document (`scan.pdf#page=3`,
+    voir documents.py) ou le contenu encodé de l'image (bytes).
+    Avec `cache_dir`, le résultat est d'abord cherché dans le cache disque
+    (clé : contenu de l'image, prétraitement, langue, version de Tesseract).
+    `engine` : moteur OCR ('auto', 'tesseract', 'tesserocr', 'fake', voir backends.py) ;
+    `transport='pipe'` transmet l'image à l'exécutable tesseract en mémoire (voir engine.py).
+    Avec `tile_height`, les grandes pages sont lues par bandes en parallèle (voir tiling.py).
+    `pipeline` : description du prétraitement (défaut : gris + flou + Otsu, voir pipeline.py) ;
+    `timings` reçoit `(étape, secondes)` : lecture, prétraitement, OCR ; avec une
+    `Trace` (voir trace.py), aussi les dimensions des images et les octets lus.
+    Avec `x_height`, l'image est remise à l'échelle pour que le texte mesure
+    environ `x_height` px (décodage JPEG réduit + étape `normalize`, voir resolution.py).
+    `timeout` : délai maximal d'un appel à Tesseract (secondes), processus tué au-delà.
+    Avec `regions`, une page blanche donne un texte vide sans appeler Tesseract
+    et les autres sont recadrées sur leur texte (voir regions.py) ; `info`
+    (dict) reçoit alors `region` : 'blank', 'crop' ou 'full'.
+    Avec `layout`, la même reconnaissance donne aussi blocs, lignes, mots,
+    rectangles et confiances : `info['layout']` reçoit un `Layout` (voir
+    layout.py) en coordonnées de l'image d'origine ; `tile_height` est ignoré.
+    Avec `refine` (seuil de confiance 0-100), les lignes dont la confiance
+    moyenne est inférieure au seuil sont relues avec un prétraitement lourd
+    (voir refine.py) ; `info['refine']` compte les lignes reprises et améliorées.
+    Avec `near_dup` (distance de Hamming, exige `cache_dir`), une image proche
+    d'une image déjà lue (rescan, fax, JPEG réenregistré, voir dedup.py) n'est
+    pas soumise au moteur : `near_dup_action='flag'` (défaut) retourne un
+    texte vide, `'reuse'` reprend le résultat de l'autre image. `info['duplicate']`
+    reçoit alors le chemin de l'image reconnue et la distance.
+    Si le prétraitement commence par `gray`, l'image est décodée directement
+    en niveaux de gris. Avec `memory_limit` (octets), une image dont le
+    traitement habituel dépasserait ce plafond est, si son format le permet
+    (TIFF non compressé, PNM), prétraitée par bandes depuis le fichier
+    projeté en mémoire (voir lowmem.py).
+    """
+    pipeline = get_pipeline(pipeline, x_height)
+    backend = get_backend(engine, transport)
+    structured = layout or refine
+    if structured:
+        tile_height = 0
+
+    source, page = split_page_ref(image_path) if isinstance(image_path, str) else (image_path, None)
+
+    def cached(stored, size=None):
+        """Texte d'un résultat stocké dans le cache ; son `Layout` (ou une page vide de `size`) va dans `info`."""
+        text, result = decode(stored, structured)
+        if layout and info is not None:
+            info['layout'] = result if result is not None else Layout.empty(size)
+        return text
+
+    def finish(result):
+        """Texte retourné ; le `Layout` éventuel va dans `info` et, en JSON, dans le cache."""
+        text = result
+        if structured:
+            if layout and info is not None:
+                info['layout'] = result
+            text = result.text()
+        if known is not None:
+            known.put(key, result, fingerprint, image_path if isinstance(image_path, str) else None)
+        return text
+
+    known = None
+    fingerprint = None
+    if cache_dir:
+        known = ResultLookup(cache_dir, cache_max_bytes, read_params(pipeline, tile_height, regions, structured, refine),
+                             lang, backend.version(), near_dup, near_dup_action)
+        key = known.key(source, page)
+        start = time.perf_counter()
+        text = known.get(key)
+        if text is not None:
+            record(timings, 'cache', time.perf_counter() - start)
+            return cached(text)
+
+    start = time.perf_counter()
+    factor = 1
+    gray = pipeline.gray_input
+    bands = low_memory_source(source, page, pipeline, memory_limit)
+    if bands is not None:
+        # Pixels laissés dans le fichier : seules les bandes en cours sont en mémoire
+        img = bands
+    elif page:
+        img = load_page(source, page, gray=gray)
+    else:
+        factor = choose_reduce_factor(source, x_height)
+        img = load_image(source, factor, gray) if isinstance(source, str) else decode_image(source, factor, gray)
+    if timings is not None:
+        record(timings, 'load', time.perf_counter() - start, shape=img.shape)
+        if isinstance(timings, Trace) and not page and bands is None:
+            timings.bytes_read += os.path.getsize(source) if isinstance(source, str) else len(source)
+
+    processed = preprocess_bands(bands, pipeline, timings=timings) if bands is not None \
+        else preprocess_image(img, pipeline, timings)
+    full_shape = processed.shape
+    offset = (0, 0)
 
+    if near_dup is not None and known is not None:
+        # Empreinte de l'image prétraitée : proche d'une image déjà lue ?
+        start = time.perf_counter()
+        fingerprint = known.fingerprint(processed)
+        found = known.near_duplicate(fingerprint)
+        record(timings, 'dedup', time.perf_counter() - start, match=found is not None)
+        if found is not None:
+            match, stored = found
+            if info is not None:
+                info['duplicate'] = {'path': match['path'], 'distance': match['distance']}
+            return cached(stored, (img.shape[1] * factor, img.shape[0] * factor))
 
-def extract_text_from_image(image_path: str) -> str:
-    """Lit l'image, applique le prétraitement, puis extrait le texte via pytesseract."""
-    img = load_image(image_path)
-    processed = preprocess_image(img)
+    if regions:
+        start = time.perf_counter()
+        processed, region, offset = crop_to_text(processed)
+        if info is not None:
+            info['region'] = region
+        record(timings, 'regions', time.perf_counter() - start,
+               shape=processed.shape if processed is not None else None, region=region)
+        if processed is None:
+            # Page blanche : inutile de lancer Tesseract
+            return finish(Layout.empty((img.shape[1] * factor, img.shape[0] * factor)) if structured else '')
 
-    # pytesseract attend une image en niveaux de gris ou couleur; ici on lui passe l'image seuillée
-    # Config basique: --psm 3 (segmentation par défaut) ; on peut ajouter `lang='fra'` si Tesseract a le pack français installé
+    start = time.perf_counter()
+    if structured:
+        result = backend.recognize_layout(processed, lang, timeout).to_source(full_shape, img.shape, factor, offset)
+    elif tile_height:
+        result = ocr_tiled(
+            processed, lambda tile: backend.recognize(tile, lang, timeout),
+            tile_height=tile_height, workers=tile_workers,
+        )
+    else:
+        result = backend.recognize(processed, lang, timeout)
+    if timings is not None:
+        record(timings, 'ocr', time.perf_counter() - start, shape=processed.shape)
+    if refine:
+        result = refine_layout(img, result, backend, refine, lang, timeout,
+                               factor=factor, timings=timings, info=info)
+
+    return finish(result)
+
+
+def run_tesseract(processed, lang=None, transport='file', timeout=None, engine=None) -> str:
+    """Reconnaît une image prétraitée avec le moteur `engine` (voir backends.py).
+
+    Au-delà de `timeout` secondes, la reconnaissance est interrompue et une erreur levée.
+    """
+    return get_backend(engine, transport).recognize(processed, lang, timeout)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="OCR d'images avec Tesseract")
+    parser.add_argument(
+        'inputs', nargs='*',
+        help="image(s), dossier(s), motif(s) glob ou liste @fichier.txt",
+    )
+    parser.add_argument(
+        '-j', '--workers', type=int, default=None,
+        help="nombre de processus en mode lot (défaut : nombre de cœurs)",
+    )
+    parser.add_argument(
+        '--as-completed', action='store_true',
+        help="afficher les résultats dès qu'ils sont prêts plutôt que dans l'ordre",
+    )
+    parser.add_argument(
+        '-g', '--group', type=int, default=1,
+        help="images soumises par appel Tesseract en mode lot (amortit le démarrage)",
+    )
+    parser.add_argument(
+        '-l', '--lang', default=None,
+        help="langue(s) Tesseract, ex. 'fra' ou 'fra+eng'",
+    )
+    parser.add_argument(
+        '--tesseract', default=None, metavar='CHEMIN',
+        help="exécutable tesseract (défaut : PATH, puis chemins Windows courants)",
+    )
+    parser.add_argument(
+        '--engine', choices=ENGINES, default='auto',
+        help="moteur OCR : 'tesserocr' (dans le processus), 'tesseract' (exécutable), 'fake' (tests) ; "
+             "'auto' : tesserocr s'il est installé",
+    )
+    parser.add_argument(
+        '--transport', choices=TRANSPORTS, default='file',
+        help="moteur 'tesseract' : 'file' = fichiers temporaires (pytesseract) ; 'pipe' = image en mémoire via stdin/stdout",
+    )
+    parser.add_argument(
+        '--pipeline', default=None, metavar='ÉTAPES',
+        help="prétraitement, ex. \"gray | resize scale=0.5 | sauvola window=31 | deskew\"",
+    )
+    parser.add_argument(
+        '--x-height', type=int, nargs='?', const=25, default=0, metavar='PX',
+        help="remettre l'image à l'échelle pour un texte d'environ PX pixels (défaut 25)",
+    )
+    parser.add_argument(
+        '--regions', action='store_true',
+        help="ignorer les pages blanches et recadrer les autres sur leur texte avant l'OCR",
+    )
+    parser.add_argument(
+        '--refine', type=float, nargs='?', const=DEFAULT_THRESHOLD, default=0, metavar='SEUIL',
+        help="relire avec un prétraitement lourd les lignes de confiance moyenne < SEUIL "
+             f"(0-100, défaut {DEFAULT_THRESHOLD}) et garder le meilleur résultat",
+    )
+    parser.add_argument(
+        '--timeout', type=float, default=0, metavar='S',
+        help="délai maximal d'un appel Tesseract en secondes ; au-delà, processus tué et image en erreur",
+    )
+    parser.add_argument(
+        '--stage-times', action='store_true',
+        help="afficher le temps de chaque étape de prétraitement (mode image)",
+    )
+    parser.add_argument(
+        '--trace', default=None, metavar='FICHIER',
+        help="tracer chaque étape (durée, dimensions, octets lus, pic mémoire) dans FICHIER "
+             "et afficher un tableau récapitulatif",
+    )
+    parser.add_argument(
+        '--trace-format', choices=('chrome', 'json'), default='chrome',
+        help="'chrome' : chrome://tracing / Perfetto ; 'json' : un objet JSON par document",
+    )
+    parser.add_argument(
+        '--tile-height', type=int, default=0, metavar='PX',
+        help="lire les grandes pages par bandes de PX pixels en parallèle (0 = désactivé)",
+    )
+    parser.add_argument(
+        '--tile-workers', type=int, default=None,
+        help="bandes traitées en parallèle (défaut : nombre de cœurs en mode image, 1 en mode lot)",
+    )
+    parser.add_argument(
+        '--cache', default=None, metavar='DOSSIER',
+        help="dossier du cache des résultats OCR (désactivé par défaut)",
+    )
+    parser.add_argument(
+        '--cache-size', type=int, default=DEFAULT_MAX_BYTES // (1024 * 1024), metavar='MO',
+        help="taille maximale du cache en Mo (éviction LRU)",
+    )
+    parser.add_argument(
+        '--memory-limit', type=parse_size, default=0, metavar='TAILLE',
+        help="plafond mémoire par processus, ex. '1G' : processus limités à mémoire disponible / TAILLE, "
+             "images plus grosses prétraitées par bandes (TIFF non compressé, PNM ; voir lowmem.py)",
+    )
+    parser.add_argument(
+        '--near-dup', type=int, nargs='?', const=DEFAULT_DISTANCE, default=None, metavar='DISTANCE',
+        help="reconnaître les rescans / copies d'images déjà lues (empreinte perceptuelle, "
+             f"distance de Hamming <= DISTANCE sur 256 bits, défaut {DEFAULT_DISTANCE}) ; exige --cache",
+    )
+    parser.add_argument(
+        '--near-dup-action', choices=('reuse', 'flag'), default='flag',
+        help="quasi-doublon : 'flag' (défaut) = le signaler avec un texte vide ; 'reuse' = reprendre "
+             "le résultat de l'image reconnue. L'empreinte voit la mise en page, pas le texte : deux "
+             "exemplaires remplis d'un même formulaire peuvent être à moins de "
+             f"{DEFAULT_DISTANCE} bits ; avec 'reuse', préférer une distance basse (ex. --near-dup 6) "
+             "pour ne reprendre que de vrais rescans",
+    )
+    parser.add_argument(
+        '--stream', action='store_true',
+        help="lire chemins / base64 / JSON sur stdin et écrire un objet JSON par résultat sur stdout",
+    )
+    parser.add_argument(
+        '--window', type=int, default=0,
+        help="mode flux : nombre maximal d'images en cours (défaut : 2 × processus)",
+    )
+    parser.add_argument(
+        '--format', default='txt', metavar='FORMATS',
+        help="fichiers écrits par image, séparés par des virgules : "
+             "txt, hocr, alto, json (mots, rectangles et confiances) ; ex. 'txt,hocr'",
+    )
+    parser.add_argument(
+        '--index', default=None, metavar='FICHIER',
+        help="ajouter les textes à l'index de recherche plein texte (SQLite FTS5, voir search.py)",
+    )
+    parser.add_argument(
+        '--sink', default=None, metavar='SORTIE',
+        help="'dir' : un fichier par image (défaut) ; 'jsonl[:FICHIER]' : JSON Lines en ajout seul ; "
+             "'sqlite[:FICHIER]' : base SQLite (défaut : ocr_results.* dans --output-dir). "
+             "JSONL et SQLite sont écrits par lots et les images déjà présentes ne sont pas relues",
+    )
+    parser.add_argument(
+        '-o', '--output-dir', default='.',
+        help="dossier des fichiers <nom>_ocr.txt (défaut : dossier courant)",
+    )
+    args = parser.parse_args(argv)
+    if args.group > 1 and args.tile_height:
+        parser.error("--group et --tile-height ne peuvent pas être combinés")
+    args.formats = list(dict.fromkeys(f.strip() for f in args.format.split(',') if f.strip()))
+    unknown = [f for f in args.formats if f not in FORMATS]
+    if unknown or not args.formats:
+        parser.error(f"format inconnu : {', '.join(unknown) or args.format} (choix : {', '.join(FORMATS)})")
+    if args.near_dup is not None and not args.cache:
+        parser.error("--near-dup exige --cache (l'index est rangé avec les résultats)")
+    if args.near_dup is not None and not 0 <= args.near_dup <= MAX_DISTANCE:
+        parser.error(f"--near-dup : distance de 0 à {MAX_DISTANCE}")
+    if args.index and args.stream:
+        parser.error("--index ne s'applique pas au mode flux (aucun résultat conservé)")
+    if args.sink and args.stream:
+        parser.error("--sink ne s'applique pas au mode flux (résultats sur la sortie standard)")
     try:
-        text = pytesseract.image_to_string(processed)
-    except pytesseract.pytesseract.TesseractNotFoundError:
-        # Tesseract non trouvé : essayons de localiser automatiquement l'exécutable
-        def find_tesseract_executable():
-            # 1) vérifier si 'tesseract' est dans le PATH
-            path = shutil.which('tesseract')
-            if path:
-                return path
-
-            # 2) chemins courants sous Windows
-            if platform.system().lower().startswith('win'):
-                common = [
-                    r"C:\Program Files\Tesseract-OCR\tesseract.exe",
-                    r"C:\Program Files (x86)\Tesseract-OCR\tesseract.exe",
-                ]
-                for p in common:
-                    if os.path.exists(p):
-                        return p
-
-            return None
-
-        found = find_tesseract_executable()
-        if found:
-            pytesseract.pytesseract.tesseract_cmd = found
-            print(f"Tesseract trouvé automatiquement : {found} (réessayage)")
-            try:
-                text = pytesseract.image_to_string(processed)
-            except Exception as e:
-                raise RuntimeError(f"Erreur lors de l'appel à pytesseract après configuration automatique : {e}")
-        else:
-            msg = (
-                "Tesseract n'est pas installé ou n'est pas dans le PATH.\n"
-                "Sous Windows : installez depuis https://github.com/tesseract-ocr/tesseract et ajoutez le dossier \"Tesseract-OCR\" au PATH, ou définissez\n"
-                "pytesseract.pytesseract.tesseract_cmd = r'C:\\Program Files\\Tesseract-OCR\\tesseract.exe' dans le script.\n"
-                "Sous Linux (Debian/Ubuntu) : `sudo apt install tesseract-ocr`.\n"
-                "Après installation, relancez le script."
-            )
-            raise RuntimeError(msg)
-    except Exception as e:
-        raise RuntimeError(f"Erreur lors de l'appel à pytesseract: {e}")
+        parse_sink(args.sink or 'dir')
+    except ValueError as e:
+        parser.error(str(e))
+    if args.tile_height and (args.formats != ['txt'] or args.refine):
+        parser.error("--tile-height ne s'applique qu'à la sortie texte (--format txt, sans --refine)")
+    return args
 
-    return text
 
+def save_text(image_path: str, text: str, output_dir: str = '.') -> str:
+    """Sauvegarde le texte dans `<output_dir>/<nom>_ocr.txt` et retourne le chemin.
 
-def main():
-    # chemin par défaut
-    default_image = os.path.join('images', 'document.png')
-    image_path = sys.argv[1] if len(sys.argv) > 1 else default_image
+    Une page de document (`scan.pdf#page=3`) est écrite dans `scan_p0003_ocr.txt`.
+    """
+    return TextDirSink(output_dir).write(image_path, text)[0]
+
+
+def save_outputs(image_path: str, text: str, layout=None, formats=('txt',), output_dir: str = '.') -> list:
+    """Écrit un fichier par format demandé (`FORMATS`, voir export.py) et retourne leurs chemins.
+
+    Les formats autres que 'txt' sont construits depuis `layout` (option `layout`).
+    Pour un lot, préférer une sortie groupée (`open_sink`, voir sinks.py).
+    """
+    return TextDirSink(output_dir, formats).write(image_path, text, layout)
 
+
+def write_traces(traces, path: str, fmt: str = 'chrome'):
+    """Exporte les traces dans `path` et affiche le tableau récapitulatif."""
+    (write_json if fmt == 'json' else write_chrome_trace)(traces, path)
+    print("--- Trace ---")
+    print(summary_table(traces))
+    print(f"Trace enregistrée dans: {path}")
+
+
+def run_single(image_path: str, output_dir: str = '.', options=None, stage_times=False,
+               trace_path=None, trace_format='chrome', formats=('txt',), index_path=None, sink=None):
+    """Mode historique : une image, texte affiché puis sauvegardé (et indexé avec `index_path`)."""
     if not os.path.exists(image_path):
         print(f"Image non trouvée: {image_path}\nGénérez l'exemple avec: python create_sample_image.py")
         return
 
     print(f"Lecture de l'image: {image_path}")
-    text = extract_text_from_image(image_path)
+    if trace_path:
+        timings = Trace(image_path)
+    else:
+        timings = [] if stage_times else None
+    info = {}
+    text = extract_text_from_image(image_path, timings=timings, info=info, **(options or {}))
+    if info.get('region') == 'blank':
+        print("Page blanche : OCR ignoré")
+    if info.get('duplicate'):
+        print(f"Quasi-doublon de {info['duplicate']['path']} (distance {info['duplicate']['distance']}) : OCR évité")
+    if info.get('refine', {}).get('lines'):
+        print(f"Lignes reprises : {info['refine']['lines']} ({info['refine']['improved']} améliorée(s))")
+
+    if timings:
+        print("--- Temps par étape ---")
+        for name, seconds in timings:
+            print(f"{name:<10} {1000 * seconds:8.2f} ms")
 
     # Affichage dans la console
     print("--- Texte extrait ---")
     print(text)
     print("---------------------")
 
-    # Sauvegarde dans un fichier .txt
-    out_name = os.path.splitext(os.path.basename(image_path))[0] + '_ocr.txt'
-    with open(out_name, 'w', encoding='utf-8') as f:
-        f.write(text)
+    # Sauvegarde dans un fichier .txt (et les formats structurés demandés) ou dans la sortie `sink`
+    start = time.perf_counter()
+    with open_sink(sink, output_dir, formats) as out:
+        out_names = out.write(image_path, text, info.get('layout'))
+    record(timings, 'write', time.perf_counter() - start)
+
+    if out_names:
+        print(f"Texte sauvegardé dans: {', '.join(out_names)}")
+    else:
+        print(f"Déjà présent dans {out.path} : non réécrit")
+    if index_path:
+        open_search_index(index_path).add(image_path, text)
+    if trace_path:
+        write_traces([timings.finish()], trace_path, trace_format)
+
+
+def run_batch_mode(paths, workers=None, ordered=True, output_dir='.', group=1, options=None,
+                   trace_path=None, trace_format='chrome', formats=('txt',), index_path=None, sink=None):
+    """Mode lot : OCR parallèle, une ligne par image puis résumé de débit.
+
+    Avec `trace_path`, chaque processus de travail renvoie la trace de ses
+    images ; l'écriture du résultat y est ajoutée puis l'ensemble est exporté.
+    Avec `index_path`, les textes sont ajoutés à l'index de recherche
+    (voir search.py) par transactions de INDEX_BATCH pages.
+    Les résultats vont dans la sortie `sink` (voir sinks.py) ; les pages
+    qu'elle contient déjà (lot interrompu) ne sont pas relues. Avec la
+    sortie 'dir', les sous-dossiers des images sous leur dossier commun sont
+    reproduits dans `output_dir` : deux `scan0001.png` ne s'écrasent pas.
+    """
+    if not paths:
+        print("Aucune image trouvée.")
+        return
+
+    os.makedirs(output_dir, exist_ok=True)
+    base = output_base(os.path.dirname(split_page_ref(path)[0]) for path in paths)
+    out = open_sink(sink, output_dir, formats, base)
+    try:
+        _run_batch_into(out, paths, workers, ordered, group, options, trace_path, trace_format, index_path)
+    finally:
+        out.close()
+
+
+def _run_batch_into(out, paths, workers, ordered, group, options, trace_path, trace_format, index_path):
+    """Corps de `run_batch_mode` : la sortie `out` est fermée (lot en attente écrit) même après Ctrl+C."""
+    done = out.written()
+    if done:
+        remaining = [path for path in paths if page_key(path) not in done]
+        if len(remaining) < len(paths):
+            print(f"{len(paths) - len(remaining)} image(s) déjà dans {out.path} : ignorée(s)")
+        paths = remaining
+        if not paths:
+            print("Rien à traiter.")
+            return
+    print(f"{len(paths)} image(s) à traiter")
+
+    options = options or {}
+    cache = None
+    if options.get('cache_dir'):
+        cache = open_cache(options['cache_dir'], options['cache_max_bytes'])
+        before = cache.stats()
+
+    if trace_path:
+        options = dict(options, trace=True)
+    traces = []
+
+    index = open_search_index(index_path) if index_path else None
+    pending = []  # (chemin, page, texte) en attente d'indexation
+
+    summary = BatchSummary()
+    for result in run_batch(paths, workers=workers, ordered=ordered, group=group, options=options):
+        summary.add(result)
+        trace = result.get('trace')
+        if trace is not None:
+            traces.append(trace)
+        if result['error']:
+            print(f"✗ {result['path']} : {result['error']}")
+            continue
+        start = time.perf_counter()
+        out_names = out.write(result['path'], result['text'], result.get('layout'))
+        record(trace, 'write', time.perf_counter() - start)
+        duplicate = result.get('duplicate')
+        note = f", quasi-doublon de {duplicate['path']}" if duplicate else ""
+        print(f"✓ {result['path']} → {', '.join(out_names)} ({result['duration']:.2f} s{note})")
+        if index is not None:
+            pending.append((result['path'], None, result['text']))
+            if len(pending) >= INDEX_BATCH:
+                index.add_many(pending)
+                pending = []
+
+    if pending:
+        index.add_many(pending)
+
+    print("--- Résumé ---")
+    print(summary.report())
+
+    if cache:
+        # Les compteurs de la base cumulent tous les processus de travail
+        after = cache.stats()
+        hits = after['hits'] - before['hits']
+        misses = after['misses'] - before['misses']
+        rate = 100 * hits / (hits + misses) if hits + misses else 0.0
+        print(f"Cache           : {hits} hit(s), {misses} miss(es) ({rate:.0f} %), "
+              f"{after['entries']} entrée(s), {after['bytes'] / 1e6:.1f} Mo")
+
+    if trace_path:
+        write_traces(traces, trace_path, trace_format)
+
+
+def check_languages(lang: str):
+    """Signale les langues demandées absentes de l'installation (sonde mémorisée, sans appel)."""
+    try:
+        installed = tesseract_languages()
+    except RuntimeError:
+        return  # Tesseract introuvable : l'erreur sera rapportée au premier appel
+    missing = [code for code in lang.split('+') if installed and code not in installed]
+    if missing:
+        print(f"Attention : langue(s) non installée(s) : {', '.join(missing)} "
+              f"(disponibles : {', '.join(installed)})", file=sys.stderr)
+
+
+def _is_multipage(path: str) -> bool:
+    if not path.lower().endswith(MULTIPAGE_EXTENSIONS) or not os.path.isfile(path):
+        return False
+    try:
+        return path.lower().endswith('.pdf') or page_count(path) > 1
+    except Exception:
+        return False
 
-    print(f"Texte sauvegardé dans: {out_name}")
 
+def main(argv=None):
+    args = parse_args(argv)
+
+    if args.tesseract:
+        configure_tesseract(args.tesseract)
+    try:
+        get_backend(args.engine, args.transport)
+    except RuntimeError as e:
+        # Moteur demandé absent (tesserocr non installé) : inutile de lancer le traitement
+        print("Erreur :", e, file=sys.stderr)
+        sys.exit(2)
+    if args.lang:
+        check_languages(args.lang)
+
+    # chemin par défaut
+    default_image = os.path.join('images', 'document.png')
+    inputs = args.inputs or [default_image]
+
+    # Options transmises à extract_text_from_image (y compris dans les processus de travail)
+    options = {
+        'lang': args.lang, 'engine': args.engine, 'transport': args.transport,
+        'pipeline': args.pipeline, 'x_height': args.x_height,
+    }
+    if args.regions:
+        options['regions'] = True
+    if args.timeout:
+        options['timeout'] = args.timeout
+    if args.refine:
+        options['refine'] = args.refine
+    if args.near_dup is not None:
+        options.update(near_dup=args.near_dup, near_dup_action=args.near_dup_action)
+    if args.tile_height:
+        options.update(tile_height=args.tile_height, tile_workers=args.tile_workers)
+    if args.formats != ['txt']:
+        # Une seule reconnaissance donne texte, rectangles et confiances
+        options['layout'] = True
+    if args.cache:
+        options.update(cache_dir=args.cache, cache_max_bytes=args.cache_size * 1024 * 1024)
+    if args.memory_limit:
+        options['memory_limit'] = args.memory_limit
+
+    # Une seule image explicite : comportement historique
+    # (un TIFF multipage ou un PDF passe par le mode lot, une page par tâche)
+    if not args.stream and len(inputs) == 1 and not os.path.isdir(inputs[0]) \
+            and not inputs[0].startswith('@') and not glob.has_magic(inputs[0]) \
+            and not _is_multipage(inputs[0]):
+        run_single(inputs[0], args.output_dir, options, args.stage_times, args.trace, args.trace_format,
+                   args.formats, args.index, args.sink)
+        return
+
+    # En mode lot ou flux, le pool de processus occupe déjà tous les cœurs
+    if args.tile_height and args.tile_workers is None:
+        options['tile_workers'] = 1
+
+    # Description invalide : erreur immédiate plutôt qu'un échec par image
+    get_pipeline(args.pipeline)
+
+    if args.memory_limit:
+        # Plafond par processus : pas plus de processus que la mémoire disponible n'en contient
+        workers = workers_for_memory(args.workers or default_workers(), args.memory_limit)
+        if workers < (args.workers or default_workers()):
+            print(f"Mémoire disponible : {workers} processus de {args.memory_limit / 2**20:.0f} Mo au plus",
+                  file=sys.stderr)
+        args.workers = workers
+
+    # Mode flux : entrée standard → JSONL sur la sortie standard, aucun fichier écrit
+    if args.stream:
+        start = time.perf_counter()
+        count = run_stream(sys.stdin, sys.stdout, args.workers or default_workers(), args.window, options)
+        print(f"{count} résultat(s) en {time.perf_counter() - start:.2f} s", file=sys.stderr)
+        return
+
+    paths = collect_image_paths(inputs)
+    run_batch_mode(
+        paths, workers=args.workers, ordered=not args.as_completed,
+        output_dir=args.output_dir, group=args.group, options=options,
+        trace_path=args.trace, trace_format=args.trace_format, formats=args.formats,
+        index_path=args.index, sink=args.sink,
+    )
 
 if __name__ == '__main__':
     try:
@@ -118,7 +637,7 @@ if __name__ == '__main__':
     except RuntimeError as e:
         # Affiche un message propre sans traceback long
         print("Erreur :", e)
-        print("Pour résoudre : installez Tesseract ou définissez pytesseract.pytesseract.tesseract_cmd vers l'exécutable.")
+        print("Pour résoudre : installez Tesseract ou indiquez son exécutable avec --tesseract CHEMIN.")
         sys.exit(1)
     except Exception as e:
         print("Erreur inattendue :", e)
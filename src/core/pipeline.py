@@ -0,0 +1,313 @@
+"""
+Pipeline de prétraitement configurable
+- `Pipeline.parse(spec)` : construit un pipeline depuis une description texte
+- `Pipeline.run(img, timings)` : applique les étapes, avec mesure du temps par étape
+- `STAGES` : étapes disponibles (gray, resize, normalize, blur, median, denoise,
+  otsu, adaptive, sauvola, morph, deskew, crop)
+
+Une description liste les étapes séparées par `|`, chacune suivie de ses
+paramètres `clé=valeur` :
+
+    "gray | blur k=5 | otsu"                     (prétraitement historique)
+    "gray | resize scale=0.5 | denoise h=12 | sauvola window=31 k=0.2 | deskew"
+
+Les étapes écrivent dans un tampon réutilisé (`dst=` d'OpenCV) ou en place
+quand l'opération le permet : le pipeline alterne entre deux tampons pleine
+taille au lieu d'allouer une nouvelle image à chaque étape. L'image d'entrée
+n'est jamais modifiée.
+"""
+
+import time
+
+from src.core.lazy import lazy_import
+from src.core.resolution import DEFAULT_X_HEIGHT, normalize_resolution
+from src.core.trace import record
+
+cv2 = lazy_import('cv2')
+np = lazy_import('numpy')
+
+# Prétraitement historique de `preprocess_image`
+DEFAULT_PIPELINE = "gray | blur k=5 | otsu"
+
+# nom -> fonction(img, out, **params) ; `out` est un tampon de même forme
+# que `img` (ou None) dans lequel l'étape peut écrire son résultat
+STAGES = {}
+
+
+def stage(name, inplace=False):
+    """Enregistre une étape. `inplace=True` : l'étape peut écrire dans son entrée."""
+    def register(fn):
+        fn.inplace = inplace
+        STAGES[name] = fn
+        return fn
+    return register
+
+
+def _odd(k):
+    k = int(k)
+    return k if k % 2 else k + 1
+
+
+@stage('gray')
+def _gray(img, out):
+    if img.ndim == 2:
+        return img
+    return cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+
+
+@stage('resize')
+def _resize(img, out, scale=1.0, width=0, interpolation=''):
+    h, w = img.shape[:2]
+    scale = float(width) / w if width else float(scale)
+    if scale == 1.0:
+        return img
+    size = (max(1, round(w * scale)), max(1, round(h * scale)))
+    if not interpolation:
+        # INTER_AREA pour réduire, INTER_CUBIC pour agrandir
+        flag = cv2.INTER_AREA if scale < 1 else cv2.INTER_CUBIC
+    else:
+        flag = getattr(cv2, 'INTER_' + interpolation.upper())
+    return cv2.resize(img, size, interpolation=flag)
+
+
+@stage('normalize')
+def _normalize(img, out, target=DEFAULT_X_HEIGHT):
+    """Met le texte à la hauteur `target` px (voir resolution.py)."""
+    return normalize_resolution(img, float(target))
+
+
+@stage('blur')
+def _blur(img, out, k=5):
+    k = _odd(k)
+    return cv2.GaussianBlur(img, (k, k), 0, dst=out)
+
+
+@stage('median')
+def _median(img, out, k=3):
+    return cv2.medianBlur(img, _odd(k), dst=out)
+
+
+@stage('denoise')
+def _denoise(img, out, h=10, template=7, search=21):
+    return cv2.fastNlMeansDenoising(img, out, float(h), int(template), int(search))
+
+
+@stage('otsu', inplace=True)
+def _otsu(img, out):
+    _, thresh = cv2.threshold(img, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU, dst=out)
+    return thresh
+
+
+@stage('adaptive')
+def _adaptive(img, out, block=31, c=10, method='gaussian'):
+    flag = cv2.ADAPTIVE_THRESH_GAUSSIAN_C if method == 'gaussian' else cv2.ADAPTIVE_THRESH_MEAN_C
+    return cv2.adaptiveThreshold(img, 255, flag, cv2.THRESH_BINARY, _odd(block), float(c), dst=out)
+
+
+@stage('sauvola')
+def _sauvola(img, out, window=25, k=0.2, r=128):
+    """Seuillage de Sauvola : T = m * (1 + k * (s / r - 1)) sur une fenêtre locale."""
+    window = _odd(window)
+    ximgproc = getattr(cv2, 'ximgproc', None)
+    if ximgproc is not None:
+        # opencv-contrib-python installé : implémentation native
+        return ximgproc.niBlackThreshold(
+            img, 255, cv2.THRESH_BINARY, window, float(k),
+            binarizationMethod=ximgproc.BINARIZATION_SAUVOLA, r=float(r),
+        )
+
+    src = img.astype(np.float32)
+    mean = cv2.boxFilter(src, cv2.CV_32F, (window, window))
+    thresh = cv2.sqrBoxFilter(src, cv2.CV_32F, (window, window))
+    # thresh devient l'écart-type puis le seuil, sans nouvelle allocation pleine taille
+    np.subtract(thresh, mean * mean, out=thresh)
+    np.maximum(thresh, 0, out=thresh)
+    np.sqrt(thresh, out=thresh)
+    thresh *= float(k) / float(r)
+    thresh += 1 - float(k)
+    thresh *= mean
+    if out is None:
+        out = np.empty_like(img)
+    cv2.compare(src, thresh, cv2.CMP_GT, dst=out)
+    return out
+
+
+@stage('morph', inplace=True)
+def _morph(img, out, op='open', k=2, iterations=1):
+    kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (int(k), int(k)))
+    flag = getattr(cv2, 'MORPH_' + op.upper())
+    return cv2.morphologyEx(img, flag, kernel, dst=out, iterations=int(iterations))
+
+
+@stage('deskew')
+def _deskew(img, out, max_angle=10.0):
+    """Redresse une page légèrement inclinée (angle estimé sur les pixels d'encre)."""
+    # Estimation sur une version réduite : l'angle ne dépend pas de la résolution
+    h, w = img.shape[:2]
+    scale = min(1.0, 1000.0 / max(h, w))
+    small = cv2.resize(img, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA) if scale < 1 else img
+    _, ink = cv2.threshold(small, 0, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
+    points = cv2.findNonZero(ink)
+    if points is None:
+        return img
+
+    angle = cv2.minAreaRect(points)[-1]
+    # minAreaRect renvoie un angle dans [0, 90[ (OpenCV >= 4.5) ou [-90, 0[
+    if angle > 45:
+        angle -= 90
+    elif angle < -45:
+        angle += 90
+    if abs(angle) < 0.1 or abs(angle) > float(max_angle):
+        return img
+
+    matrix = cv2.getRotationMatrix2D((w / 2, h / 2), angle, 1.0)
+    return cv2.warpAffine(
+        img, matrix, (w, h), dst=out, flags=cv2.INTER_LINEAR,
+        borderMode=cv2.BORDER_CONSTANT, borderValue=255,
+    )
+
+
+@stage('crop')
+def _crop(img, out, x=0, y=0, w=0, h=0, margin=20):
+    """Recadre sur un rectangle explicite, ou automatiquement sur l'encre (+ marge)."""
+    if w and h:
+        return img[int(y):int(y) + int(h), int(x):int(x) + int(w)]
+
+    _, ink = cv2.threshold(img, 0, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
+    points = cv2.findNonZero(ink)
+    if points is None:
+        return img
+    bx, by, bw, bh = cv2.boundingRect(points)
+    margin = int(margin)
+    y0, x0 = max(0, by - margin), max(0, bx - margin)
+    return img[y0:by + bh + margin, x0:bx + bw + margin]
+
+
+def _parse_value(value: str):
+    for cast in (int, float):
+        try:
+            return cast(value)
+        except ValueError:
+            pass
+    return value
+
+
+class Pipeline:
+    """Suite d'étapes de prétraitement nommées, chacune avec ses paramètres."""
+
+    def __init__(self, stages):
+        for name, _ in stages:
+            if name not in STAGES:
+                raise ValueError(
+                    f"Étape de prétraitement inconnue : '{name}' "
+                    f"(disponibles : {', '.join(sorted(STAGES))})"
+                )
+        self.stages = [(name, dict(params)) for name, params in stages]
+
+    @classmethod
+    def parse(cls, spec):
+        """Construit un pipeline depuis une description texte ou une liste.
+
+        Accepte `"gray | blur k=5 | otsu"` ou `["gray", "blur k=5", "otsu"]`.
+        """
+        if isinstance(spec, Pipeline):
+            return spec
+        parts = spec.split('|') if isinstance(spec, str) else spec
+        stages = []
+        for part in parts:
+            tokens = part.split()
+            if not tokens:
+                continue
+            params = {}
+            for token in tokens[1:]:
+                key, sep, value = token.partition('=')
+                if not sep:
+                    raise ValueError(f"Paramètre invalide '{token}' (attendu clé=valeur)")
+                params[key] = _parse_value(value)
+            stages.append((tokens[0], params))
+        return cls(stages)
+
+    def with_stage(self, name, params=None, after='gray'):
+        """Copie du pipeline avec l'étape `name` insérée après `after` (ou en tête)."""
+        names = [n for n, _ in self.stages]
+        index = names.index(after) + 1 if after in names else 0
+        stages = list(self.stages)
+        stages.insert(index, (name, params or {}))
+        return Pipeline(stages)
+
+    @property
+    def gray_input(self) -> bool:
+        """Le pipeline commence par `gray` : l'image peut être décodée directement en niveaux de gris."""
+        return bool(self.stages) and self.stages[0][0] == 'gray'
+
+    @property
+    def spec(self) -> str:
+        """Description canonique (utilisée dans les clés de cache)."""
+        parts = []
+        for name, params in self.stages:
+            parts.append(' '.join([name] + [f"{k}={v}" for k, v in sorted(params.items())]))
+        return ' | '.join(parts)
+
+    def run(self, img, timings=None):
+        """Applique les étapes à `img` et retourne l'image résultante.
+
+        Si `timings` est une liste, on y ajoute `(étape, secondes)` pour chaque étape ;
+        une `Trace` (voir trace.py) reçoit aussi les dimensions de chaque résultat.
+        """
+        current = img
+        spare = None  # tampon libre appartenant au pipeline
+
+        for name, params in self.stages:
+            fn = STAGES[name]
+            owned = not np.may_share_memory(current, img)
+            if fn.inplace and owned:
+                out = current
+            elif spare is not None and spare.shape == current.shape and spare.dtype == current.dtype:
+                out = spare
+            else:
+                out = None
+
+            if timings is None:
+                result = fn(current, out, **params)
+            else:
+                start = time.perf_counter()
+                result = fn(current, out, **params)
+                record(timings, name, time.perf_counter() - start, shape=result.shape)
+
+            if result is not current:
+                # L'ancienne image devient le tampon libre de l'étape suivante,
+                # sauf si elle appartient à l'appelant ou si le résultat en est une vue
+                reusable = owned and current.base is None and not np.may_share_memory(result, current)
+                if result is spare:
+                    spare = current if reusable else None
+                elif reusable:
+                    spare = current
+                current = result
+
+        return current
+
+    def __repr__(self):
+        return f"Pipeline({self.spec!r})"
+
+
+_parsed = {}
+
+
+def get_pipeline(spec=None, x_height=0) -> Pipeline:
+    """Pipeline correspondant à `spec` (défaut : prétraitement historique), mis en cache.
+
+    Avec `x_height`, une étape `normalize` est insérée après `gray` si le
+    pipeline n'en contient pas déjà une.
+    """
+    spec = spec or DEFAULT_PIPELINE
+    if isinstance(spec, Pipeline):
+        pipeline = spec
+    else:
+        key = spec if isinstance(spec, str) else tuple(spec)
+        if key not in _parsed:
+            _parsed[key] = Pipeline.parse(spec)
+        pipeline = _parsed[key]
+
+    if x_height and 'normalize' not in [name for name, _ in pipeline.stages]:
+        pipeline = pipeline.with_stage('normalize', {'target': x_height})
+    return pipeline
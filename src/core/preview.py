@@ -0,0 +1,91 @@
+"""
+Aperçus basse résolution pour la GUI
+- `make_thumbnail(img, max_size)` : réduction d'une image déjà décodée
+- `load_preview(path, max_size)` : aperçu décodé directement à taille réduite
+- `ThumbnailCache` : cache LRU des aperçus, invalidé par la date de modification du fichier
+
+L'aperçu d'un scan de 50 mégapixels ne demande pas de décoder l'image
+pleine résolution : les JPEG sont décodés à 1/8, 1/4 ou 1/2 (réduction dans
+la DCT), les PDF rastérisés à basse résolution. L'image pleine résolution
+n'est décodée qu'une fois, au moment de l'OCR.
+"""
+
+import os
+from collections import OrderedDict
+
+from src.core.documents import MULTIPAGE_EXTENSIONS, is_pdf, load_page, page_count
+from src.core.lazy import lazy_import
+from src.core.resolution import REDUCED_COLOR
+
+cv2 = lazy_import('cv2')
+
+# Résolution de rastérisation d'une page PDF pour l'aperçu (points par pouce)
+PREVIEW_DPI = 48
+
+
+def make_thumbnail(img, max_size=(300, 300)):
+    """Réduit `img` pour tenir dans `max_size` (largeur, hauteur) ; jamais agrandie."""
+    h, w = img.shape[:2]
+    scale = min(max_size[0] / w, max_size[1] / h, 1.0)
+    if scale == 1.0:
+        return img
+    size = (max(1, round(w * scale)), max(1, round(h * scale)))
+    return cv2.resize(img, size, interpolation=cv2.INTER_AREA)
+
+
+def load_preview(path: str, max_size=(300, 300)):
+    """Aperçu de `path` (image, TIFF multipage ou PDF : première page).
+
+    Essaie le plus grand facteur de décodage réduit dont le résultat couvre
+    encore `max_size`, puis termine la réduction avec `make_thumbnail`.
+    """
+    if is_pdf(path):
+        return make_thumbnail(load_page(path, 1, dpi=PREVIEW_DPI), max_size)
+    if path.lower().endswith(MULTIPAGE_EXTENSIONS) and page_count(path) > 1:
+        return make_thumbnail(load_page(path, 1), max_size)
+
+    img = None
+    for factor in (8, 4, 2):
+        img = cv2.imread(path, REDUCED_COLOR[factor])
+        if img is None:
+            break
+        if img.shape[1] >= max_size[0] or img.shape[0] >= max_size[1]:
+            return make_thumbnail(img, max_size)
+    img = cv2.imread(path)
+    if img is None:
+        raise FileNotFoundError(f"Impossible de lire l'image: {path}")
+    return make_thumbnail(img, max_size)
+
+
+class ThumbnailCache:
+    """Aperçus récents en mémoire, du plus ancien au plus récent (éviction LRU).
+
+    Un aperçu n'est réutilisé que si la date de modification et la taille du
+    fichier n'ont pas changé ; sinon il est recalculé et remplacé.
+    """
+
+    def __init__(self, capacity: int = 32, max_size=(300, 300)):
+        self.capacity = capacity
+        self.max_size = tuple(max_size)
+        self._items = OrderedDict()  # chemin absolu -> ((mtime, taille), aperçu)
+
+    def get(self, path: str):
+        """Aperçu de `path`, relu depuis le cache si le fichier n'a pas changé."""
+        key = os.path.abspath(path)
+        stat = os.stat(key)
+        stamp = (stat.st_mtime_ns, stat.st_size)
+
+        entry = self._items.get(key)
+        if entry is not None and entry[0] == stamp:
+            self._items.move_to_end(key)
+            return entry[1]
+
+        thumb = load_preview(key, self.max_size)
+        self._items[key] = (stamp, thumb)
+        self._items.move_to_end(key)
+        if len(self._items) > self.capacity:
+            self._items.popitem(last=False)
+        return thumb
+
+    def __len__(self):
+        return len(self._items)
@@ -0,0 +1,179 @@
+"""
+Détection de Tesseract, faite une fois puis mémorisée sur disque
+- `find_tesseract_executable()` : localise l'exécutable tesseract (PATH, chemins Windows)
+- `probe_tesseract(configured)` : {'cmd', 'version', 'langs', 'tessdata'} du Tesseract utilisable
+- `probe_cache_path()` : fichier JSON des sondes (`OCR_PROBE_CACHE` pour le déplacer)
+
+Lancer `tesseract --version` et `--list-langs` coûte plusieurs dizaines de
+millisecondes à chaque démarrage, et à chaque processus de travail du mode
+lot. Le résultat est donc écrit dans un petit fichier JSON, relu tant que
+l'exécutable (date de modification, taille) et son dossier `tessdata` n'ont
+pas changé : une mise à jour de Tesseract ou l'ajout d'une langue relance
+la sonde.
+
+Usage : python -m src.core.probe [--refresh]
+"""
+
+import json
+import os
+import platform
+import re
+import shutil
+import subprocess
+import sys
+
+# Variable d'environnement du fichier de sondes (défaut : dossier cache de l'utilisateur)
+PROBE_CACHE_ENV = 'OCR_PROBE_CACHE'
+
+# Sondes déjà faites dans ce processus : commande -> résultat
+_probed = {}
+
+
+def find_tesseract_executable():
+    """Cherche tesseract dans le PATH puis dans les chemins Windows courants."""
+    # 1) vérifier si 'tesseract' est dans le PATH
+    path = shutil.which('tesseract')
+    if path:
+        return path
+
+    # 2) chemins courants sous Windows
+    if platform.system().lower().startswith('win'):
+        common = [
+            r"C:\Program Files\Tesseract-OCR\tesseract.exe",
+            r"C:\Program Files (x86)\Tesseract-OCR\tesseract.exe",
+        ]
+        for p in common:
+            if os.path.exists(p):
+                return p
+
+    return None
+
+
+def probe_cache_path() -> str:
+    """Chemin du fichier JSON des sondes."""
+    path = os.environ.get(PROBE_CACHE_ENV)
+    if path:
+        return path
+    base = os.environ.get('LOCALAPPDATA') or os.environ.get('XDG_CACHE_HOME') \
+        or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'ocr-cv', 'tesseract_probe.json')
+
+
+def _locate(configured=None) -> str:
+    """Chemin absolu de l'exécutable : `configured` s'il existe, sinon découverte automatique."""
+    if configured:
+        found = configured if os.path.isfile(configured) else shutil.which(configured)
+        if found:
+            return os.path.abspath(found)
+    found = find_tesseract_executable()
+    if not found:
+        raise RuntimeError(
+            "Tesseract n'est pas installé ou n'est pas dans le PATH.\n"
+            "Sous Windows : installez depuis https://github.com/tesseract-ocr/tesseract et ajoutez le dossier \"Tesseract-OCR\" au PATH.\n"
+            "Sous Linux (Debian/Ubuntu) : `sudo apt install tesseract-ocr`."
+        )
+    return os.path.abspath(found)
+
+
+def _stamp(path):
+    """(date de modification, taille) de `path` ; suit les liens symboliques."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+def _run_probe(cmd: str) -> dict:
+    """Interroge l'exécutable : version et langues installées."""
+    proc = subprocess.run([cmd, '--version'], capture_output=True, text=True, errors='replace')
+    output = (proc.stdout or proc.stderr).strip()
+    version = output.splitlines()[0] if output else 'inconnue'
+
+    proc = subprocess.run([cmd, '--list-langs'], capture_output=True, text=True, errors='replace')
+    lines = (proc.stdout or proc.stderr).strip().splitlines()
+    # Première ligne : List of available languages in "/usr/share/tessdata/" (3):
+    match = re.search(r'"(.*)"', lines[0]) if lines else None
+    tessdata = match.group(1) if match else None
+    langs = sorted(line.strip() for line in lines[1:] if line.strip())
+
+    return {'cmd': cmd, 'version': version, 'langs': langs, 'tessdata': tessdata}
+
+
+def _is_fresh(entry: dict) -> bool:
+    return (entry.get('stamp') == _stamp(entry['cmd'])
+            and entry.get('tessdata_stamp') == _stamp(entry.get('tessdata') or '')
+            and entry.get('tessdata_prefix') == os.environ.get('TESSDATA_PREFIX'))
+
+
+def _read_probes(path: str) -> dict:
+    try:
+        with open(path, encoding='utf-8') as f:
+            probes = json.load(f)
+        return probes if isinstance(probes, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_probes(path: str, probes: dict):
+    # Écriture atomique : plusieurs processus peuvent sonder en même temps
+    try:
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(probes, f, indent=1)
+        os.replace(tmp, path)
+    except OSError:
+        # Dossier non accessible en écriture : la sonde sera simplement refaite
+        pass
+
+
+def probe_tesseract(configured=None, refresh: bool = False) -> dict:
+    """Description du Tesseract utilisable : commande, version, langues, dossier tessdata.
+
+    `configured` : chemin configuré (ignoré s'il n'existe pas). Le résultat
+    est relu du fichier de sondes tant que l'exécutable n'a pas changé ;
+    `refresh` force une nouvelle sonde. Lève RuntimeError si Tesseract est introuvable.
+    """
+    cmd = _locate(configured)
+    if not refresh and cmd in _probed:
+        return _probed[cmd]
+
+    path = probe_cache_path()
+    probes = _read_probes(path)
+    entry = probes.get(cmd)
+    if refresh or not entry or not _is_fresh(entry):
+        entry = _run_probe(cmd)
+        entry.update(
+            stamp=_stamp(cmd), tessdata_stamp=_stamp(entry['tessdata'] or ''),
+            tessdata_prefix=os.environ.get('TESSDATA_PREFIX'),
+        )
+        probes[cmd] = entry
+        _write_probes(path, probes)
+
+    _probed[cmd] = entry
+    return entry
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Détection de Tesseract (mémorisée sur disque)")
+    parser.add_argument('--tesseract', metavar='CHEMIN', help="exécutable tesseract à utiliser")
+    parser.add_argument('--refresh', action='store_true', help="ignore le fichier de sondes")
+    args = parser.parse_args(argv)
+
+    try:
+        info = probe_tesseract(args.tesseract, refresh=args.refresh)
+    except RuntimeError as e:
+        print("Erreur :", e, file=sys.stderr)
+        sys.exit(1)
+    print(f"Exécutable : {info['cmd']}")
+    print(f"Version    : {info['version']}")
+    print(f"Langues    : {', '.join(info['langs']) or 'aucune'}")
+    print(f"tessdata   : {info['tessdata'] or 'inconnu'}")
+    print(f"Sonde      : {probe_cache_path()}")
+
+
+if __name__ == '__main__':
+    main()
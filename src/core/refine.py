@@ -0,0 +1,82 @@
+"""
+Reprise ciblée des lignes peu sûres
+- `weak_lines(layout, threshold)` : lignes dont la confiance moyenne est inférieure au seuil
+- `refine_layout(img, layout, backend, threshold)` : relit ces lignes avec un
+  prétraitement lourd et garde, ligne par ligne, le meilleur résultat
+- `HEAVY_PIPELINE` : prétraitement des lignes reprises (débruitage, agrandissement, seuillage adaptatif)
+
+Le prétraitement léger (pipeline.py) passe sur toute la page. Seules les
+lignes faibles sont ensuite recadrées dans l'image décodée (avant
+binarisation), prétraitées lourdement et relues, toutes en un seul appel
+groupé (`recognize_layouts`, voir backends.py). Le travail supplémentaire
+suit donc la qualité de la page : rien pour une page propre, quelques
+lignes pour une page tachée. Une ligne relue ne remplace l'originale que
+si sa confiance moyenne est meilleure.
+"""
+
+import math
+import time
+
+from src.core.lazy import lazy_import
+from src.core.pipeline import get_pipeline
+from src.core.trace import record
+
+np = lazy_import('numpy')
+
+# Prétraitement des lignes reprises : le coût n'est payé que sur quelques lignes
+HEAVY_PIPELINE = "gray | denoise h=10 | resize scale=2 | adaptive block=31 c=10"
+
+# Confiance moyenne (0-100) en dessous de laquelle une ligne est reprise
+DEFAULT_THRESHOLD = 60
+
+# Marge autour d'une ligne recadrée, en fraction de sa hauteur
+LINE_MARGIN = 0.25
+
+
+def weak_lines(layout, threshold: float = DEFAULT_THRESHOLD):
+    """Indices des lignes non vides dont la confiance moyenne est inférieure à `threshold`."""
+    return np.flatnonzero(layout.line_confidence() < threshold)
+
+
+def _line_crop(img, box, factor):
+    """Rectangle (x0, y0, x1, y1) de la ligne `box` (coordonnées d'origine) dans `img`, marge comprise."""
+    x, y, w, h = (v / factor for v in box)
+    margin = max(2, int(h * LINE_MARGIN))
+    height, width = img.shape[:2]
+    return (max(0, int(x) - margin), max(0, int(y) - margin),
+            min(width, math.ceil(x + w) + margin), min(height, math.ceil(y + h) + margin))
+
+
+def refine_layout(img, layout, backend, threshold: float = DEFAULT_THRESHOLD, lang=None,
+                  timeout=None, pipeline=HEAVY_PIPELINE, factor: int = 1, timings=None, info=None):
+    """Relit les lignes faibles de `layout` et retourne le `Layout` fusionné.
+
+    `img` : image décodée, avant prétraitement (origine réduite de `factor`,
+    voir resolution.py) ; `layout` : résultat en coordonnées de l'image
+    d'origine. `info` (dict) reçoit `refine` : lignes reprises et améliorées.
+    """
+    start = time.perf_counter()
+    lines = weak_lines(layout, threshold)
+    improved = {}
+    if len(lines):
+        pipeline = get_pipeline(pipeline)
+        crops, origins = [], []
+        for line in lines:
+            x0, y0, x1, y1 = _line_crop(img, layout.line_boxes[line], factor)
+            crop = img[y0:y1, x0:x1]
+            processed = pipeline.run(crop)
+            crops.append(processed)
+            origins.append((processed.shape, crop.shape, x0, y0))
+
+        scores = layout.line_confidence()
+        for line, candidate, (processed_shape, crop_shape, x0, y0) in zip(
+                lines, backend.recognize_layouts(crops, lang, timeout), origins):
+            if len(candidate) and candidate.mean_confidence() > scores[line]:
+                # Recadrage -> image décodée -> image d'origine
+                improved[int(line)] = candidate.to_source(processed_shape, crop_shape) \
+                    .transform(factor, factor, x0, y0, size=layout.size)
+
+    if info is not None:
+        info['refine'] = {'lines': len(lines), 'improved': len(improved)}
+    record(timings, 'refine', time.perf_counter() - start, lines=len(lines), improved=len(improved))
+    return layout.replace_lines(improved) if improved else layout
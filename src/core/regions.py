@@ -0,0 +1,74 @@
+"""
+Détection des pages blanches et des zones de texte avant OCR
+- `detect_text_region(binary)` : rectangle englobant le texte, ou None si la page est blanche
+- `crop_to_text(binary)` : (image recadrée ou None, état 'blank' | 'crop' | 'full', origine (x, y))
+
+Passe rapide sur l'image binarisée (sortie de `preprocess_image`) : l'image
+est réduite à ~1000 px, puis les composantes connexes de l'encre sont
+filtrées (poussières, bords noirs de numérisation qui touchent le bord
+de l'image). Sans composante restante, la page est blanche et
+Tesseract n'est pas appelé ; sinon l'image est recadrée sur l'ensemble des
+composantes retenues, ce qui réduit d'autant le travail de Tesseract sur
+les formulaires presque vides.
+"""
+
+from src.core.lazy import lazy_import
+
+cv2 = lazy_import('cv2')
+np = lazy_import('numpy')
+
+# Part minimale de pixels d'encre (après filtrage) pour qu'une page soit non blanche
+MIN_INK = 5e-5
+
+# Recadrage appliqué seulement s'il retire au moins 10 % de la surface
+MIN_CROP_GAIN = 0.10
+
+
+def detect_text_region(binary, min_ink: float = MIN_INK, min_area: int = 4,
+                       margin: int = 20, max_side: int = 1000):
+    """Rectangle `(x, y, w, h)` englobant le texte de `binary`, ou None si la page est blanche.
+
+    `binary` : image seuillée, texte sombre sur fond clair. `min_area` est
+    l'aire minimale d'une composante dans l'image réduite, `margin` la marge
+    (en pixels de `binary`) ajoutée autour du texte.
+    """
+    h, w = binary.shape[:2]
+    scale = min(1.0, max_side / max(h, w))
+    small = cv2.resize(binary, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA) if scale < 1 else binary
+
+    # Encre = pixels assombris ; la réduction transforme les traits fins en gris
+    _, ink = cv2.threshold(small, 200, 255, cv2.THRESH_BINARY_INV)
+    if cv2.countNonZero(ink) > ink.size // 2:
+        # Texte clair sur fond sombre
+        cv2.bitwise_not(ink, dst=ink)
+
+    _, _, stats, _ = cv2.connectedComponentsWithStats(ink, connectivity=8)
+    x, y, bw, bh, area = (stats[1:, i] for i in range(5))
+    sh, sw = ink.shape
+    keep = (area >= min_area) & (x > 0) & (y > 0) & (x + bw < sw) & (y + bh < sh)
+    if not np.any(keep) or area[keep].sum() < min_ink * ink.size:
+        return None
+
+    x0 = int(x[keep].min() / scale) - margin
+    y0 = int(y[keep].min() / scale) - margin
+    x1 = int(np.ceil((x[keep] + bw[keep]).max() / scale)) + margin
+    y1 = int(np.ceil((y[keep] + bh[keep]).max() / scale)) + margin
+    x0, y0 = max(0, x0), max(0, y0)
+    x1, y1 = min(w, x1), min(h, y1)
+    return x0, y0, x1 - x0, y1 - y0
+
+
+def crop_to_text(binary, **params):
+    """Recadre `binary` sur son texte.
+
+    Retourne `(None, 'blank', (0, 0))` pour une page blanche, `(vue recadrée, 'crop', (x, y))`
+    ou `(binary, 'full', (0, 0))` si le texte occupe presque toute la page ;
+    `(x, y)` est l'origine du recadrage, pour ramener des coordonnées à la page.
+    """
+    region = detect_text_region(binary, **params)
+    if region is None:
+        return None, 'blank', (0, 0)
+    x, y, w, h = region
+    if w * h > (1 - MIN_CROP_GAIN) * binary.shape[0] * binary.shape[1]:
+        return binary, 'full', (0, 0)
+    return binary[y:y + h, x:x + w], 'crop', (x, y)
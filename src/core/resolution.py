@@ -0,0 +1,114 @@
+"""
+Normalisation de la résolution avant OCR
+- `estimate_x_height(img)` : hauteur dominante des caractères (composantes connexes)
+- `normalize_resolution(img, target)` : remet l'image à l'échelle pour viser `target` px
+- `choose_reduce_factor(path, target)` : facteur de décodage réduit pour un JPEG
+
+Le temps de Tesseract croît avec le nombre de pixels alors que sa précision
+est meilleure pour une hauteur de caractère d'environ 20 à 30 px. Une photo
+de 4000 px est donc réduite avant binarisation, et un texte minuscule
+légèrement agrandi. Pour les JPEG, OpenCV sait décoder directement à 1/2,
+1/4 ou 1/8 de la taille (mise à l'échelle dans la DCT), ce qui évite de
+décoder puis réduire l'image pleine résolution.
+"""
+
+import os
+
+from src.core.lazy import lazy_import
+
+cv2 = lazy_import('cv2')
+np = lazy_import('numpy')
+
+# Hauteur de caractère visée (pixels)
+DEFAULT_X_HEIGHT = 25
+
+# Facteurs de décodage réduit d'OpenCV et drapeaux correspondants
+# (valeurs de cv2.IMREAD_REDUCED_GRAYSCALE_N / IMREAD_REDUCED_COLOR_N : OpenCV
+# n'est ainsi pas chargé à l'import du module)
+REDUCED_GRAYSCALE = {2: 16, 4: 32, 8: 64}
+REDUCED_COLOR = {2: 17, 4: 33, 8: 65}
+
+JPEG_EXTENSIONS = ('.jpg', '.jpeg', '.jpe')
+
+
+def estimate_x_height(img, max_side: int = 2000):
+    """Estime la hauteur dominante des caractères, en pixels de `img`.
+
+    Les composantes connexes de l'encre sont filtrées (bruit, traits,
+    cadres) puis on prend la médiane de leurs hauteurs. Retourne None si
+    la page ne contient pas assez de caractères pour conclure.
+    """
+    gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY) if img.ndim == 3 else img
+    h, w = gray.shape
+    scale = min(1.0, max_side / max(h, w))
+    small = cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA) if scale < 1 else gray
+
+    _, ink = cv2.threshold(small, 0, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
+    if cv2.countNonZero(ink) > ink.size // 2:
+        # Texte clair sur fond sombre
+        cv2.bitwise_not(ink, dst=ink)
+
+    _, _, stats, _ = cv2.connectedComponentsWithStats(ink, connectivity=8)
+    widths = stats[1:, cv2.CC_STAT_WIDTH]
+    heights = stats[1:, cv2.CC_STAT_HEIGHT]
+    areas = stats[1:, cv2.CC_STAT_AREA]
+    keep = (
+        (heights >= 3) & (heights < small.shape[0] // 4)
+        & (widths >= 2) & (widths < 4 * heights) & (areas >= 6)
+    )
+    if np.count_nonzero(keep) < 10:
+        return None
+    return float(np.median(heights[keep])) / scale
+
+
+def normalize_resolution(img, target: float = DEFAULT_X_HEIGHT, min_scale: float = 0.2,
+                         max_scale: float = 3.0, tolerance: float = 0.2):
+    """Remet `img` à l'échelle pour que la hauteur des caractères approche `target`.
+
+    L'image est laissée telle quelle si l'écart est inférieur à `tolerance`
+    (20 %) ou si la hauteur ne peut pas être estimée.
+    """
+    x_height = estimate_x_height(img)
+    if not x_height:
+        return img
+
+    scale = min(max_scale, max(min_scale, target / x_height))
+    if abs(scale - 1.0) < tolerance:
+        return img
+
+    flag = cv2.INTER_AREA if scale < 1 else cv2.INTER_CUBIC
+    return cv2.resize(img, None, fx=scale, fy=scale, interpolation=flag)
+
+
+def is_jpeg(source) -> bool:
+    """`source` (chemin ou contenu encodé) est-il un JPEG ?"""
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return bytes(source[:3]) == b'\xff\xd8\xff'
+    return source.lower().endswith(JPEG_EXTENSIONS) and os.path.exists(source)
+
+
+def choose_reduce_factor(source, target: float = DEFAULT_X_HEIGHT) -> int:
+    """Plus grand facteur de décodage réduit (1, 2, 4, 8) qui garde le texte ≥ `target`.
+
+    `source` est un chemin ou le contenu encodé de l'image. Seuls les JPEG
+    en profitent vraiment : l'estimation se fait sur un décodage au 1/8,
+    quasi gratuit. Retourne 1 si `target` vaut 0.
+    """
+    if not target or not is_jpeg(source):
+        return 1
+
+    if isinstance(source, str):
+        preview = cv2.imread(source, REDUCED_GRAYSCALE[8])
+    else:
+        preview = cv2.imdecode(np.frombuffer(source, np.uint8), REDUCED_GRAYSCALE[8])
+    if preview is None:
+        return 1
+    x_height = estimate_x_height(preview)
+    if not x_height:
+        return 1
+
+    x_height *= 8
+    for factor in (8, 4, 2):
+        if x_height / factor >= target:
+            return factor
+    return 1
@@ -0,0 +1,259 @@
+"""
+Recherche plein texte dans les résultats OCR accumulés
+- `SearchIndex(path)` : index SQLite FTS5 des textes, une entrée par (image, page)
+- `fts_query(text)` : requête utilisateur -> expression FTS5 (mots, "phrases", préfixes*, OR, -exclusion)
+- `open_search_index(path)` : instance partagée par processus
+- `main()` : requêtes en ligne de commande (`python -m src.core.search index.sqlite3 "facture 2023"`)
+
+Les textes sont découpés par le tokenizer `unicode61` avec
+`remove_diacritics 2` : casse et accents ignorés, « ÉTÉ », « été » et
+« ete » se retrouvent. Les index de préfixes (2 et 3 caractères) gardent
+les recherches `fact*` rapides. Un texte relu (même image, même page)
+remplace l'ancien : l'index se met à jour au fil des lots (main.py
+--index, watch.py --index, GUI SEARCH_INDEX), sans reconstruction.
+
+Les résultats pointent vers l'image et la page d'origine (chemins absolus)
+avec un extrait où les mots trouvés sont marqués. Les plus pertinents
+(bm25) viennent en premier. Classer oblige à noter chaque page trouvée :
+pour un mot présent dans une grande partie du corpus (des centaines de
+milliers de pages), les dernières pages indexées sont données d'abord,
+ce que FTS5 lit sans parcourir toute la liste (voir utils/bench_search.py).
+"""
+
+import argparse
+import json
+import os
+import re
+import sqlite3
+import sys
+import time
+
+from src.core.documents import page_key, split_page_ref
+
+# Résultats par défaut d'une recherche
+DEFAULT_LIMIT = 20
+
+# Mots d'extrait autour des termes trouvés
+SNIPPET_WORDS = 12
+
+# Pages indexées par transaction pendant un lot
+INDEX_BATCH = 256
+
+# Au-delà de ce nombre de pages trouvées, `order='auto'` ne classe plus par pertinence
+RANK_MAX_MATCHES = 2000
+
+# Marqueurs des termes trouvés dans les extraits
+HIT_START, HIT_END = '[', ']'
+
+# Opérateurs gardés tels quels dans une requête utilisateur
+_OPERATORS = ('OR',)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS pages (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL,
+    page INTEGER NOT NULL,
+    indexed REAL NOT NULL,
+    UNIQUE (path, page)
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS texts USING fts5(
+    text,
+    tokenize = 'unicode61 remove_diacritics 2',
+    prefix = '2 3'
+);
+"""
+
+_TOKEN = re.compile(r'(-?)("[^"]*"\*?|\S+)')
+
+
+def _quote(term: str) -> str:
+    return '"' + term.replace('"', '""') + '"'
+
+
+def fts_query(text: str) -> str:
+    """Traduit une requête utilisateur en expression FTS5.
+
+    `facture été` : les deux mots ; `"bon de commande"` : phrase exacte ;
+    `fact*` : préfixe ; `facture OR devis` : l'un ou l'autre ;
+    `-brouillon` : pages sans ce mot. Les autres caractères spéciaux
+    (apostrophes, tirets internes) ne sont jamais interprétés par FTS5.
+    """
+    terms, excluded = [], []
+    for negate, token in _TOKEN.findall(text):
+        if not negate and token in _OPERATORS:
+            if terms and terms[-1] not in _OPERATORS:
+                terms.append(token)
+            continue
+        prefix = token.endswith('*')
+        word = token.rstrip('*')
+        if word.startswith('"') and word.endswith('"') and len(word) >= 2:
+            word = word[1:-1]
+        if not any(c.isalnum() for c in word):
+            continue
+        term = _quote(word) + ('*' if prefix else '')
+        (excluded if negate else terms).append(term)
+    while terms and terms[-1] in _OPERATORS:
+        terms.pop()
+    if not terms:
+        raise ValueError("Requête vide : au moins un mot à chercher (hors exclusions -mot)")
+    return ' '.join(terms) + ''.join(f' NOT {term}' for term in excluded)
+
+
+class SearchIndex:
+    """Index plein texte des pages lues : (image, page) -> texte."""
+
+    def __init__(self, path: str):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self.db = sqlite3.connect(path, timeout=30, isolation_level=None)
+        self.db.execute('PRAGMA journal_mode=WAL')
+        self.db.execute('PRAGMA synchronous=NORMAL')
+        try:
+            self.db.executescript(_SCHEMA)
+        except sqlite3.OperationalError as e:
+            raise RuntimeError(f"SQLite sans FTS5 : recherche plein texte indisponible ({e})")
+
+    def add(self, path: str, text: str, page=None):
+        """Indexe (ou réindexe) le texte d'une image ou d'une page `scan.pdf#page=3`."""
+        self.add_many([(path, page, text)])
+
+    def add_many(self, entries):
+        """Indexe des `(chemin, page, texte)` en une transaction ; `page` None : déduite du chemin."""
+        now = time.time()
+        self.db.execute('BEGIN IMMEDIATE')
+        try:
+            for path, page, text in entries:
+                path, page = page_key(path, page)
+                row = self.db.execute('SELECT id FROM pages WHERE path = ? AND page = ?', (path, page)).fetchone()
+                if row is None:
+                    row_id = self.db.execute('INSERT INTO pages (path, page, indexed) VALUES (?, ?, ?)',
+                                             (path, page, now)).lastrowid
+                else:
+                    row_id = row[0]
+                    self.db.execute('UPDATE pages SET indexed = ? WHERE id = ?', (now, row_id))
+                    self.db.execute('DELETE FROM texts WHERE rowid = ?', (row_id,))
+                self.db.execute('INSERT INTO texts (rowid, text) VALUES (?, ?)', (row_id, text))
+        except BaseException:
+            self.db.execute('ROLLBACK')
+            raise
+        self.db.execute('COMMIT')
+
+    def remove(self, path: str):
+        """Retire toutes les pages de `path` de l'index."""
+        path = os.path.abspath(split_page_ref(path)[0])
+        self.db.execute('BEGIN IMMEDIATE')
+        try:
+            self.db.execute('DELETE FROM texts WHERE rowid IN (SELECT id FROM pages WHERE path = ?)', (path,))
+            self.db.execute('DELETE FROM pages WHERE path = ?', (path,))
+        except BaseException:
+            self.db.execute('ROLLBACK')
+            raise
+        self.db.execute('COMMIT')
+
+    def search(self, query: str, limit: int = DEFAULT_LIMIT, offset: int = 0, order: str = 'auto') -> list:
+        """Pages correspondant à `query` (syntaxe de `fts_query`).
+
+        Chaque résultat : `{'path', 'page', 'snippet', 'score'}`.
+        `order='rank'` : pertinence bm25 (toutes les pages trouvées sont
+        notées) ; `'recent'` : dernières pages indexées d'abord (`score`
+        None, lecture paresseuse de l'index) ; `'auto'` : pertinence, sauf
+        si la requête trouve plus de RANK_MAX_MATCHES pages.
+        """
+        expression = fts_query(query)
+        if order == 'auto':
+            # Lecture des identifiants seulement, arrêtée au seuil : ~1 ms
+            crowded = self.db.execute('SELECT rowid FROM texts WHERE texts MATCH ? LIMIT 1 OFFSET ?',
+                                      (expression, RANK_MAX_MATCHES)).fetchone()
+            order = 'recent' if crowded else 'rank'
+        if order == 'rank':
+            score, ordering = 'bm25(texts)', 'ORDER BY rank'
+        elif order == 'recent':
+            score, ordering = 'NULL', 'ORDER BY texts.rowid DESC'
+        else:
+            raise ValueError(f"Ordre inconnu : {order} (choix : auto, rank, recent)")
+        rows = self.db.execute(
+            f"SELECT p.path, p.page, snippet(texts, 0, ?, ?, '…', ?), {score} "
+            f"FROM texts JOIN pages p ON p.id = texts.rowid WHERE texts MATCH ? {ordering} LIMIT ? OFFSET ?",
+            (HIT_START, HIT_END, SNIPPET_WORDS, expression, limit, offset),
+        )
+        return [{'path': path, 'page': page, 'snippet': snippet, 'score': None if score is None else -score}
+                for path, page, snippet, score in rows]
+
+    def count(self, query: str) -> int:
+        """Nombre de pages correspondant à `query`."""
+        return self.db.execute('SELECT COUNT(*) FROM texts WHERE texts MATCH ?', (fts_query(query),)).fetchone()[0]
+
+    def text(self, path: str, page=None):
+        """Texte indexé d'une page, ou None."""
+        row = self.db.execute(
+            'SELECT t.text FROM pages p JOIN texts t ON t.rowid = p.id WHERE p.path = ? AND p.page = ?',
+            page_key(path, page),
+        ).fetchone()
+        return row[0] if row else None
+
+    def optimize(self):
+        """Fusionne les segments de l'index FTS5 (après un gros import)."""
+        self.db.execute("INSERT INTO texts (texts) VALUES ('optimize')")
+
+    def __len__(self):
+        return self.db.execute('SELECT COUNT(*) FROM pages').fetchone()[0]
+
+    def close(self):
+        self.db.close()
+
+
+# Une instance par (processus, fichier), comme le cache de résultats
+_instances = {}
+
+
+def open_search_index(path: str) -> SearchIndex:
+    """Retourne l'index du processus courant pour `path`."""
+    key = (os.getpid(), os.path.abspath(path))
+    if key not in _instances:
+        _instances[key] = SearchIndex(path)
+    return _instances[key]
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Recherche dans les textes OCR indexés (--index de main.py)")
+    parser.add_argument('index', help="fichier de l'index (SQLite)")
+    parser.add_argument('query', nargs='+',
+                        help='mots (accents et casse ignorés), "phrase exacte", préfixe*, OR, -exclusion')
+    parser.add_argument('-n', '--limit', type=int, default=DEFAULT_LIMIT, help="nombre de résultats")
+    parser.add_argument('--offset', type=int, default=0, help="résultats à sauter (pagination)")
+    parser.add_argument('--order', choices=('auto', 'rank', 'recent'), default='auto',
+                        help="'rank' : plus pertinentes d'abord ; 'recent' : dernières pages indexées d'abord ; "
+                             f"'auto' : 'rank' sauf au-delà de {RANK_MAX_MATCHES} pages trouvées")
+    parser.add_argument('--count', action='store_true', help="afficher seulement le nombre de pages trouvées")
+    parser.add_argument('--json', action='store_true', help="un objet JSON par résultat")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if not os.path.exists(args.index):
+        print(f"Index introuvable : {args.index}", file=sys.stderr)
+        sys.exit(2)
+    index = SearchIndex(args.index)
+    query = ' '.join(args.query)
+    start = time.perf_counter()
+    try:
+        if args.count:
+            print(index.count(query))
+            return
+        results = index.search(query, args.limit, args.offset, args.order)
+    except (ValueError, sqlite3.OperationalError) as e:
+        print(f"Requête invalide : {e}", file=sys.stderr)
+        sys.exit(2)
+    elapsed = time.perf_counter() - start
+
+    for result in results:
+        if args.json:
+            print(json.dumps(result, ensure_ascii=False))
+        else:
+            print(f"{result['path']} (page {result['page']})\n    {' '.join(result['snippet'].split())}")
+    print(f"{len(results)} résultat(s) en {elapsed * 1000:.1f} ms", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,322 @@
+"""
+Service OCR local (HTTP, asyncio, bibliothèque standard uniquement)
+- `POST /ocr` : image brute (Content-Type image/*) ou formulaire multipart
+- `GET /health` : état du service (file d'attente, processus, requêtes servies)
+
+Les requêtes sont placées dans une file bornée servie par un pool de
+processus OCR. File pleine : réponse 429 immédiate (avec Retry-After) au
+lieu d'accumuler du retard ; pool indisponible : 503 ; délai dépassé : 504.
+Chaque réponse porte les temps d'attente et de traitement en en-têtes
+(`X-Queue-Time-Ms`, `X-Process-Time-Ms`, `X-Total-Time-Ms`, `Server-Timing`).
+
+Lancement : python -m src.core.service --port 8080 -j 4 --queue 64
+Exemple   : curl --data-binary @page.png -H "Content-Type: image/png" localhost:8080/ocr
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from email.parser import BytesParser
+from email.policy import default as email_policy
+from http import HTTPStatus
+from urllib.parse import parse_qs, urlsplit
+
+from src.core.backends import ENGINES
+from src.core.batch import default_workers
+from src.core.engine import TRANSPORTS
+from src.core.pipeline import get_pipeline
+from src.core.stream import ocr_item
+
+# Taille maximale d'une image envoyée (octets)
+MAX_BODY = 50 * 1024 * 1024
+
+# Délai de lecture de l'en-tête et du corps d'une requête (secondes)
+READ_TIMEOUT = 30
+
+
+class Job:
+    """Une requête OCR en attente dans la file."""
+
+    def __init__(self, data: bytes, options: dict):
+        self.data = data
+        self.options = options
+        self.future = asyncio.get_running_loop().create_future()
+        self.enqueued = time.perf_counter()
+        self.started = None
+        self.abandoned = False
+
+
+class OCRService:
+    """File d'attente bornée + pool de processus OCR derrière un serveur HTTP minimal."""
+
+    def __init__(self, workers=None, max_queue=64, timeout=60.0, options=None):
+        self.workers = workers or default_workers()
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self.options = options or {}
+        self.pool = None
+        self.queue = None
+        self.served = 0
+        self.rejected = 0
+        self.broken = False
+
+    async def start(self, host='127.0.0.1', port=8080):
+        self.pool = ProcessPoolExecutor(max_workers=self.workers)
+        self.queue = asyncio.Queue(self.max_queue)
+        # Un consommateur par processus : la file absorbe les pointes
+        self.consumers = [asyncio.create_task(self._consume()) for _ in range(self.workers)]
+        self.server = await asyncio.start_server(self._handle, host, port)
+        return self.server
+
+    async def stop(self):
+        self.server.close()
+        await self.server.wait_closed()
+        for task in self.consumers:
+            task.cancel()
+        self.pool.shutdown(wait=False, cancel_futures=True)
+
+    # ------------------------------------------------------------------
+    # Traitement
+    # ------------------------------------------------------------------
+
+    async def _consume(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            job = await self.queue.get()
+            try:
+                job.started = time.perf_counter()
+                remaining = self.timeout - (job.started - job.enqueued)
+                if job.abandoned or remaining <= 0:
+                    # Le client a reçu (ou va recevoir) un 504 : inutile d'occuper un processus
+                    continue
+                # Tesseract tué à l'échéance de la requête : le processus se libère avec le 504
+                options = dict(job.options, timeout=min(job.options.get('timeout') or remaining, remaining))
+                item = {'data': job.data}
+                result = await loop.run_in_executor(self.pool, ocr_item, item, options)
+                if not job.future.done():
+                    job.future.set_result(result)
+            except BrokenProcessPool as e:
+                self.broken = True
+                if not job.future.done():
+                    job.future.set_exception(e)
+            except Exception as e:
+                if not job.future.done():
+                    job.future.set_exception(e)
+            finally:
+                self.queue.task_done()
+
+    async def _ocr(self, data: bytes, options: dict):
+        """Place une image dans la file et attend le résultat. Retourne (statut, corps, en-têtes)."""
+        if self.broken:
+            return 503, {'error': "Pool de processus OCR indisponible"}, {}
+
+        job = Job(data, options)
+        try:
+            self.queue.put_nowait(job)
+        except asyncio.QueueFull:
+            self.rejected += 1
+            return 429, {'error': "File d'attente pleine, réessayez plus tard"}, {'Retry-After': '1'}
+
+        try:
+            result = await asyncio.wait_for(asyncio.shield(job.future), self.timeout)
+        except asyncio.TimeoutError:
+            job.abandoned = True
+            return 504, {'error': f"Délai de {self.timeout:g} s dépassé"}, {}
+        except BrokenProcessPool:
+            return 503, {'error': "Pool de processus OCR indisponible"}, {}
+
+        self.served += 1
+        done = time.perf_counter()
+        queue_ms = 1000 * (job.started - job.enqueued)
+        process_ms = 1000 * (done - job.started)
+        headers = {
+            'X-Queue-Time-Ms': f"{queue_ms:.1f}",
+            'X-Process-Time-Ms': f"{process_ms:.1f}",
+            'X-Total-Time-Ms': f"{1000 * (done - job.enqueued):.1f}",
+            'Server-Timing': f"queue;dur={queue_ms:.1f}, ocr;dur={process_ms:.1f}",
+        }
+        # Les champs id/path du mode flux n'ont pas de sens pour une image envoyée
+        result.pop('id', None)
+        result.pop('path', None)
+        status = 200 if not result['error'] else 422
+        return status, result, headers
+
+    def health(self) -> dict:
+        return {
+            'status': 'degraded' if self.broken else 'ok',
+            'workers': self.workers,
+            'queue': self.queue.qsize(),
+            'max_queue': self.max_queue,
+            'served': self.served,
+            'rejected': self.rejected,
+        }
+
+    # ------------------------------------------------------------------
+    # HTTP
+    # ------------------------------------------------------------------
+
+    async def _handle(self, reader, writer):
+        start = time.perf_counter()
+        try:
+            try:
+                method, target, headers, body = await asyncio.wait_for(
+                    _read_request(reader), READ_TIMEOUT)
+            except asyncio.TimeoutError:
+                status, payload, extra = 408, {'error': "Requête trop lente"}, {}
+            except _HTTPError as e:
+                status, payload, extra = e.status, {'error': e.message}, {}
+            else:
+                status, payload, extra = await self._route(method, target, headers, body)
+
+            extra.setdefault('X-Total-Time-Ms', f"{1000 * (time.perf_counter() - start):.1f}")
+            writer.write(_response(status, payload, extra))
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def _route(self, method, target, headers, body):
+        url = urlsplit(target)
+        if url.path == '/health' and method == 'GET':
+            payload = self.health()
+            return (503 if self.broken else 200), payload, {}
+
+        if url.path == '/ocr':
+            if method != 'POST':
+                return 405, {'error': "Méthode non autorisée (POST attendu)"}, {'Allow': 'POST'}
+            try:
+                data = _extract_image(headers, body)
+            except ValueError as e:
+                return 400, {'error': str(e)}, {}
+
+            # Paramètres de requête : ?lang=fra&pipeline=...
+            options = dict(self.options)
+            query = parse_qs(url.query)
+            for name in ('lang', 'pipeline'):
+                if name in query:
+                    options[name] = query[name][0]
+            return await self._ocr(data, options)
+
+        return 404, {'error': f"Ressource inconnue : {url.path}"}, {}
+
+
+class _HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+async def _read_request(reader):
+    """Lit une requête HTTP/1.1 : (méthode, cible, en-têtes, corps)."""
+    line = await reader.readline()
+    parts = line.decode('latin-1').split()
+    if len(parts) != 3:
+        raise _HTTPError(400, "Ligne de requête invalide")
+    method, target, _ = parts
+
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+
+    try:
+        length = int(headers.get('content-length') or 0)
+    except ValueError:
+        raise _HTTPError(400, "En-tête Content-Length invalide")
+    if length < 0:
+        raise _HTTPError(400, "En-tête Content-Length invalide")
+    if length > MAX_BODY:
+        raise _HTTPError(413, f"Image trop volumineuse (max {MAX_BODY // (1024 * 1024)} Mo)")
+    try:
+        body = await reader.readexactly(length) if length else b''
+    except asyncio.IncompleteReadError as e:
+        raise _HTTPError(400, f"Corps de requête tronqué ({len(e.partial)} octet(s) sur {length})")
+    return method.upper(), target, headers, body
+
+
+def _extract_image(headers: dict, body: bytes) -> bytes:
+    """Contenu de l'image : corps brut ou premier fichier d'un formulaire multipart."""
+    ctype = headers.get('content-type', '')
+    if ctype.startswith('multipart/form-data'):
+        message = BytesParser(policy=email_policy).parsebytes(
+            f"Content-Type: {ctype}\r\n\r\n".encode('latin-1') + body)
+        for part in message.iter_parts():
+            if part.get_filename() or part.get_param('name', header='content-disposition') in ('image', 'file'):
+                body = part.get_payload(decode=True) or b''
+                break
+        else:
+            raise ValueError("Aucun fichier dans le formulaire (champ 'image' ou 'file')")
+    if not body:
+        raise ValueError("Corps de requête vide : envoyez une image")
+    return body
+
+
+def _response(status: int, payload: dict, headers: dict) -> bytes:
+    body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+    lines = [f"HTTP/1.1 {status} {HTTPStatus(status).phrase}"]
+    headers = {
+        'Content-Type': 'application/json; charset=utf-8',
+        'Content-Length': str(len(body)),
+        'Connection': 'close',
+        **headers,
+    }
+    lines += [f"{name}: {value}" for name, value in headers.items()]
+    return ('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1') + body
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Service OCR local (HTTP)")
+    parser.add_argument('--host', default='127.0.0.1', help="adresse d'écoute (défaut : 127.0.0.1)")
+    parser.add_argument('--port', type=int, default=8080, help="port d'écoute (défaut : 8080)")
+    parser.add_argument('-j', '--workers', type=int, default=None,
+                        help="processus OCR (défaut : nombre de cœurs)")
+    parser.add_argument('--queue', type=int, default=64,
+                        help="taille maximale de la file d'attente (au-delà : 429)")
+    parser.add_argument('--timeout', type=float, default=60.0,
+                        help="délai maximal par requête en secondes (au-delà : 504)")
+    parser.add_argument('-l', '--lang', default=None, help="langue(s) Tesseract par défaut")
+    parser.add_argument('--pipeline', default=None, help="prétraitement par défaut (voir pipeline.py)")
+    parser.add_argument('--engine', choices=ENGINES, default='auto',
+                        help="moteur OCR (défaut : tesserocr s'il est installé, sinon l'exécutable)")
+    parser.add_argument('--transport', choices=TRANSPORTS, default='pipe',
+                        help="transport vers Tesseract (défaut : pipe, sans fichier temporaire)")
+    parser.add_argument('--cache', default=None, metavar='DOSSIER', help="dossier du cache des résultats")
+    return parser.parse_args(argv)
+
+
+async def serve(args):
+    get_pipeline(args.pipeline)
+    options = {'lang': args.lang, 'pipeline': args.pipeline, 'engine': args.engine, 'transport': args.transport}
+    if args.cache:
+        options['cache_dir'] = args.cache
+
+    service = OCRService(args.workers, args.queue, args.timeout, options)
+    server = await service.start(args.host, args.port)
+    print(f"Service OCR sur http://{args.host}:{args.port} "
+          f"({service.workers} processus, file de {args.queue})", file=sys.stderr)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await service.stop()
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        print("Arrêt du service.", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
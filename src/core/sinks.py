@@ -0,0 +1,310 @@
+"""
+Destinations des résultats OCR (« sorties »)
+- `TextDirSink` : un fichier `<nom>_ocr.txt` par image (et .hocr, .alto.xml, .json demandés), comportement historique ;
+  avec `base`, les sous-dossiers des images sont reproduits (voir `output_stem`)
+- `JsonlSink` : un fichier JSON Lines en ajout seul, une ligne par page
+- `SQLiteSink` : une base SQLite, une ligne par page (table `results`, formats structurés dans `exports`)
+- `parse_sink(spec)` / `open_sink(spec, output_dir, formats, base)` : `dir`, `jsonl[:FICHIER]`, `sqlite[:FICHIER]`
+
+Sur un partage réseau, créer et fermer un petit fichier par image coûte
+plus que l'OCR lui-même (une série d'aller-retours de métadonnées par
+fichier). JSONL et SQLite regroupent les résultats : SINK_BATCH pages par
+écriture (JSONL, un seul `write` en mode ajout) ou par transaction (SQLite).
+
+Une page est identifiée par (chemin absolu, numéro de page) : `written()`
+donne celles déjà présentes, que le mode lot ne relit pas (reprise après
+un arrêt brutal). Une ligne JSONL tronquée par un arrêt en cours
+d'écriture est retirée à l'ouverture ; une transaction SQLite interrompue
+est annulée par SQLite. Plusieurs processus peuvent écrire dans la même
+sortie : verrou `flock` autour de chaque ajout JSONL (les pages ajoutées
+entre-temps par un autre processus ne sont pas réécrites), `BEGIN
+IMMEDIATE` pour SQLite.
+"""
+
+import json
+import os
+import sqlite3
+import time
+import zlib
+
+from src.core.documents import output_stem, page_key, page_ref
+from src.core.export import FORMATS, export
+
+try:
+    import fcntl
+except ImportError:  # Windows : pas de verrou entre processus, un seul écrivain par fichier
+    fcntl = None
+
+# Pages écrites par ajout (JSONL) ou par transaction (SQLite)
+SINK_BATCH = 256
+
+# Types de sortie et nom du fichier par défaut (dans le dossier de sortie)
+SINKS = {'dir': None, 'jsonl': 'ocr_results.jsonl', 'sqlite': 'ocr_results.sqlite3'}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    path TEXT NOT NULL,
+    page INTEGER NOT NULL,
+    text TEXT NOT NULL,
+    written REAL NOT NULL,
+    PRIMARY KEY (path, page)
+);
+CREATE TABLE IF NOT EXISTS exports (
+    path TEXT NOT NULL,
+    page INTEGER NOT NULL,
+    format TEXT NOT NULL,
+    content TEXT NOT NULL,
+    PRIMARY KEY (path, page, format)
+);
+"""
+
+
+def parse_sink(spec: str):
+    """`'jsonl'` -> `('jsonl', None)` ; `'sqlite:res.db'` -> `('sqlite', 'res.db')`."""
+    kind, _, path = spec.partition(':')
+    kind = kind.strip().lower()
+    if kind not in SINKS or (kind == 'dir' and path):
+        raise ValueError(f"Sortie invalide : {spec!r} (choix : dir, jsonl[:FICHIER], sqlite[:FICHIER])")
+    return kind, path or None
+
+
+def _exports(path: str, layout, formats) -> dict:
+    """Formats structurés demandés (hors 'txt'), construits depuis `layout` (voir export.py)."""
+    return {fmt: export(layout, fmt, path) for fmt in formats if fmt != 'txt'}
+
+
+class Sink:
+    """Sortie de résultats : `write` par page, `flush` par lot, `close` à la fin."""
+
+    # Fichier (JSONL, SQLite) ou dossier (texte) écrit
+    path = None
+
+    def written(self) -> set:
+        """Pages (chemin absolu, numéro) déjà présentes dans la sortie."""
+        return set()
+
+    def write(self, path: str, text: str, layout=None, page=None) -> list:
+        """Ajoute le résultat de `path` (ou de sa page `page`) ; retourne les destinations."""
+        raise NotImplementedError
+
+    def remove(self, path: str):
+        """Oublie les pages de `path` (fichier modifié, relu en entier)."""
+
+    def flush(self):
+        """Écrit les résultats en attente."""
+
+    def close(self):
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class TextDirSink(Sink):
+    """Un fichier par image et par format dans `directory` (nommage de `output_stem`).
+
+    `base` : dossier des images dont les sous-dossiers sont reproduits sous `directory`.
+    """
+
+    def __init__(self, directory: str, formats=('txt',), base=None):
+        os.makedirs(directory, exist_ok=True)
+        self.path = directory
+        self.formats = formats
+        self.base = base
+
+    def write(self, path, text, layout=None, page=None):
+        ref = page_ref(path, page) if page else path
+        stem = os.path.join(self.path, output_stem(ref, self.base))
+        os.makedirs(os.path.dirname(stem) or '.', exist_ok=True)
+        paths = []
+        for fmt in self.formats:
+            suffix = '_ocr.txt' if fmt == 'txt' else FORMATS[fmt]
+            content = text if fmt == 'txt' else export(layout, fmt, ref)
+            out_path = stem + suffix
+            with open(out_path, 'w', encoding='utf-8') as f:
+                f.write(content)
+            paths.append(out_path)
+        return paths
+
+
+class JsonlSink(Sink):
+    """Fichier JSON Lines en ajout seul : `{"path", "page", "text", "time"[, "hocr", "alto", "json"]}` par ligne.
+
+    Une page déjà présente n'est pas réécrite. Après `remove(path)`
+    (fichier modifié), une page de `path` est de nouveau ajoutée si son
+    texte a changé : la dernière ligne d'une page l'emporte.
+    """
+
+    def __init__(self, path: str, formats=('txt',)):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self.formats = formats
+        self.keys = {}  # page -> CRC du texte de sa dernière ligne dans le fichier
+        self.pending = []  # (page, CRC, ligne encodée) en attente d'ajout
+        self.queued = {}  # page -> CRC des lignes en attente
+        self.replaced = set()  # chemins dont les pages peuvent être remplacées (`remove`)
+        self.offset = 0  # octets du fichier déjà lus
+        self.fd = os.open(path, os.O_RDWR | os.O_APPEND | os.O_CREAT, 0o644)
+        self._lock()
+        try:
+            self._scan()
+        finally:
+            self._unlock()
+
+    def _lock(self):
+        if fcntl:
+            fcntl.flock(self.fd, fcntl.LOCK_EX)
+
+    def _unlock(self):
+        if fcntl:
+            fcntl.flock(self.fd, fcntl.LOCK_UN)
+
+    def _scan(self) -> dict:
+        """Lit les lignes ajoutées depuis `offset` (verrou tenu), coupe une dernière ligne tronquée.
+
+        Retourne les pages lues : {page: CRC}.
+        """
+        seen = {}
+        with open(self.path, 'rb') as f:
+            f.seek(self.offset)
+            for line in f:
+                if not line.endswith(b'\n'):
+                    # Dernière ligne incomplète (arrêt pendant un ajout) : retirée, sa page sera relue
+                    os.ftruncate(self.fd, self.offset)
+                    break
+                self.offset += len(line)
+                try:
+                    record = json.loads(line)
+                    seen[(record['path'], record['page'])] = zlib.crc32(record['text'].encode('utf-8'))
+                except (ValueError, KeyError, TypeError, AttributeError):
+                    continue  # ligne illisible : ignorée, la page sera relue
+        self.keys.update(seen)
+        return seen
+
+    def _present(self, key, crc, known) -> bool:
+        return known is not None and (known == crc or key[0] not in self.replaced)
+
+    def written(self):
+        return set(self.keys) | set(self.queued)
+
+    def write(self, path, text, layout=None, page=None):
+        key = page_key(path, page)
+        crc = zlib.crc32(text.encode('utf-8'))
+        if self._present(key, crc, self.queued.get(key, self.keys.get(key))):
+            return []
+        record = {'path': key[0], 'page': key[1], 'text': text, 'time': round(time.time(), 3)}
+        for fmt, content in _exports(path, layout, self.formats).items():
+            record[fmt] = json.loads(content) if fmt == 'json' else content
+        self.queued[key] = crc
+        self.pending.append((key, crc, json.dumps(record, ensure_ascii=False).encode('utf-8') + b'\n'))
+        if len(self.pending) >= SINK_BATCH:
+            self.flush()
+        return [self.path]
+
+    def remove(self, path):
+        self.flush()
+        self.replaced.add(page_key(path)[0])
+
+    def flush(self):
+        if not self.pending:
+            return
+        pending, self.pending, self.queued = self.pending, [], {}
+        self._lock()
+        try:
+            # Pages ajoutées entre-temps par un autre processus : pas de doublon
+            seen = self._scan()
+            lines = []
+            for key, crc, line in pending:
+                if not self._present(key, crc, seen.get(key)):
+                    lines.append(line)
+                    self.keys[key] = crc
+            data = b''.join(lines)
+            while data:
+                data = data[os.write(self.fd, data):]
+            self.offset = os.fstat(self.fd).st_size
+        finally:
+            self._unlock()
+
+    def close(self):
+        self.flush()
+        os.close(self.fd)
+
+
+class SQLiteSink(Sink):
+    """Base SQLite : `results(path, page, text, written)` et `exports(path, page, format, content)`.
+
+    Une page réécrite remplace la précédente (clé primaire `(path, page)`).
+    """
+
+    def __init__(self, path: str, formats=('txt',)):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self.formats = formats
+        self.pending = []  # (chemin, page, texte, {format: contenu})
+        self.db = sqlite3.connect(path, timeout=30, isolation_level=None)
+        # Journal classique plutôt que WAL : la base peut être sur un partage réseau,
+        # où la mémoire partagée du WAL n'est pas disponible
+        self.db.execute('PRAGMA synchronous=NORMAL')
+        self.db.executescript(_SCHEMA)
+
+    def written(self):
+        return set(self.db.execute('SELECT path, page FROM results'))
+
+    def write(self, path, text, layout=None, page=None):
+        path_key, page = page_key(path, page)
+        self.pending.append((path_key, page, text, _exports(path, layout, self.formats)))
+        if len(self.pending) >= SINK_BATCH:
+            self.flush()
+        return [self.path]
+
+    def remove(self, path):
+        self.flush()
+        path = page_key(path)[0]
+        self.db.execute('BEGIN IMMEDIATE')
+        try:
+            self.db.execute('DELETE FROM results WHERE path = ?', (path,))
+            self.db.execute('DELETE FROM exports WHERE path = ?', (path,))
+        except BaseException:
+            self.db.execute('ROLLBACK')
+            raise
+        self.db.execute('COMMIT')
+
+    def flush(self):
+        if not self.pending:
+            return
+        pending, self.pending = self.pending, []
+        now = time.time()
+        self.db.execute('BEGIN IMMEDIATE')
+        try:
+            self.db.executemany(
+                'INSERT OR REPLACE INTO results (path, page, text, written) VALUES (?, ?, ?, ?)',
+                [(path, page, text, now) for path, page, text, _ in pending],
+            )
+            self.db.executemany(
+                'INSERT OR REPLACE INTO exports (path, page, format, content) VALUES (?, ?, ?, ?)',
+                [(path, page, fmt, content) for path, page, _, exports in pending
+                 for fmt, content in exports.items()],
+            )
+        except BaseException:
+            self.db.execute('ROLLBACK')
+            raise
+        self.db.execute('COMMIT')
+
+    def close(self):
+        self.flush()
+        self.db.close()
+
+
+def open_sink(spec='dir', output_dir: str = '.', formats=('txt',), base=None) -> Sink:
+    """Ouvre la sortie décrite par `spec` (voir `parse_sink`) ; fichier par défaut dans `output_dir`.
+
+    `base` : voir `TextDirSink` (les autres sorties identifient les pages par chemin absolu).
+    """
+    kind, path = parse_sink(spec or 'dir')
+    if kind == 'dir':
+        return TextDirSink(output_dir, formats, base)
+    path = path or os.path.join(output_dir, SINKS[kind])
+    return (JsonlSink if kind == 'jsonl' else SQLiteSink)(path, formats)
@@ -0,0 +1,140 @@
+"""
+Mode flux JSONL pour l'intégration dans des pipelines
+- `parse_line(line)` : une ligne d'entrée → élément à traiter
+- `ocr_item(item, options)` : OCR d'un élément, résultat sérialisable en JSON
+- `run_stream(lines, out, workers, window, options)` : traitement avec fenêtre bornée
+
+Chaque ligne lue sur l'entrée standard est :
+- un chemin d'image : `scans/page1.png`
+- un contenu base64 : `base64:iVBORw0KGgo...`
+- un objet JSON : `{"id": "42", "path": "..."}` ou `{"id": "42", "b64": "..."}`
+
+Un objet JSON par résultat est écrit sur la sortie standard dès qu'il est
+prêt (ordre d'achèvement, champ `seq` = numéro de ligne d'entrée). Au plus
+`window` éléments sont en cours à la fois : la mémoire reste constante quelle
+que soit la longueur du flux, et la lecture de l'entrée se met en pause
+lorsque les processus de travail sont saturés.
+"""
+
+import base64
+import json
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+
+def parse_line(line: str):
+    """Convertit une ligne d'entrée en élément `{'id', 'path'}` ou `{'id', 'b64'}`.
+
+    Retourne None pour une ligne vide.
+    """
+    line = line.strip()
+    if not line:
+        return None
+    if line.startswith('{'):
+        item = json.loads(line)
+        if 'path' not in item and 'b64' not in item:
+            raise ValueError("objet JSON sans champ 'path' ni 'b64'")
+        return item
+    if line.startswith('base64:'):
+        return {'b64': line[len('base64:'):]}
+    return {'path': line}
+
+
+def ocr_item(item: dict, options=None) -> dict:
+    """OCR d'un élément du flux ; ne lève jamais d'exception.
+
+    L'élément fournit `path`, `b64` (contenu en base64) ou `data` (octets bruts).
+    Avec l'option `layout`, le résultat contient aussi `layout` (colonnes de
+    `Layout.to_dict`, voir layout.py).
+    """
+    # Import tardif : main.py importe ce module
+    from src.core.main import extract_text_from_image
+
+    result = {'id': item.get('id'), 'path': item.get('path'), 'text': '', 'error': None}
+    timings = []
+    info = {}
+    start = time.perf_counter()
+    try:
+        if 'path' in item:
+            source = item['path']
+        elif 'data' in item:
+            source = item['data']
+        else:
+            source = base64.b64decode(item['b64'], validate=True)
+        result['text'] = extract_text_from_image(source, timings=timings, info=info, **(options or {}))
+        if 'layout' in info:
+            result['layout'] = info['layout'].to_dict()
+        if 'duplicate' in info:
+            result['duplicate'] = info['duplicate']
+    except Exception as e:
+        result['error'] = str(e)
+
+    result['timings'] = {name: round(seconds, 6) for name, seconds in timings}
+    result['timings']['total'] = round(time.perf_counter() - start, 6)
+    return result
+
+
+def run_stream(lines, out, workers: int, window: int = 0, options=None) -> int:
+    """Traite les lignes de `lines` et écrit un objet JSON par ligne dans `out`.
+
+    `window` (défaut : 2 × workers) borne le nombre d'éléments en cours.
+    Si un processus de travail meurt (mémoire, signal...), les éléments en
+    cours reçoivent une erreur et le flux continue sur un nouveau pool.
+    Retourne le nombre de résultats écrits.
+    """
+    window = window or 2 * workers
+    slots = threading.BoundedSemaphore(window)
+    lock = threading.Lock()
+    written = [0]
+
+    def emit(record):
+        with lock:
+            out.write(json.dumps(record, ensure_ascii=False) + '\n')
+            out.flush()
+            written[0] += 1
+
+    def on_done(seq, item, future):
+        try:
+            record = future.result()
+        except Exception as e:
+            # Processus de travail mort : l'erreur reste attachée à l'élément
+            record = {'id': item.get('id'), 'path': item.get('path'), 'text': '', 'error': str(e)}
+        record['seq'] = seq
+        emit(record)
+        slots.release()
+
+    def submit(seq, item):
+        future = pool.submit(ocr_item, item, options)
+        future.add_done_callback(lambda f, seq=seq, item=item: on_done(seq, item, f))
+
+    pool = ProcessPoolExecutor(max_workers=workers)
+    try:
+        for seq, line in enumerate(lines):
+            try:
+                item = parse_line(line)
+            except ValueError as e:
+                emit({'seq': seq, 'id': None, 'path': None, 'text': '', 'error': f"Ligne invalide : {e}"})
+                continue
+            if item is None:
+                continue
+
+            # Attendre une place libre dans la fenêtre avant de lire la suite
+            slots.acquire()
+            try:
+                submit(seq, item)
+            except BrokenProcessPool:
+                # Pool cassé par un élément précédent (déjà en erreur) : nouveau pool,
+                # l'élément courant n'y est pour rien et lui est soumis
+                pool.shutdown(wait=False)
+                pool = ProcessPoolExecutor(max_workers=workers)
+                try:
+                    submit(seq, item)
+                except BrokenProcessPool as e:
+                    emit({'seq': seq, 'id': item.get('id'), 'path': item.get('path'), 'text': '', 'error': str(e)})
+                    slots.release()
+    finally:
+        pool.shutdown(wait=True)
+
+    return written[0]
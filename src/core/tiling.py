@@ -0,0 +1,150 @@
+"""
+OCR par bandes pour les très grandes images
+- `find_cuts(binary, tile_height)` : positions de découpe dans les blancs entre lignes
+- `tile_bounds(binary, tile_height, overlap)` : ordonnées (haut, bas) de chaque bande
+- `split_tiles(binary, tile_height, overlap)` : bandes horizontales (avec recouvrement si besoin)
+- `stitch_texts(texts, overlaps)` : recolle les textes en supprimant les lignes lues deux fois
+- `ocr_tiled(binary, ...)` : OCR des bandes en parallèle, texte dans l'ordre de lecture
+
+Une page de 600 dpi passée d'un bloc à Tesseract n'utilise qu'un cœur. La
+page binarisée est découpée en bandes horizontales ; chaque coupe est placée
+sur la ligne de pixels la plus blanche autour de la hauteur visée, pour ne
+pas couper une ligne de texte. Si aucune ligne blanche n'est trouvée, les
+bandes se recouvrent et les lignes lues deux fois sont supprimées au collage.
+Une ligne à cheval sur le bord d'une bande n'y est lue qu'en partie : les
+deux lectures sont rapprochées par préfixe, suffixe ou similarité, et la
+plus complète est gardée.
+"""
+
+import difflib
+from concurrent.futures import ThreadPoolExecutor
+
+from src.core.lazy import lazy_import
+
+cv2 = lazy_import('cv2')
+np = lazy_import('numpy')
+
+# Hauteur de bande par défaut (pixels) et recouvrement quand une coupe tombe dans du texte
+DEFAULT_TILE_HEIGHT = 1200
+DEFAULT_OVERLAP = 60
+
+# Deux lectures d'une ligne du recouvrement : similarité minimale (difflib), ou
+# longueur minimale de la partie commune quand l'une est le début ou la fin de l'autre
+LINE_SIMILARITY = 0.8
+MIN_PARTIAL = 4
+
+
+def row_ink(binary):
+    """Nombre de pixels noirs par ligne (texte noir sur fond blanc)."""
+    h, w = binary.shape
+    # Somme par ligne sans allouer de copie inversée de l'image
+    white = cv2.reduce(binary, 1, cv2.REDUCE_SUM, dtype=cv2.CV_32S).ravel()
+    return w - white // 255
+
+
+def find_cuts(binary, tile_height: int):
+    """Retourne les ordonnées de coupe et, pour chacune, si elle tombe dans un blanc.
+
+    Chaque coupe est cherchée dans une fenêtre de ±1/4 de bande autour de la
+    hauteur visée ; on garde la ligne la moins encrée (la plus centrale d'un
+    blanc à égalité).
+    """
+    h = binary.shape[0]
+    ink = row_ink(binary)
+    search = max(1, tile_height // 4)
+
+    cuts = []
+    y = tile_height
+    while y < h - search:
+        lo, hi = y - search, min(h, y + search)
+        window = ink[lo:hi]
+        best = window.min()
+        candidates = np.flatnonzero(window == best)
+        cut = lo + int(candidates[len(candidates) // 2])
+        cuts.append((cut, best == 0))
+        y = cut + tile_height
+    return cuts
+
+
+def tile_bounds(binary, tile_height: int = DEFAULT_TILE_HEIGHT, overlap: int = DEFAULT_OVERLAP) -> list:
+    """Ordonnées `(haut, bas)` des bandes horizontales.
+
+    Une coupe tombant dans un blanc ne crée pas de recouvrement ; sinon les
+    deux bandes voisines partagent `overlap` pixels de part et d'autre.
+    """
+    h = binary.shape[0]
+    cuts = [(0, True)] + find_cuts(binary, tile_height) + [(h, True)]
+
+    bounds = []
+    for (start, clean_start), (end, clean_end) in zip(cuts, cuts[1:]):
+        top = start if clean_start else max(0, start - overlap)
+        bottom = end if clean_end else min(h, end + overlap)
+        bounds.append((top, bottom))
+    return bounds
+
+
+def split_tiles(binary, tile_height: int = DEFAULT_TILE_HEIGHT, overlap: int = DEFAULT_OVERLAP):
+    """Découpe l'image en bandes horizontales (vues NumPy, sans copie, voir `tile_bounds`)."""
+    return [binary[top:bottom] for top, bottom in tile_bounds(binary, tile_height, overlap)]
+
+
+def _same_line(a: str, b: str) -> bool:
+    """Deux lectures de la même ligne : identiques, l'une coupée (début ou fin de l'autre) ou proches."""
+    a, b = ' '.join(a.split()), ' '.join(b.split())
+    if a == b:
+        return True
+    short, long = sorted((a, b), key=len)
+    if len(short) >= MIN_PARTIAL and (long.startswith(short) or long.endswith(short)):
+        return True
+    return difflib.SequenceMatcher(None, a, b, autojunk=False).ratio() >= LINE_SIMILARITY
+
+
+def stitch_texts(texts, overlaps=None, max_repeat: int = 3) -> str:
+    """Recolle les textes des bandes dans l'ordre de lecture.
+
+    `overlaps[i]` : la bande `i + 1` recouvre la bande `i` (défaut : toutes).
+    Seulement dans ce cas, les premières lignes d'une bande qui sont une
+    relecture des dernières de la précédente (voir `_same_line`) ne sont
+    gardées qu'une fois, dans leur lecture la plus longue.
+    """
+    lines = []
+    for i, text in enumerate(texts):
+        current = text.replace('\f', '').splitlines()
+        if i and (overlaps is None or overlaps[i - 1]):
+            tail = [j for j, line in enumerate(lines) if line.strip()][-max_repeat:]
+            head = [j for j, line in enumerate(current) if line.strip()][:max_repeat]
+            for k in range(min(len(tail), len(head)), 0, -1):
+                pairs = list(zip(tail[-k:], head[:k]))
+                if all(_same_line(lines[a], current[b]) for a, b in pairs):
+                    for a, b in pairs:
+                        if len(current[b].strip()) > len(lines[a].strip()):
+                            lines[a] = current[b]
+                    # Retirer les k premières lignes non vides de la bande courante
+                    del current[:head[k - 1] + 1]
+                    break
+        lines.extend(current)
+    return '\n'.join(lines).strip('\n') + '\n'
+
+
+def ocr_tiled(binary, recognize, tile_height: int = DEFAULT_TILE_HEIGHT,
+              overlap: int = DEFAULT_OVERLAP, workers: int = None) -> str:
+    """OCR d'une grande image binarisée, bande par bande, en parallèle.
+
+    `recognize(tile)` est la fonction d'OCR d'une bande (pytesseract ou
+    `recognize_pipe`). Des threads suffisent : le travail a lieu dans les
+    processus Tesseract, pas dans l'interpréteur Python.
+    """
+    if binary.shape[0] < 2 * tile_height:
+        return recognize(binary)
+
+    bounds = tile_bounds(binary, tile_height, overlap)
+    tiles = [binary[top:bottom] for top, bottom in bounds]
+    # Recouvrement d'après les ordonnées : une coupe dans un blanc ne supprime aucune ligne
+    overlaps = [top < bottom for (_, bottom), (top, _) in zip(bounds, bounds[1:])]
+    if workers is None:
+        from src.core.batch import default_workers
+        workers = default_workers()
+
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(tiles)))) as pool:
+        texts = list(pool.map(recognize, tiles))
+    return stitch_texts(texts, overlaps)
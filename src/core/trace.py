@@ -0,0 +1,170 @@
+"""
+Traçage par étape : lecture, prétraitement, OCR, écriture
+- `Trace(doc)` : mesures d'un document (durée et dimensions par étape, octets lus, pic RSS)
+- `record(timings, name, seconds, **info)` : ajoute une mesure à une liste ou à une `Trace`
+- `peak_rss()` : pic de mémoire résidente du processus, en octets
+- `write_chrome_trace(traces, path)` : export pour chrome://tracing ou ui.perfetto.dev
+- `write_json(traces, path)` : export brut, un objet JSON par document
+- `summary_table(traces)` : tableau agrégé par étape (total, moyenne, p95)
+- `format_breakdown(trace)` : résumé d'une ligne (barre d'état de la GUI)
+
+Le traçage est désactivé par défaut : le paramètre `timings` vaut None et
+`record` retourne immédiatement, sans horloge ni appel système. Une simple
+liste reçoit `(étape, secondes)` comme auparavant ; une `Trace` conserve en
+plus l'horodatage, les dimensions de l'image produite et les octets lus.
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+class Trace:
+    """Mesures d'un document. Itérable en `(étape, secondes)` comme une liste de temps."""
+
+    def __init__(self, doc):
+        self.doc = doc if isinstance(doc, str) else '<mémoire>'
+        self.pid = os.getpid()
+        self.spans = []
+        self.bytes_read = 0
+        self.rss = None
+
+    def add(self, name, seconds, **info):
+        """Enregistre une étape terminée à l'instant présent et longue de `seconds`."""
+        span = {'name': name, 'ts': time.time() - seconds, 'dur': seconds,
+                'tid': threading.get_ident()}
+        span.update(info)
+        self.spans.append(span)
+
+    def finish(self):
+        """Relève le pic de mémoire du processus à la fin du document."""
+        self.rss = peak_rss()
+        return self
+
+    @property
+    def total(self) -> float:
+        return sum(span['dur'] for span in self.spans)
+
+    def __iter__(self):
+        return ((span['name'], span['dur']) for span in self.spans)
+
+    def __len__(self):
+        return len(self.spans)
+
+    def to_dict(self) -> dict:
+        return {'doc': self.doc, 'pid': self.pid, 'bytes_read': self.bytes_read,
+                'peak_rss': self.rss, 'total': self.total, 'spans': self.spans}
+
+
+def record(timings, name, seconds, **info):
+    """Ajoute une mesure à `timings` : rien si None, `(nom, s)` pour une liste."""
+    if timings is None:
+        return
+    if isinstance(timings, Trace):
+        timings.add(name, seconds, **info)
+    else:
+        timings.append((name, seconds))
+
+
+def peak_rss():
+    """Pic de mémoire résidente du processus courant (octets), ou None si inconnu."""
+    if resource is not None:
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Kio sous Linux, octets sous macOS
+        return rss if sys.platform == 'darwin' else rss * 1024
+    if sys.platform == 'win32':
+        return _peak_working_set()
+    return None
+
+
+def _peak_working_set():
+    import ctypes
+    from ctypes import wintypes
+
+    class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+        _fields_ = [('cb', wintypes.DWORD), ('PageFaultCount', wintypes.DWORD)] + [
+            (name, ctypes.c_size_t) for name in (
+                'PeakWorkingSetSize', 'WorkingSetSize', 'QuotaPeakPagedPoolUsage',
+                'QuotaPagedPoolUsage', 'QuotaPeakNonPagedPoolUsage', 'QuotaNonPagedPoolUsage',
+                'PagefileUsage', 'PeakPagefileUsage')
+        ]
+
+    counters = PROCESS_MEMORY_COUNTERS()
+    counters.cb = ctypes.sizeof(counters)
+    handle = ctypes.windll.kernel32.GetCurrentProcess()
+    if not ctypes.windll.psapi.GetProcessMemoryInfo(handle, ctypes.byref(counters), counters.cb):
+        return None
+    return counters.PeakWorkingSetSize
+
+
+def write_chrome_trace(traces, path: str):
+    """Écrit les étapes au format Chrome trace (événements complets `ph: X`, en µs)."""
+    events = []
+    for trace in traces:
+        for span in trace.spans:
+            args = {k: v for k, v in span.items() if k not in ('name', 'ts', 'dur', 'tid')}
+            args['doc'] = trace.doc
+            events.append({
+                'name': span['name'], 'cat': 'ocr', 'ph': 'X',
+                'ts': round(span['ts'] * 1e6), 'dur': round(span['dur'] * 1e6),
+                'pid': trace.pid, 'tid': span['tid'], 'args': args,
+            })
+        if trace.rss:
+            events.append({
+                'name': 'peak_rss', 'ph': 'C', 'pid': trace.pid,
+                'ts': round((trace.spans[-1]['ts'] + trace.spans[-1]['dur']) * 1e6) if trace.spans else 0,
+                'args': {'Mo': round(trace.rss / 1e6, 1)},
+            })
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f)
+
+
+def write_json(traces, path: str):
+    """Écrit un objet JSON par document (étapes, octets lus, pic RSS)."""
+    with open(path, 'w', encoding='utf-8') as f:
+        for trace in traces:
+            f.write(json.dumps(trace.to_dict(), ensure_ascii=False) + '\n')
+
+
+def summary_table(traces) -> str:
+    """Tableau agrégé : une ligne par étape, dans l'ordre de première apparition."""
+    traces = list(traces)
+    durations = {}
+    for trace in traces:
+        for name, seconds in trace:
+            durations.setdefault(name, []).append(seconds)
+    if not durations:
+        return "Aucune mesure."
+
+    grand_total = sum(sum(values) for values in durations.values()) or 1.0
+    lines = [f"{'étape':<12} {'n':>6} {'total s':>9} {'moy. ms':>9} {'p95 ms':>9} {'part':>6}"]
+    for name, values in durations.items():
+        values.sort()
+        p95 = values[min(len(values) - 1, int(0.95 * len(values)))]
+        total = sum(values)
+        lines.append(f"{name:<12} {len(values):>6} {total:>9.2f} {1000 * total / len(values):>9.1f} "
+                     f"{1000 * p95:>9.1f} {100 * total / grand_total:>5.0f}%")
+
+    read = sum(t.bytes_read for t in traces)
+    rss = [t.rss for t in traces if t.rss]
+    lines.append(f"Octets lus : {read / 1e6:.1f} Mo"
+                 + (f" | pic RSS : {max(rss) / 1e6:.0f} Mo" if rss else ""))
+    return '\n'.join(lines)
+
+
+def format_breakdown(trace) -> str:
+    """`load 12 ms · gray 3 ms · ocr 410 ms` pour une trace ou une liste de temps.
+
+    Une étape répétée (une par page d'un document) est cumulée.
+    """
+    totals = {}
+    for name, seconds in trace:
+        totals[name] = totals.get(name, 0.0) + seconds
+    return ' · '.join(f"{name} {1000 * seconds:.0f} ms" for name, seconds in totals.items())
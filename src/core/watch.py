@@ -0,0 +1,644 @@
+"""
+Surveillance de dossiers : OCR des nouveaux scans au fil de l'eau
+- `Manifest` : fichiers déjà traités (chemin, taille, mtime, SHA-256) dans SQLite
+- `InotifyWatcher` : notifications du noyau Linux (inotify, via ctypes)
+- `PollingWatcher` : parcours périodique des dossiers (autres systèmes, partages réseau)
+- `Debouncer` : attend qu'un fichier ne change plus avant de le traiter
+- `WatchDaemon` : boucle principale, pool de processus et écriture des résultats
+
+Lancement : python -m src.core.watch data/images -o resultats -j 4
+Les scanners déposent leurs fichiers dans les dossiers surveillés ; chaque
+image (ou document multipage) nouvelle ou modifiée est lue une fois, puis
+inscrite au manifeste avec sa taille, sa date de modification et son hash.
+Après un redémarrage, seuls les fichiers absents du manifeste ou modifiés
+depuis sont traités ; un fichier touché sans changement de contenu (même
+hash) n'est pas relu. Un fichier en erreur (moteur, processus de travail
+tué...) est retenté RETRY_ATTEMPTS fois, après RETRY_DELAY secondes puis
+un délai quatre fois plus long à chaque échec ; ensuite il attend sa
+prochaine modification ou le prochain démarrage, qui retente les fichiers
+inscrits en erreur au manifeste.
+
+Un fichier en cours d'écriture n'est traité qu'après `settle` secondes
+sans changement de taille ni de date. Au repos, la boucle est bloquée dans
+`select` (inotify) ou ne se réveille qu'à chaque parcours (polling) : pas
+d'attente active. Un arriéré (premier lancement sur 100 000 fichiers) est
+soumis au pool par fenêtre de 2 × processus, renouvelée dès qu'une tâche
+se termine : le pool reste plein sans garder 100 000 tâches en mémoire.
+Les sous-dossiers surveillés sont reproduits dans le dossier de sortie
+(`in/a/scan.png` -> `sortie/a/scan_ocr.txt`) : deux scanners qui déposent
+un même nom de fichier dans des dossiers différents ne s'écrasent pas.
+Avec --index, les textes alimentent l'index de recherche (search.py).
+Avec --sink jsonl ou sqlite, les résultats sont écrits par lots (sinks.py).
+"""
+
+import argparse
+import ctypes
+import ctypes.util
+import os
+import select
+import signal
+import socket
+import sqlite3
+import struct
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from src.core.backends import ENGINES
+from src.core.batch import IMAGE_EXTENSIONS, default_workers, ocr_file
+from src.core.cache import DEFAULT_MAX_BYTES, file_digest
+from src.core.documents import expand_documents, output_base
+from src.core.engine import TRANSPORTS
+from src.core.export import FORMATS
+from src.core.lowmem import parse_size, workers_for_memory
+from src.core.pipeline import get_pipeline
+from src.core.search import open_search_index
+from src.core.sinks import open_sink, parse_sink
+
+# Délai sans changement avant de traiter un fichier (secondes)
+DEFAULT_SETTLE = 2.0
+
+# Intervalle entre deux parcours en mode polling (secondes)
+DEFAULT_POLL_INTERVAL = 5.0
+
+# Résultats inscrits au manifeste par transaction
+MANIFEST_BATCH = 256
+
+# Nouveaux essais d'un fichier en erreur, le premier après RETRY_DELAY secondes (délai × 4 ensuite)
+RETRY_ATTEMPTS = 3
+RETRY_DELAY = 60.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    digest TEXT NOT NULL,
+    status TEXT NOT NULL,
+    error TEXT,
+    processed REAL NOT NULL
+);
+"""
+
+
+def is_image(path: str) -> bool:
+    return path.lower().endswith(IMAGE_EXTENSIONS)
+
+
+def scan_tree(roots):
+    """Images présentes sous `roots` : {chemin: (taille, mtime_ns)} (parcours os.scandir)."""
+    found = {}
+    stack = list(roots)
+    while stack:
+        directory = stack.pop()
+        try:
+            entries = list(os.scandir(directory))
+        except OSError:
+            continue
+        for entry in entries:
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif is_image(entry.name) and entry.is_file():
+                    st = entry.stat()
+                    found[entry.path] = (st.st_size, st.st_mtime_ns)
+            except OSError:
+                continue  # fichier supprimé pendant le parcours
+    return found
+
+
+def _stat(path: str):
+    """(taille, mtime_ns) ou None si le fichier a disparu."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_size, st.st_mtime_ns
+
+
+# ============================================================================
+# Manifeste des fichiers traités
+# ============================================================================
+
+class Manifest:
+    """Fichiers traités : chemin -> taille, mtime, hash, état ('done' ou 'error')."""
+
+    def __init__(self, path: str):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self.db = sqlite3.connect(path, timeout=30, isolation_level=None)
+        self.db.execute('PRAGMA journal_mode=WAL')
+        self.db.execute('PRAGMA synchronous=NORMAL')
+        self.db.executescript(_SCHEMA)
+
+    def snapshot(self) -> dict:
+        """{chemin: (taille, mtime_ns, hash)} de tous les fichiers inscrits."""
+        return {path: (size, mtime, digest)
+                for path, size, mtime, digest in self.db.execute('SELECT path, size, mtime_ns, digest FROM files')}
+
+    def failed(self) -> list:
+        """Chemins inscrits en erreur."""
+        return [path for path, in self.db.execute("SELECT path FROM files WHERE status = 'error'")]
+
+    def record_many(self, rows):
+        """Inscrit des `(chemin, taille, mtime_ns, hash, erreur)` en une transaction."""
+        now = time.time()
+        self.db.execute('BEGIN IMMEDIATE')
+        try:
+            self.db.executemany(
+                'INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, ?, ?)',
+                [(path, size, mtime, digest, 'error' if error else 'done', error, now)
+                 for path, size, mtime, digest, error in rows],
+            )
+        except BaseException:
+            self.db.execute('ROLLBACK')
+            raise
+        self.db.execute('COMMIT')
+
+    def __len__(self):
+        return self.db.execute('SELECT COUNT(*) FROM files').fetchone()[0]
+
+    def close(self):
+        self.db.close()
+
+
+# ============================================================================
+# Détection des changements
+# ============================================================================
+
+class PollingWatcher:
+    """Parcourt les dossiers toutes les `interval` secondes et compare taille et date."""
+
+    def __init__(self, roots, interval: float = DEFAULT_POLL_INTERVAL, known=None):
+        self.roots = roots
+        self.interval = interval
+        self.files = dict(known or {})
+        self.next_scan = time.monotonic() + interval
+
+    def fileno(self):
+        return None
+
+    def timeout(self, now: float) -> float:
+        return max(0.0, self.next_scan - now)
+
+    def collect(self, readable: bool, now: float) -> list:
+        if now < self.next_scan:
+            return []
+        current = scan_tree(self.roots)
+        changed = [path for path, stat in current.items() if self.files.get(path) != stat]
+        self.files = current
+        self.next_scan = time.monotonic() + self.interval
+        return changed
+
+
+class InotifyWatcher:
+    """Notifications inotify (Linux) sur les dossiers et leurs sous-dossiers.
+
+    Ne voit pas les écritures faites depuis une autre machine sur un partage
+    réseau (NFS, SMB) : utiliser alors `PollingWatcher` (option --poll).
+    """
+
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_Q_OVERFLOW = 0x00004000
+    IN_IGNORED = 0x00008000
+    IN_ISDIR = 0x40000000
+    MASK = IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+
+    _EVENT = struct.Struct('iIII')  # wd, mask, cookie, len (puis le nom)
+
+    def __init__(self, roots):
+        if not sys.platform.startswith('linux'):
+            raise OSError("inotify n'existe que sous Linux")
+        self._libc = ctypes.CDLL(ctypes.util.find_library('c') or None, use_errno=True)
+        self.fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 a échoué")
+        self.dirs = {}  # descripteur de surveillance -> dossier
+        self.overflowed = False
+        for root in roots:
+            self._watch_tree(root)
+
+    def _watch_tree(self, root) -> list:
+        """Surveille `root` et ses sous-dossiers ; retourne les images déjà présentes."""
+        images = []
+        for directory, subdirs, files in os.walk(root):
+            wd = self._libc.inotify_add_watch(self.fd, os.fsencode(directory), self.MASK)
+            if wd < 0:
+                errno = ctypes.get_errno()
+                # ENOSPC : plafond fs.inotify.max_user_watches atteint
+                raise OSError(errno, f"inotify_add_watch({directory}) : {os.strerror(errno)}")
+            self.dirs[wd] = directory
+            images.extend(os.path.join(directory, name) for name in files if is_image(name))
+        return images
+
+    def fileno(self):
+        return self.fd
+
+    def timeout(self, now: float):
+        return None
+
+    def collect(self, readable: bool, now: float) -> list:
+        if not readable:
+            return []
+        changed = []
+        while True:
+            try:
+                data = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                break
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, length = self._EVENT.unpack_from(data, offset)
+                offset += self._EVENT.size
+                name = data[offset:offset + length].rstrip(b'\0')
+                offset += length
+                if mask & self.IN_Q_OVERFLOW:
+                    # Événements perdus : le démon refait un parcours complet
+                    self.overflowed = True
+                    continue
+                if mask & self.IN_IGNORED:
+                    self.dirs.pop(wd, None)
+                    continue
+                directory = self.dirs.get(wd)
+                if directory is None or not name:
+                    continue
+                path = os.path.join(directory, os.fsdecode(name))
+                if mask & self.IN_ISDIR:
+                    if mask & (self.IN_CREATE | self.IN_MOVED_TO):
+                        # Nouveau dossier : surveillé à son tour, son contenu déjà là est pris
+                        changed.extend(self._watch_tree(path))
+                elif is_image(path):
+                    changed.append(path)
+        return changed
+
+    def close(self):
+        os.close(self.fd)
+
+
+def make_watcher(roots, poll_interval=None, known=None):
+    """inotify si disponible (et `poll_interval` non imposé), sinon polling."""
+    if poll_interval is None:
+        try:
+            return InotifyWatcher(roots)
+        except (OSError, AttributeError) as e:
+            print(f"inotify indisponible ({e}) : surveillance par parcours périodique", file=sys.stderr)
+    return PollingWatcher(roots, poll_interval or DEFAULT_POLL_INTERVAL, known)
+
+
+class Debouncer:
+    """Fichiers en attente : prêts après `settle` secondes sans changement de taille ni de date."""
+
+    def __init__(self, settle: float = DEFAULT_SETTLE):
+        self.settle = settle
+        self.pending = {}  # chemin -> ((taille, mtime_ns), stable depuis)
+
+    def add(self, path: str, now: float):
+        stat = _stat(path)
+        if stat is not None:
+            self.pending[path] = (stat, now)
+
+    def ready(self, now: float) -> list:
+        """Fichiers stables depuis `settle` secondes (retirés de l'attente), avec leur (taille, mtime)."""
+        done = []
+        for path, (stat, since) in list(self.pending.items()):
+            current = _stat(path)
+            if current is None:
+                del self.pending[path]  # supprimé ou renommé avant la fin
+            elif current != stat:
+                self.pending[path] = (current, now)  # toujours en cours d'écriture
+            elif now - since >= self.settle:
+                del self.pending[path]
+                done.append((path, stat))
+        return done
+
+    def timeout(self, now: float):
+        if not self.pending:
+            return None
+        return max(0.05, min(since + self.settle for _, since in self.pending.values()) - now)
+
+    def __len__(self):
+        return len(self.pending)
+
+
+# ============================================================================
+# Traitement (exécuté dans les processus du pool)
+# ============================================================================
+
+def process_file(path: str, known_digest, options=None) -> dict:
+    """OCR d'un fichier surveillé (toutes ses pages) ; rien si son contenu n'a pas changé."""
+    try:
+        digest = file_digest(path)
+    except OSError as e:
+        return {'path': path, 'digest': '', 'unchanged': False, 'results': [],
+                'error': str(e)}
+    if digest == known_digest:
+        return {'path': path, 'digest': digest, 'unchanged': True, 'results': [], 'error': None}
+    results = [ocr_file(page, options) for page in expand_documents([path])]
+    errors = [r['error'] for r in results if r['error']]
+    return {'path': path, 'digest': digest, 'unchanged': False, 'results': results,
+            'error': errors[0] if errors else None}
+
+
+# ============================================================================
+# Démon
+# ============================================================================
+
+class WatchDaemon:
+    """Surveille `roots`, traite les fichiers nouveaux ou modifiés et tient le manifeste à jour."""
+
+    def __init__(self, roots, output_dir='.', manifest=None, workers=None, options=None,
+                 formats=('txt',), settle=DEFAULT_SETTLE, poll_interval=None, index=None, sink=None):
+        self.roots = [os.path.abspath(root) for root in roots]
+        self.output_dir = output_dir
+        self.manifest = Manifest(manifest or os.path.join(output_dir, 'ocr_manifest.sqlite3'))
+        self.options = options or {}
+        self.workers = workers_for_memory(workers or default_workers(), self.options.get('memory_limit', 0))
+        self.formats = formats
+        self.settle = settle
+        self.poll_interval = poll_interval
+        self.index = open_search_index(index) if index else None  # recherche plein texte (search.py)
+        self.sink_spec = sink  # sortie des résultats (sinks.py), ouverte par run()
+        self.sink = None
+        self.known = {}  # chemin -> (taille, mtime_ns, hash) inscrits au manifeste
+        self.attempts = {}  # chemin en erreur -> échecs depuis le démarrage (son hash ne prouve rien)
+        self.retry_at = {}  # chemin en erreur -> instant (monotonic) du prochain essai
+        self.once = False
+        self.queue = deque()  # (chemin, (taille, mtime_ns)) prêts à traiter
+        self.running = {}  # future -> (chemin, (taille, mtime_ns))
+        self.done = []  # futures terminés, relevés par la boucle
+        self.rows = []  # lignes du manifeste en attente d'écriture
+        self.texts = []  # (page, None, texte) en attente d'indexation
+        self.stopping = False
+        self.processed = 0
+        self.skipped = 0
+        self.errors = 0
+        # Réveil de la boucle par les rappels du pool (socketpair : select fonctionne aussi sous Windows)
+        self._wake_r, self._wake_w = socket.socketpair()
+        self._wake_r.setblocking(False)
+
+    # ------------------------------------------------------------------
+
+    def _changed(self, path: str, stat) -> bool:
+        known = self.known.get(path)
+        return known is None or known[:2] != stat
+
+    def _enqueue_backlog(self, files: dict, now: float, debouncer: Debouncer):
+        """Fichiers trouvés au parcours : anciens -> file directe, récents -> attente de stabilité."""
+        backlog = 0
+        settled_before = time.time_ns() - int(self.settle * 1e9)
+        for path in sorted(files):
+            stat = files[path]
+            if not self._changed(path, stat):
+                continue
+            if stat[1] <= settled_before:
+                self.queue.append((path, stat))
+                backlog += 1
+            else:
+                debouncer.add(path, now)
+        return backlog
+
+    def _retry(self, now: float):
+        """Remet en file les fichiers en erreur dont le prochain essai est dû."""
+        for path, at in list(self.retry_at.items()):
+            if at <= now:
+                del self.retry_at[path]
+                stat = _stat(path)
+                if stat is not None:
+                    self.queue.append((path, stat))
+
+    def _submit(self, pool):
+        window = 2 * self.workers
+        busy = {path for path, _ in self.running.values()}
+        deferred = []
+        while self.queue and len(self.running) < window:
+            path, stat = self.queue.popleft()
+            if path in busy:
+                # Déjà en cours : revu après la fin de la tâche, les suivants passent avant
+                deferred.append((path, stat))
+                continue
+            known = self.known.get(path)
+            digest = known[2] if known and path not in self.attempts else None
+            future = pool.submit(process_file, path, digest, self.options)
+            self.running[future] = (path, stat)
+            busy.add(path)
+            future.add_done_callback(self._on_done)
+        self.queue.extend(deferred)
+
+    def _on_done(self, future):
+        # Fil du pool : on se contente de réveiller la boucle principale
+        self.done.append(future)
+        try:
+            self._wake_w.send(b'.')
+        except OSError:
+            pass
+
+    def _finish(self, future):
+        path, (size, mtime) = self.running.pop(future)
+        try:
+            outcome = future.result()
+        except Exception as e:
+            # Processus de travail mort : l'erreur est inscrite, le fichier sera retenté
+            outcome = {'path': path, 'digest': '', 'unchanged': False, 'results': [], 'error': str(e)}
+
+        if outcome['unchanged']:
+            self.skipped += 1
+        else:
+            if path in self.known:
+                # Fichier modifié : ses anciennes pages (peut-être plus nombreuses) sortent de l'index et de la sortie
+                if self.index is not None:
+                    self.index.remove(path)
+                self.sink.remove(path)
+            for result in outcome['results']:
+                if result['error']:
+                    continue
+                try:
+                    self.sink.write(result['path'], result['text'], result.get('layout'))
+                except (OSError, sqlite3.Error) as e:
+                    outcome['error'] = outcome['error'] or str(e)
+                if self.index is not None:
+                    self.texts.append((result['path'], None, result['text']))
+            if outcome['error']:
+                self.errors += 1
+                failures = self.attempts[path] = self.attempts.get(path, 0) + 1
+                if failures <= RETRY_ATTEMPTS and not self.once:
+                    delay = RETRY_DELAY * 4 ** (failures - 1)
+                    self.retry_at[path] = time.monotonic() + delay
+                    print(f"✗ {path} : {outcome['error']} (nouvel essai dans {delay:.0f} s)")
+                else:
+                    print(f"✗ {path} : {outcome['error']} (repris à sa prochaine modification ou au prochain démarrage)")
+            else:
+                self.attempts.pop(path, None)
+                self.retry_at.pop(path, None)
+                self.processed += 1
+                pages = len(outcome['results'])
+                print(f"✓ {path}" + (f" ({pages} pages)" if pages > 1 else ""))
+        self.known[path] = (size, mtime, outcome['digest'])
+        self.rows.append((path, size, mtime, outcome['digest'], outcome['error']))
+
+    def _flush(self, force=False):
+        if self.rows and (force or len(self.rows) >= MANIFEST_BATCH or not self.running):
+            # Résultats écrits avant l'inscription au manifeste : un arrêt entre les deux fait relire
+            # le fichier, sans doublon (pages déjà présentes ignorées ou remplacées)
+            self.sink.flush()
+            if self.texts:
+                self.index.add_many(self.texts)
+                self.texts = []
+            self.manifest.record_many(self.rows)
+            self.rows = []
+
+    def stop(self, *args):
+        self.stopping = True
+        try:
+            self._wake_w.send(b'.')
+        except OSError:
+            pass
+
+    # ------------------------------------------------------------------
+
+    def run(self, once=False):
+        """Boucle principale. `once=True` : traite l'existant puis s'arrête (tâches planifiées)."""
+        os.makedirs(self.output_dir, exist_ok=True)
+        self.once = once
+        # Sous-dossiers surveillés reproduits dans la sortie : deux `scan0001.png` ne s'écrasent pas
+        self.sink = open_sink(self.sink_spec, self.output_dir, self.formats, output_base(self.roots))
+        self.known = self.manifest.snapshot()
+        files = scan_tree(self.roots)
+        watcher = None if once else make_watcher(self.roots, self.poll_interval, files)
+        debouncer = Debouncer(self.settle)
+        now = time.monotonic()
+        backlog = self._enqueue_backlog(files, now, debouncer)
+        for path in self.manifest.failed():
+            # En erreur au dernier passage : retenté dès le démarrage (s'il n'est pas déjà en file)
+            self.attempts[path] = 0
+            if path in files and not self._changed(path, files[path]):
+                self.retry_at[path] = now
+        print(f"{len(files)} fichier(s) surveillé(s), {len(self.known)} au manifeste, "
+              f"{backlog + len(debouncer) + len(self.retry_at)} à traiter", file=sys.stderr)
+
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            try:
+                while not self.stopping:
+                    now = time.monotonic()
+                    for path, stat in debouncer.ready(now):
+                        if self._changed(path, stat):
+                            self.queue.append((path, stat))
+                    self._retry(now)
+                    self._submit(pool)
+
+                    if once and not self.queue and not self.running and not debouncer:
+                        break
+
+                    # Attente : événement inotify, fin d'une tâche, fichier à revoir ou parcours
+                    timeouts = [t for t in (debouncer.timeout(now),
+                                            watcher.timeout(now) if watcher else None,
+                                            max(0.0, min(self.retry_at.values()) - now) if self.retry_at else None)
+                                if t is not None]
+                    fds = [self._wake_r] + ([watcher.fileno()] if watcher and watcher.fileno() is not None else [])
+                    readable, _, _ = select.select(fds, [], [], min(timeouts) if timeouts else None)
+                    if self._wake_r in readable:
+                        try:
+                            while self._wake_r.recv(4096):
+                                pass
+                        except BlockingIOError:
+                            pass
+
+                    while self.done:
+                        self._finish(self.done.pop())
+                    self._flush()
+
+                    if watcher:
+                        now = time.monotonic()
+                        for path in watcher.collect(watcher.fileno() in readable, now):
+                            debouncer.add(path, now)
+                        if getattr(watcher, 'overflowed', False):
+                            watcher.overflowed = False
+                            self._enqueue_backlog(scan_tree(self.roots), now, debouncer)
+            finally:
+                # Arrêt : les tâches non commencées sont abandonnées, celles en cours terminées
+                for future in list(self.running):
+                    future.cancel()
+                pool.shutdown(wait=True)
+                while self.done:
+                    future = self.done.pop()
+                    if not future.cancelled():
+                        self._finish(future)
+                self._flush(force=True)
+                self.sink.close()
+                if watcher and hasattr(watcher, 'close'):
+                    watcher.close()
+
+        print(f"Traités : {self.processed}, inchangés : {self.skipped}, erreurs : {self.errors}", file=sys.stderr)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Surveillance de dossiers : OCR des fichiers nouveaux ou modifiés")
+    parser.add_argument('dirs', nargs='+', help="dossier(s) surveillé(s), sous-dossiers compris")
+    parser.add_argument('-o', '--output-dir', default='.', help="dossier des résultats (défaut : dossier courant)")
+    parser.add_argument('--manifest', default=None, metavar='FICHIER',
+                        help="manifeste SQLite des fichiers traités (défaut : <sortie>/ocr_manifest.sqlite3)")
+    parser.add_argument('-j', '--workers', type=int, default=None, help="processus OCR (défaut : nombre de cœurs)")
+    parser.add_argument('--settle', type=float, default=DEFAULT_SETTLE, metavar='S',
+                        help="secondes sans changement avant de lire un fichier (écriture en cours)")
+    parser.add_argument('--poll', type=float, nargs='?', const=DEFAULT_POLL_INTERVAL, default=None, metavar='S',
+                        help="parcours périodique au lieu d'inotify (partages réseau), toutes les S secondes")
+    parser.add_argument('--once', action='store_true', help="traiter l'existant puis s'arrêter")
+    parser.add_argument('-l', '--lang', default=None, help="langue(s) Tesseract")
+    parser.add_argument('--engine', choices=ENGINES, default='auto', help="moteur OCR (voir backends.py)")
+    parser.add_argument('--transport', choices=TRANSPORTS, default='file', help="transport du moteur 'tesseract'")
+    parser.add_argument('--pipeline', default=None, help="prétraitement (voir pipeline.py)")
+    parser.add_argument('--regions', action='store_true', help="ignorer les pages blanches, recadrer sur le texte")
+    parser.add_argument('--timeout', type=float, default=0, metavar='S', help="délai maximal d'un appel Tesseract")
+    parser.add_argument('--format', default='txt', metavar='FORMATS',
+                        help=f"fichiers écrits par image, séparés par des virgules ({', '.join(FORMATS)})")
+    parser.add_argument('--cache', default=None, metavar='DOSSIER', help="dossier du cache des résultats")
+    parser.add_argument('--index', default=None, metavar='FICHIER',
+                        help="ajouter les textes à l'index de recherche plein texte (voir search.py)")
+    parser.add_argument('--memory-limit', type=parse_size, default=0, metavar='TAILLE',
+                        help="plafond mémoire par processus, ex. '1G' (voir lowmem.py)")
+    parser.add_argument('--sink', default=None, metavar='SORTIE',
+                        help="'dir' (un fichier par image, défaut), 'jsonl[:FICHIER]' ou 'sqlite[:FICHIER]' "
+                             "(écriture par lots, voir sinks.py)")
+    args = parser.parse_args(argv)
+    try:
+        parse_sink(args.sink or 'dir')
+    except ValueError as e:
+        parser.error(str(e))
+    args.formats = [f.strip() for f in args.format.split(',') if f.strip()]
+    unknown = [f for f in args.formats if f not in FORMATS]
+    if unknown or not args.formats:
+        parser.error(f"format inconnu : {', '.join(unknown) or args.format} (choix : {', '.join(FORMATS)})")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    get_pipeline(args.pipeline)
+
+    options = {'lang': args.lang, 'engine': args.engine, 'transport': args.transport, 'pipeline': args.pipeline}
+    if args.regions:
+        options['regions'] = True
+    if args.timeout:
+        options['timeout'] = args.timeout
+    if args.formats != ['txt']:
+        options['layout'] = True
+    if args.cache:
+        options.update(cache_dir=args.cache, cache_max_bytes=DEFAULT_MAX_BYTES)
+    if args.memory_limit:
+        options['memory_limit'] = args.memory_limit
+
+    daemon = WatchDaemon(args.dirs, args.output_dir, args.manifest, args.workers, options,
+                         args.formats, args.settle, args.poll, args.index, args.sink)
+    if hasattr(signal, 'SIGTERM'):
+        signal.signal(signal.SIGTERM, daemon.stop)
+    try:
+        daemon.run(once=args.once)
+    except KeyboardInterrupt:
+        daemon.stop()
+        print("Arrêt de la surveillance.", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
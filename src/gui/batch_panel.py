@@ -0,0 +1,284 @@
+"""
+Panneau de traitement par lots de la GUI OCR
+Fenêtre listant les fichiers d'un dossier, traités par un pool de processus.
+
+Fonctionnalités :
+- Une ligne par fichier : état (en attente, en cours, terminé, erreur), durée, caractères
+- Progression globale et débit mis à jour au fil des résultats
+- Double-clic sur une ligne : affiche son texte dans la fenêtre principale
+- Index de recherche (optionnel) : textes ajoutés à chaque passage, en une transaction
+- Sortie au choix (BATCH_SINK) : un fichier par image, JSONL ou SQLite écrits par lots ;
+  les fichiers déjà présents dans la sortie ne sont pas relus
+- Annulation : les fichiers en attente ne sont pas lancés
+
+Au plus `workers` fichiers sont soumis à la fois : l'état « en cours » est
+exact et l'annulation n'a rien à retirer du pool. Les résultats arrivent
+des processus dans une file lue par `after()` depuis la boucle Tkinter,
+seul fil autorisé à modifier les widgets.
+"""
+
+import os
+import queue
+import sqlite3
+import time
+from concurrent.futures import ProcessPoolExecutor
+from tkinter import ttk
+
+import customtkinter as ctk
+from customtkinter import CTkButton, CTkLabel
+
+from src.core.batch import ocr_file
+from src.core.documents import output_base, page_key, split_page_ref
+from src.core.sinks import open_sink
+
+# Intervalle de lecture des résultats (millisecondes)
+POLL_INTERVAL = 100
+
+
+class BatchPanel(ctk.CTkToplevel):
+    """Fenêtre de suivi d'un lot : file de fichiers, pool de processus, résultats au fil de l'eau"""
+
+    def __init__(self, master, paths, options=None, workers=1, output_dir=None, on_select=None, index=None,
+                 sink="dir"):
+        super().__init__(master)
+        self.title(f"Traitement par lots - {len(paths)} fichier(s)")
+        self.geometry("760x480")
+
+        self.paths = list(paths)
+        self.options = options or {}
+        self.workers = max(1, workers)
+        self.output_dir = output_dir
+        self.on_select = on_select
+        self.index = index  # SearchIndex ou None
+        self.sink_spec = sink  # sortie des résultats dans output_dir (voir sinks.py), ouverte par start()
+        self.sink = None
+
+        # État du lot
+        self.pending = list(range(len(self.paths)))[::-1]  # pile : prochain index en fin de liste
+        self.running = 0
+        self.done = 0
+        self.errors = 0
+        self.texts = {}  # index -> texte extrait
+        self.to_index = []  # (chemin, page, texte) pas encore dans l'index de recherche
+        self.results = queue.Queue()  # (index, résultat) déposés par les callbacks du pool
+        self.executor = None
+        self.start_time = None
+        self.cancelled = False
+
+        self._create_ui()
+        self.protocol("WM_DELETE_WINDOW", self.close)
+
+    # ========================================================================
+    # Interface
+    # ========================================================================
+
+    def _create_ui(self):
+        self.grid_columnconfigure(0, weight=1)
+        self.grid_rowconfigure(0, weight=1)
+
+        # --- Liste des fichiers ---
+        columns = ("file", "state", "duration", "chars")
+        self.tree = ttk.Treeview(self, columns=columns, show="headings", selectmode="browse")
+        for name, title, width in (("file", "Fichier", 380), ("state", "État", 120),
+                                   ("duration", "Durée", 80), ("chars", "Caractères", 90)):
+            self.tree.heading(name, text=title)
+            self.tree.column(name, width=width, anchor="w" if name == "file" else "center")
+        for index, path in enumerate(self.paths):
+            self.tree.insert("", "end", iid=str(index), values=(_display_name(path), "En attente", "", ""))
+        self.tree.grid(row=0, column=0, sticky="nsew", padx=(15, 0), pady=15)
+        self.tree.bind("<Double-1>", self._show_selected)
+
+        scrollbar = ttk.Scrollbar(self, orient="vertical", command=self.tree.yview)
+        scrollbar.grid(row=0, column=1, sticky="ns", padx=(0, 15), pady=15)
+        self.tree.configure(yscrollcommand=scrollbar.set)
+
+        # --- Progression ---
+        self.progress = ctk.CTkProgressBar(self)
+        self.progress.set(0)
+        self.progress.grid(row=1, column=0, columnspan=2, sticky="ew", padx=15)
+
+        self.summary_label = CTkLabel(self, text="", font=("Helvetica", 11), text_color="#666666")
+        self.summary_label.grid(row=2, column=0, columnspan=2, sticky="w", padx=15, pady=(5, 0))
+
+        # --- Boutons ---
+        actions = ctk.CTkFrame(self, fg_color="transparent")
+        actions.grid(row=3, column=0, columnspan=2, sticky="ew", padx=15, pady=15)
+        actions.grid_columnconfigure((0, 1), weight=1)
+
+        self.cancel_btn = CTkButton(
+            actions, text="⏹ Annuler", command=self.cancel,
+            fg_color="#FF3B30", hover_color="#E02420", text_color="white",
+        )
+        self.cancel_btn.grid(row=0, column=0, sticky="ew", padx=(0, 5))
+
+        self.close_btn = CTkButton(actions, text="Fermer", command=self.close)
+        self.close_btn.grid(row=0, column=1, sticky="ew", padx=(5, 0))
+
+    # ========================================================================
+    # Exécution
+    # ========================================================================
+
+    def start(self):
+        """Démarre le pool et la lecture périodique des résultats"""
+        self.start_time = time.perf_counter()
+        if self.output_dir:
+            self._open_sink()
+        self.executor = ProcessPoolExecutor(max_workers=min(self.workers, len(self.paths)) or 1)
+        self._submit_next()
+        self._update_summary()
+        self.after(POLL_INTERVAL, self._poll)
+
+    def _submit_next(self):
+        """Soumet des fichiers tant qu'un processus est libre"""
+        while self.pending and self.running < self.workers and not self.cancelled:
+            index = self.pending.pop()
+            future = self.executor.submit(ocr_file, self.paths[index], self.options)
+            # Appelé dans un fil du pool : on se contente de déposer le résultat
+            future.add_done_callback(lambda f, index=index: self.results.put((index, f)))
+            self.running += 1
+            self.tree.set(str(index), "state", "⏳ En cours")
+
+    def _poll(self):
+        """Traite tous les résultats arrivés depuis le dernier passage (boucle Tkinter)"""
+        if not self.winfo_exists():
+            return
+
+        received = False
+        while True:
+            try:
+                index, future = self.results.get_nowait()
+            except queue.Empty:
+                break
+            received = True
+            self.running -= 1
+            try:
+                result = future.result()
+            except Exception as e:
+                # Processus de travail mort : l'erreur reste attachée au fichier
+                result = {'path': self.paths[index], 'text': '', 'error': str(e), 'duration': 0.0}
+            self._finish_item(index, result)
+
+        if received:
+            self._submit_next()
+            self._index_texts()
+            self._update_summary()
+
+        if self.running or (self.pending and not self.cancelled):
+            self.after(POLL_INTERVAL, self._poll)
+        else:
+            self._finish_batch()
+
+    def _finish_item(self, index, result):
+        self.done += 1
+        iid = str(index)
+        if result['error']:
+            self.errors += 1
+            self.tree.set(iid, "state", "✗ Erreur")
+            self.texts[index] = f"Erreur : {result['error']}"
+            return
+
+        self.texts[index] = result['text']
+        self.tree.set(iid, "state", "✓ Terminé")
+        self.tree.set(iid, "duration", f"{result['duration']:.2f} s")
+        self.tree.set(iid, "chars", str(len(result['text'].strip())))
+        if self.index is not None:
+            self.to_index.append((result['path'], None, result['text']))
+        if self.sink is not None:
+            try:
+                self.sink.write(result['path'], result['text'])
+            except (OSError, sqlite3.Error) as e:
+                self.tree.set(iid, "state", "✗ Écriture")
+                self.texts[index] += f"\n\n[Erreur d'écriture : {e}]"
+
+    def _index_texts(self):
+        """Ajoute à l'index de recherche les textes reçus depuis le dernier passage"""
+        if not self.to_index:
+            return
+        entries, self.to_index = self.to_index, []
+        try:
+            self.index.add_many(entries)
+        except sqlite3.Error as e:
+            print(f"Indexation impossible : {e}")
+
+    def _update_summary(self):
+        total = len(self.paths)
+        elapsed = time.perf_counter() - self.start_time if self.start_time else 0.0
+        rate = self.done / elapsed if elapsed > 0 else 0.0
+        self.progress.set(self.done / total if total else 1)
+        self.summary_label.configure(
+            text=f"{self.done}/{total} traité(s) · {self.errors} erreur(s) · "
+                 f"{self.running} en cours · {rate:.2f} fichiers/s"
+        )
+
+    def _open_sink(self):
+        """Ouvre la sortie ; les fichiers qu'elle contient déjà (lot relancé) sont marqués sans être relus"""
+        try:
+            os.makedirs(self.output_dir, exist_ok=True)
+            # Sous-dossiers reproduits dans la sortie (fichiers homonymes de dossiers différents)
+            base = output_base(os.path.dirname(split_page_ref(path)[0]) for path in self.paths)
+            self.sink = open_sink(self.sink_spec, self.output_dir, base=base)
+            written = self.sink.written()
+        except (OSError, sqlite3.Error, ValueError) as e:
+            self.sink = None
+            print(f"Sortie indisponible, résultats non enregistrés : {e}")
+            return
+        if not written:
+            return
+        for index in list(self.pending):
+            if page_key(self.paths[index]) in written:
+                self.pending.remove(index)
+                self.done += 1
+                self.tree.set(str(index), "state", "✓ Déjà présent")
+
+    def _close_sink(self):
+        """Écrit les résultats en attente dans la sortie"""
+        if self.sink is None:
+            return
+        sink, self.sink = self.sink, None
+        try:
+            sink.close()
+        except (OSError, sqlite3.Error) as e:
+            print(f"Écriture des derniers résultats impossible : {e}")
+
+    def _finish_batch(self):
+        if self.executor:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+        self._close_sink()
+        self.cancel_btn.configure(state="disabled")
+        self._update_summary()
+        where = f" → {self.output_dir}" if self.output_dir and self.done else ""
+        state = "Lot annulé" if self.cancelled else "Lot terminé"
+        self.summary_label.configure(text=f"{state} : {self.summary_label.cget('text')}{where}")
+
+    def cancel(self):
+        """Annule les fichiers en attente ; ceux en cours se terminent"""
+        self.cancelled = True
+        for index in self.pending:
+            self.tree.set(str(index), "state", "Annulé")
+        self.pending.clear()
+        self.cancel_btn.configure(state="disabled")
+
+    def close(self):
+        self.cancel()
+        if self.executor:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+        self._close_sink()
+        self.destroy()
+
+    def _show_selected(self, event=None):
+        selection = self.tree.selection()
+        if not selection or not self.on_select:
+            return
+        index = int(selection[0])
+        if index in self.texts:
+            self.on_select(self.paths[index], self.texts[index])
+
+
+def _display_name(path: str) -> str:
+    """Nom affiché : fichier, avec le numéro de page pour un document multipage"""
+    source, page = split_page_ref(path)
+    name = os.path.basename(source)
+    return f"{name} (page {page})" if page else name
+
@@ -8,12 +8,56 @@ Modifiez ce fichier pour personnaliser l'apparence et le comportement
 # ============================================================================
 
 # Chemin vers l'exécutable tesseract.exe
-# Changez si vous l'avez installé ailleurs
+# Changez si vous l'avez installé ailleurs ; ignoré s'il n'existe pas (tesseract est alors cherché dans le PATH)
 TESSERACT_PATH = r"C:\Program Files\Tesseract-OCR\tesseract.exe"
 
 # Langue OCR (ajouter d'autres codes comme 'fra+eng')
 OCR_LANGUAGE = None  # None = automatique (multi-langue); 'eng' = anglais; 'fra' = français
 
+# Prétraitement appliqué avant l'OCR : étapes séparées par "|", paramètres clé=valeur
+# Étapes : gray, resize, blur, median, denoise, otsu, adaptive, sauvola, morph, deskew, crop
+# Exemple pour scans difficiles : "gray | denoise h=12 | sauvola window=31 k=0.2 | deskew"
+PREPROCESS_PIPELINE = "gray | blur k=5 | otsu"
+
+# Hauteur de caractère visée en pixels (0 = désactivé ; 25 conseillé pour les photos)
+# Les grandes images sont réduites avant binarisation : Tesseract va plus vite
+NORMALIZE_X_HEIGHT = 0
+
+# Moteur OCR : "tesserocr" = libtesseract dans le processus (modèle gardé chargé) ;
+# "tesseract" = exécutable ; "fake" = moteur factice (tests) ; "auto" = tesserocr s'il est installé
+OCR_ENGINE = "auto"
+
+# Transport de l'image vers l'exécutable tesseract (moteur "tesseract")
+# "file" = fichiers temporaires (pytesseract) ; "pipe" = en mémoire via stdin/stdout
+OCR_TRANSPORT = "file"
+
+# Délai maximal d'une extraction en secondes (0 = aucun) ; au-delà, Tesseract est tué
+# S'applique aussi à chaque fichier du traitement par lots
+OCR_TIMEOUT = 120
+
+# Mots dont la confiance Tesseract (0-100) est inférieure à ce seuil : surlignés (0 = désactivé)
+LOW_CONFIDENCE = 60
+
+# Lignes de confiance moyenne inférieure à ce seuil relues avec un prétraitement lourd
+# (agrandissement, débruitage, seuillage adaptatif) ; 0 = désactivé. Coût : seulement les lignes faibles
+REFINE_CONFIDENCE = 0
+
+# ============================================================================
+# TRAITEMENT PAR LOTS (bouton "Traiter un dossier")
+# ============================================================================
+
+# Nombre de fichiers traités en parallèle (processus) ; 0 = nombre de cœurs
+BATCH_WORKERS = 0
+
+# Dossier des fichiers <nom>_ocr.txt ; vide = sous-dossier "ocr" du dossier traité
+BATCH_OUTPUT_DIR = ""
+
+# Sortie des résultats du lot (voir src/core/sinks.py) :
+# "dir" = un fichier <nom>_ocr.txt par image ; "jsonl" / "sqlite" = un seul fichier
+# ocr_results.jsonl / ocr_results.sqlite3 dans le dossier de sortie, écrit par lots
+# (conseillé sur un partage réseau ; un lot relancé saute les images déjà présentes)
+BATCH_SINK = "dir"
+
 # ============================================================================
 # CONFIGURATION INTERFACE UTILISATEUR
 # ============================================================================
@@ -60,6 +104,9 @@ COLORS = {
 # Taille maximale de l'aperçu en pixels (largeur, hauteur)
 PREVIEW_MAX_SIZE = (300, 300)
 
+# Nombre d'aperçus récents gardés en mémoire (réouverture instantanée)
+PREVIEW_CACHE_SIZE = 32
+
 # ============================================================================
 # ZONE DE TEXTE
 # ============================================================================
@@ -78,6 +125,23 @@ DEFAULT_SAVE_FILENAME = "texte_ocr.txt"
 # Répertoire par défaut pour sauvegarder (si vide, utilise le dernier)
 DEFAULT_SAVE_DIR = ""
 
+# ============================================================================
+# CACHE DES RÉSULTATS OCR
+# ============================================================================
+
+# Dossier du cache disque des résultats (vide = cache désactivé)
+# Une image déjà traitée (mêmes octets, même langue, même Tesseract) est relue
+CACHE_DIR = ""
+
+# Taille maximale du cache en Mo (les entrées les moins utilisées sont évincées)
+CACHE_MAX_MB = 512
+
+# Index de recherche plein texte (fichier SQLite, vide = recherche désactivée)
+# Chaque extraction (image seule ou lot) y est ajoutée ; la zone de recherche
+# retrouve les pages par mots, "phrases" ou préfixes*, sans tenir compte des accents
+# Le même fichier peut être alimenté par le CLI : python -m src.core.main scans/ --index FICHIER
+SEARCH_INDEX = ""
+
 # ============================================================================
 # COMPORTEMENT APPLICATION
 # ============================================================================
@@ -125,3 +189,7 @@ LOG_LEVEL = "INFO"
 
 # Fichier log
 LOG_FILE = "ocr_gui.log"
+
+# Afficher le temps de chaque étape (lecture, prétraitement, OCR) dans la barre
+# d'état après chaque extraction. False : aucune mesure n'est prise.
+TRACE_STAGES = True
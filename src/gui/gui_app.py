@@ -2,13 +2,21 @@
 Application GUI OCR moderne avec CustomTkinter
 Réutilise les fonctions OCR existantes de functions.py
 
+L'image pleine résolution n'est décodée qu'une fois, au moment de l'OCR ;
+l'aperçu vient d'un décodage réduit conservé dans un cache LRU (preview.py).
+OpenCV n'est chargé qu'au premier aperçu (lazy.py) : la fenêtre s'affiche
+aussitôt, puis Tesseract est sondé (résultat mémorisé sur disque, probe.py).
+
 Fonctionnalités :
 - Interface moderne et intuitive
 - Aperçu de l'image
-- Extraction OCR avec barre de progression
-- Sauvegarde du texte avec dialog
+- Extraction OCR annulable, avec délai maximal (OCR_TIMEOUT) et progression
+- Mots peu sûrs surlignés (confiance < LOW_CONFIDENCE), lignes faibles relues (REFINE_CONFIDENCE)
+- Sauvegarde du texte avec dialog (texte, hOCR, ALTO ou JSON)
 - Gestion d'erreurs et messages visuels
-- Raccourcis clavier (Ctrl+O, Ctrl+S, Ctrl+E)
+- Traitement d'un dossier entier dans un panneau de suivi (batch_panel.py)
+- Recherche plein texte dans les textes déjà lus (SEARCH_INDEX, search_panel.py)
+- Raccourcis clavier (Ctrl+O, Ctrl+S, Ctrl+E, Ctrl+F)
 
 Auteur: OCR GUI Upgrade
 Date: 2026-02-01
@@ -20,16 +28,33 @@ import tkinter as tk
 from tkinter import filedialog as tk_filedialog
 from tkinter import messagebox as tk_messagebox
 from PIL import Image, ImageTk
+import json
 import os
+import queue
+import sqlite3
 import sys
-import threading
+import time
 from pathlib import Path
 
 # Importer les fonctions OCR existantes
+from src.core.batch import collect_image_paths, default_workers
 from src.core.functions import load_image, preprocess_image
-import pytesseract
-import shutil
-import platform
+from src.core.pipeline import get_pipeline
+from src.core.cache import open_cache, result_key
+from src.core.documents import MULTIPAGE_EXTENSIONS, load_page, page_count
+from src.core.preview import ThumbnailCache
+from src.core.refine import refine_layout
+from src.core.backends import get_backend
+from src.core.engine import configure_tesseract
+from src.core.export import export
+from src.core.jobs import Job
+from src.core.layout import Layout
+from src.core.probe import probe_tesseract
+from src.core.search import open_search_index
+from src.core.sinks import open_sink
+from src.core.trace import Trace, format_breakdown, record
+from src.gui.batch_panel import BatchPanel
+from src.gui.search_panel import SearchPanel
 
 # Importer la configuration (optionnel, fallback à des valeurs par défaut)
 try:
@@ -38,6 +63,16 @@ except ImportError:
     # Valeurs par défaut si config.py n'existe pas
     TESSERACT_PATH = r"C:\Program Files\Tesseract-OCR\tesseract.exe"
     OCR_LANGUAGE = None
+    OCR_ENGINE = "auto"
+    OCR_TRANSPORT = "file"
+    OCR_TIMEOUT = 120
+    LOW_CONFIDENCE = 60
+    REFINE_CONFIDENCE = 0
+    BATCH_WORKERS = 0
+    BATCH_OUTPUT_DIR = ""
+    BATCH_SINK = "dir"
+    PREPROCESS_PIPELINE = "gray | blur k=5 | otsu"
+    NORMALIZE_X_HEIGHT = 0
     APPEARANCE_MODE = "light"
     COLOR_THEME = "blue"
     WINDOW_WIDTH = 1200
@@ -45,15 +80,30 @@ except ImportError:
     START_MAXIMIZED = False
     RESIZABLE = True
     PREVIEW_MAX_SIZE = (300, 300)
+    PREVIEW_CACHE_SIZE = 32
     TEXT_FONT_FAMILY = "Courier New"
     TEXT_FONT_SIZE = 10
     CENTER_WINDOW = True
+    CACHE_DIR = ""
+    CACHE_MAX_MB = 512
+    SEARCH_INDEX = ""
+    TRACE_STAGES = True
 
 # ============================================================================
 # Configuration Tesseract (réutilisée du main.py)
 # ============================================================================
-if os.path.exists(TESSERACT_PATH):
-    pytesseract.pytesseract.tesseract_cmd = TESSERACT_PATH
+# Chemin configuré s'il existe, sinon découverte automatique (sonde mémorisée, voir probe.py)
+configure_tesseract(TESSERACT_PATH)
+
+
+# Intervalle de lecture de l'état du travail OCR (millisecondes)
+POLL_INTERVAL = 100
+
+# Extension choisie à la sauvegarde -> format d'export (voir export.py)
+SAVE_FORMATS = {'.txt': 'txt', '.hocr': 'hocr', '.xml': 'alto', '.json': 'json'}
+
+# Extensions de sauvegarde ajoutant le texte à une sortie groupée (voir src/core/sinks.py)
+SINK_EXTENSIONS = {'.jsonl': 'jsonl', '.sqlite3': 'sqlite', '.db': 'sqlite'}
 
 
 # ============================================================================
@@ -72,10 +122,17 @@ class OCRApp(ctk.CTk):
 
         # Variables d'état
         self.current_image_path = None
-        self.current_image = None
+        self.current_image = None  # Image pleine résolution, décodée à la demande
+        self.page_count = 1  # Pages du document courant (TIFF multipage, PDF)
         self.extracted_text = None
+        self.text_path = None  # Image (ou page `scan.pdf#page=3`) dont le texte est affiché
         self.is_processing = False
         self.image_preview_photo = None  # Référence pour aperçu image
+        self.thumbnails = ThumbnailCache(PREVIEW_CACHE_SIZE, PREVIEW_MAX_SIZE)  # Aperçus récents
+        self.last_trace = None  # Mesures par étape de la dernière extraction
+        self.last_layouts = None  # Mots, rectangles et confiances de la dernière extraction (un Layout par page)
+        self.job = None  # Travail OCR en cours (jobs.Job)
+        self.progress_messages = queue.Queue()  # Progression du travail, lue par _poll_job
 
         # Thème personnalisé
         ctk.set_appearance_mode(APPEARANCE_MODE)
@@ -96,6 +153,9 @@ class OCRApp(ctk.CTk):
         # Lier les raccourcis clavier
         self._bind_shortcuts()
 
+        # Tesseract sondé une fois la fenêtre affichée
+        self.after(200, self._probe_tesseract)
+
     # ========================================================================
     # Création de l'interface utilisateur
     # ========================================================================
@@ -161,6 +221,28 @@ class OCRApp(ctk.CTk):
         )
         self.extract_btn.grid(row=0, column=1, sticky="ew", padx=(8, 0))
 
+        # Bouton Traiter un dossier
+        self.batch_btn = CTkButton(
+            controls_frame,
+            text="📁 Traiter un dossier",
+            command=self.open_batch,
+            font=("Helvetica", 12, "bold"),
+            height=40,
+            fg_color="#5856D6",
+            hover_color="#4644B0",
+            text_color="white",
+        )
+        self.batch_btn.grid(row=1, column=0, columnspan=2, sticky="ew", pady=(10, 0))
+
+        # Champ de recherche dans les textes indexés
+        self.search_entry = ctk.CTkEntry(
+            controls_frame,
+            placeholder_text="🔍 Rechercher dans les textes lus (Entrée)",
+            height=36,
+        )
+        self.search_entry.grid(row=2, column=0, columnspan=2, sticky="ew", pady=(10, 0))
+        self.search_entry.bind("<Return>", lambda e: self.search_texts())
+
         # --- Zone d'aperçu image ---
         preview_label = CTkLabel(
             left_frame,
@@ -241,6 +323,7 @@ class OCRApp(ctk.CTk):
             border_color="#CCCCCC",
         )
         self.text_box.grid(row=1, column=0, sticky="nsew")
+        self.text_box.tag_config("low_conf", background="#FFE08A")
 
         # --- Boutons d'action pour le texte ---
         text_actions_frame = ctk.CTkFrame(right_frame, fg_color="transparent")
@@ -297,42 +380,51 @@ class OCRApp(ctk.CTk):
         file_path = tk_filedialog.askopenfilename(
             title="Sélectionner une image",
             filetypes=[
-                ("Images", "*.png *.jpg *.jpeg *.bmp *.tiff"),
+                ("Images et documents", "*.png *.jpg *.jpeg *.bmp *.tif *.tiff *.pdf"),
                 ("PNG", "*.png"),
                 ("JPEG", "*.jpg *.jpeg"),
+                ("TIFF (multipage)", "*.tif *.tiff"),
+                ("PDF", "*.pdf"),
                 ("Tous les fichiers", "*.*"),
             ],
         )
 
-        if not file_path:
-            return
+        if file_path:
+            self.open_path(file_path)
+
+    def open_path(self, file_path):
+        """Charge l'aperçu de `file_path` et prépare son extraction"""
+        self.cancel_ocr()
 
         try:
-            # Charger l'image avec OpenCV
-            img = load_image(file_path)
-            self.current_image = img
+            # Seul l'aperçu est décodé ici (à taille réduite, ou relu du cache) :
+            # l'image pleine résolution attend l'OCR
+            pages = page_count(file_path) if file_path.lower().endswith(MULTIPAGE_EXTENSIONS) else 1
+            thumb = self.thumbnails.get(file_path)
+            self.current_image = None
             self.current_image_path = file_path
+            self.page_count = pages
 
             # Afficher l'aperçu
-            self.show_image_preview(file_path)
+            self.show_image_preview(file_path, thumb)
 
             # Mettre à jour l'état
-            self.update_status("Image chargée", "#34C759")
+            self.update_status("Image chargée" if pages == 1 else f"Document chargé ({pages} pages)", "#34C759")
             self.extract_btn.configure(state="normal")
 
         except Exception as e:
             self.show_error(f"Erreur lors du chargement de l'image:\n{str(e)}")
             self.update_status("Erreur de chargement", "#FF3B30")
+            return False
+        return True
 
-    def show_image_preview(self, image_path):
+    def show_image_preview(self, image_path, thumb=None):
         """Affiche un aperçu redimensionné de l'image"""
         try:
-            # Ouvrir l'image avec Pillow
-            img = Image.open(image_path)
-
-            # Redimensionner pour l'aperçu (max 300x300)
-            max_size = (300, 300)
-            img.thumbnail(max_size, Image.Resampling.LANCZOS)
+            # Aperçu OpenCV (BGR) déjà réduit à PREVIEW_MAX_SIZE -> image Pillow (RGB)
+            if thumb is None:
+                thumb = self.thumbnails.get(image_path)
+            img = Image.fromarray(thumb[:, :, ::-1])
 
             # Convertir en PhotoImage Tkinter
             photo = ImageTk.PhotoImage(img)
@@ -347,78 +439,282 @@ class OCRApp(ctk.CTk):
             self.image_label.configure(text="Erreur affichage image")
 
     def run_ocr_threaded(self):
-        """Lance l'OCR dans un thread pour ne pas bloquer l'UI"""
+        """Lance l'OCR dans un travail annulable pour ne pas bloquer l'UI"""
         if not self.current_image_path:
             self.show_error("Aucune image chargée")
             return
+        if self.job is not None:
+            return
 
-        # Désactiver le bouton et afficher un indicateur
-        self.extract_btn.configure(state="disabled", text="⏳ OCR en cours...")
+        # Le bouton d'extraction devient le bouton d'annulation
+        self.extract_btn.configure(
+            text="⏹ Annuler", command=self.cancel_ocr,
+            fg_color="#FF3B30", hover_color="#E02420",
+        )
         self.is_processing = True
         self.update_status("OCR en cours...", "#FF9500")
 
-        # Lancer l'OCR dans un thread séparé
-        thread = threading.Thread(target=self._run_ocr_internal, daemon=True)
-        thread.start()
+        # Le travail ne touche jamais aux widgets : progression via une file, résultat via le Job
+        self.progress_messages = queue.Queue()
+        self.job = Job(self._ocr_job, self.current_image_path, timeout=OCR_TIMEOUT).start()
+        self.after(POLL_INTERVAL, self._poll_job)
+
+    def cancel_ocr(self):
+        """Annule l'OCR en cours (le processus Tesseract est tué)"""
+        if self.job is not None:
+            self.job.cancel()
+
+    def _ocr_job(self, image_path):
+        """Extraction complète (exécutée dans le fil du travail) -> (pages, depuis le cache, trace)
+
+        `pages` : un `Layout` par page (texte, rectangles et confiances des mots).
+        """
+        trace = Trace(image_path) if TRACE_STAGES else None
+
+        # Cache disque : une image déjà traitée est simplement relue
+        cache = key = None
+        if CACHE_DIR:
+            cache = open_cache(CACHE_DIR, CACHE_MAX_MB * 1024 * 1024)
+            # Entrée propre à la GUI (liste de pages) : le CLI range un seul `Layout` sous " || layout"
+            params = self._pipeline().spec + " || pages"
+            if REFINE_CONFIDENCE:
+                params += f" || refine={REFINE_CONFIDENCE}"
+            key = result_key(image_path, params, OCR_LANGUAGE, self._backend().version())
+            stored = cache.get(key)
+            if stored is not None:
+                return [Layout.from_dict(page) for page in json.loads(stored)], True, trace
+
+        pages = self._ocr_document(trace)
+        if cache:
+            cache.put(key, json.dumps([page.to_dict() for page in pages], ensure_ascii=False))
+        return pages, False, trace
+
+    def _poll_job(self):
+        """Relaie la progression du travail OCR puis affiche son résultat (boucle Tkinter)"""
+        job = self.job
+        if job is None:
+            return
 
-    def _run_ocr_internal(self):
-        """Lance l'OCR (appelé dans un thread)"""
-        try:
-            # Vérifier que Tesseract est configuré
+        # Seul le dernier message de progression est affiché
+        status = None
+        while True:
             try:
-                import cv2
-                processed = preprocess_image(self.current_image)
-                text = pytesseract.image_to_string(processed)
-            except pytesseract.pytesseract.TesseractNotFoundError:
-                # Chercher Tesseract automatiquement
-                def find_tesseract_executable():
-                    path = shutil.which('tesseract')
-                    if path:
-                        return path
-
-                    if platform.system().lower().startswith('win'):
-                        common = [
-                            r"C:\Program Files\Tesseract-OCR\tesseract.exe",
-                            r"C:\Program Files (x86)\Tesseract-OCR\tesseract.exe",
-                        ]
-                        for p in common:
-                            if os.path.exists(p):
-                                return p
-                    return None
-
-                found = find_tesseract_executable()
-                if found:
-                    pytesseract.pytesseract.tesseract_cmd = found
-                    processed = preprocess_image(self.current_image)
-                    text = pytesseract.image_to_string(processed)
-                else:
-                    raise RuntimeError("Tesseract OCR non trouvé. Veuillez l'installer.")
+                status = self.progress_messages.get_nowait()
+            except queue.Empty:
+                break
+
+        if job.expired():
+            job.cancel('timeout')
+        if not job.done:
+            if status:
+                self.update_status(status, "#FF9500")
+            self.after(POLL_INTERVAL, self._poll_job)
+            return
 
-            # Stocker et afficher le texte
-            self.extracted_text = text
-            self.text_box.delete("1.0", "end")
-            self.text_box.insert("1.0", text)
+        self.job = None
+        self.is_processing = False
+        self.extract_btn.configure(
+            text="⚙️ Extraire le texte", command=self.run_ocr_threaded,
+            fg_color="#34C759", hover_color="#27A844",
+            state="normal" if self.current_image_path else "disabled",
+        )
+
+        if job.state == 'cancelled':
+            self.update_status("OCR annulé", "#8E8E93")
+        elif job.state == 'timeout':
+            self.update_status(f"Délai dépassé ({job.timeout:g} s) : OCR interrompu", "#FF3B30")
+        elif job.state == 'failed':
+            error_msg = f"Erreur OCR: {job.error}"
+            print(error_msg)  # Log
+            self.show_error(error_msg)
+            self.update_status("Erreur OCR", "#FF3B30")
+        else:
+            pages, from_cache, trace = job.result
+
+            # Stocker et afficher le texte, mots peu sûrs surlignés
+            low = self._show_pages(pages)
+            self._index_pages(self.current_image_path, pages)
 
             # Activer les boutons de sauvegarde
             self.save_btn.configure(state="normal")
             self.copy_btn.configure(state="normal")
 
             # Mettre à jour l'état
-            self.update_status("OCR terminé ✓", "#34C759")
+            self.last_trace = trace
+            status = "OCR terminé ✓ (cache)" if from_cache else "OCR terminé ✓"
+            if low:
+                status += f" - {low} mot(s) peu sûr(s) surligné(s)"
+            self.update_status(status, "#34C759", trace)
+
+    def _show_pages(self, pages):
+        """Affiche le texte des pages et surligne les mots de confiance < LOW_CONFIDENCE
+
+        Retourne le nombre de mots surlignés.
+        """
+        parts, marks = [], []
+        pos = 0
+        for number, layout in enumerate(pages, 1):
+            if len(pages) > 1:
+                header = ("\n" if number > 1 else "") + f"--- Page {number} ---\n"
+                parts.append(header)
+                pos += len(header)
+            text, spans = layout.spans()
+            if LOW_CONFIDENCE:
+                marks.extend(spans[layout.low_confidence(LOW_CONFIDENCE)] + pos)
+            parts.append(text)
+            pos += len(text)
+
+        self.extracted_text = "".join(parts)
+        self.text_path = self.current_image_path
+        self.last_layouts = pages
+        self.text_box.delete("1.0", "end")
+        self.text_box.insert("1.0", self.extracted_text)
+        for start, end in marks:
+            self.text_box.tag_add("low_conf", f"1.0+{start}c", f"1.0+{end}c")
+        return len(marks)
+
+    def _ocr_document(self, trace=None):
+        """OCR de l'image courante, ou de chaque page d'un document multipage -> un `Layout` par page"""
+        if self.page_count == 1:
+            img = self._full_image(trace)
+            processed = preprocess_image(img, self._pipeline(), trace)
+            return [self._recognize(processed, img, trace)]
+
+        # Pages décodées une à une : le document n'est jamais entièrement en mémoire
+        pages = []
+        for page in range(1, self.page_count + 1):
+            self.progress_messages.put(f"OCR page {page}/{self.page_count}...")
+            start = time.perf_counter()
+            img = load_page(self.current_image_path, page)
+            record(trace, 'load', time.perf_counter() - start, shape=img.shape)
+            processed = preprocess_image(img, self._pipeline(), trace)
+            pages.append(self._recognize(processed, img, trace))
+        return pages
+
+    def open_batch(self):
+        """Choisit un dossier et ouvre le panneau de traitement par lots"""
+        folder = tk_filedialog.askdirectory(title="Sélectionner un dossier d'images")
+        if not folder:
+            return
 
-        except Exception as e:
-            error_msg = f"Erreur OCR: {str(e)}"
-            print(error_msg)  # Log
-            self.show_error(error_msg)
-            self.update_status("Erreur OCR", "#FF3B30")
+        paths = collect_image_paths([folder])
+        if not paths:
+            self.show_error("Aucune image trouvée dans ce dossier")
+            return
 
-        finally:
-            # Réactiver le bouton
-            self.extract_btn.configure(state="normal", text="⚙️ Extraire le texte")
-            self.is_processing = False
+        options = {
+            'lang': OCR_LANGUAGE, 'engine': OCR_ENGINE, 'transport': OCR_TRANSPORT,
+            'pipeline': PREPROCESS_PIPELINE, 'x_height': NORMALIZE_X_HEIGHT,
+            'timeout': OCR_TIMEOUT,
+        }
+        if REFINE_CONFIDENCE:
+            options['refine'] = REFINE_CONFIDENCE
+        if CACHE_DIR:
+            options.update(cache_dir=CACHE_DIR, cache_max_bytes=CACHE_MAX_MB * 1024 * 1024)
+
+        panel = BatchPanel(
+            self, paths, options,
+            workers=BATCH_WORKERS or default_workers(),
+            output_dir=BATCH_OUTPUT_DIR or os.path.join(folder, "ocr"),
+            on_select=self.show_batch_result,
+            index=self._search_index(),
+            sink=BATCH_SINK,
+        )
+        panel.start()
+        self.update_status(f"Lot de {len(paths)} fichier(s) lancé", "#FF9500")
+
+    def show_batch_result(self, path, text):
+        """Affiche dans la zone de texte le résultat d'un fichier du lot"""
+        self.extracted_text = text
+        self.text_path = path
+        self.last_layouts = None
+        self.text_box.delete("1.0", "end")
+        self.text_box.insert("1.0", text)
+        self.save_btn.configure(state="normal")
+        self.copy_btn.configure(state="normal")
+        self.update_status(f"Résultat : {os.path.basename(path)}", "#34C759")
+
+    def _search_index(self):
+        """Index plein texte SEARCH_INDEX, ou None s'il n'est pas configuré ou indisponible"""
+        if not SEARCH_INDEX:
+            return None
+        try:
+            return open_search_index(SEARCH_INDEX)
+        except (RuntimeError, OSError, sqlite3.Error) as e:
+            print(f"Index de recherche indisponible : {e}")
+            return None
+
+    def _index_pages(self, path, pages):
+        """Ajoute le texte de chaque page lue à l'index de recherche"""
+        index = self._search_index()
+        if index is None:
+            return
+        try:
+            index.add_many((path, number, layout.text()) for number, layout in enumerate(pages, 1))
+        except sqlite3.Error as e:
+            print(f"Indexation impossible : {e}")
+
+    def search_texts(self):
+        """Ouvre le panneau de résultats pour la requête du champ de recherche"""
+        index = self._search_index()
+        if index is None:
+            self.show_error("Recherche indisponible : renseigner SEARCH_INDEX dans config.py")
+            return
+        SearchPanel(self, index, self.search_entry.get().strip(), on_select=self.show_search_result)
+
+    def show_search_result(self, path, page, text):
+        """Ouvre l'image d'un résultat de recherche et affiche son texte indexé"""
+        # Image déplacée ou supprimée depuis l'indexation : le texte seul est affiché
+        if os.path.exists(path):
+            self.open_path(path)
+        self.show_batch_result(path, text)
+        if page > 1 or self.page_count > 1:
+            self.update_status(f"Résultat : {os.path.basename(path)} (page {page}/{self.page_count})", "#34C759")
+
+    def _full_image(self, trace=None):
+        """Image pleine résolution, décodée une seule fois puis partagée entre les extractions"""
+        if self.current_image is not None:
+            return self.current_image
+
+        path = self.current_image_path
+        start = time.perf_counter()
+        img = load_page(path, 1) if path.lower().endswith('.pdf') else load_image(path)
+        record(trace, 'load', time.perf_counter() - start, shape=img.shape)
+        # Un travail annulé peut finir son décodage après le chargement d'une autre image
+        if path == self.current_image_path:
+            self.current_image = img
+        return img
+
+    def _pipeline(self):
+        """Pipeline de prétraitement configuré (avec normalisation de résolution éventuelle)"""
+        return get_pipeline(PREPROCESS_PIPELINE, NORMALIZE_X_HEIGHT)
+
+    def _backend(self):
+        """Moteur OCR configuré (OCR_ENGINE, voir backends.py), partagé entre les extractions"""
+        return get_backend(OCR_ENGINE, OCR_TRANSPORT)
+
+    def _recognize(self, processed, img, trace=None):
+        """Appelle le moteur OCR configuré (exécutable tesseract, tesserocr...) -> `Layout`
+
+        Une seule reconnaissance donne le texte et les confiances des mots ;
+        les rectangles sont ramenés à l'image d'origine `img`. Avec
+        REFINE_CONFIDENCE, les lignes faibles sont relues (voir refine.py).
+        """
+        start = time.perf_counter()
+        # Dans un Job, le processus tesseract est tué si le travail est annulé
+        layout = self._backend().recognize_layout(processed, OCR_LANGUAGE)
+        record(trace, 'ocr', time.perf_counter() - start, shape=processed.shape)
+        layout = layout.to_source(processed.shape, img.shape)
+        if REFINE_CONFIDENCE:
+            self.progress_messages.put("Reprise des lignes peu sûres...")
+            layout = refine_layout(img, layout, self._backend(), REFINE_CONFIDENCE, OCR_LANGUAGE, timings=trace)
+        return layout
 
     def save_text(self):
-        """Sauvegarde le texte extrait dans un fichier .txt"""
+        """Sauvegarde le texte extrait (.txt) ou le résultat structuré (.hocr, .xml ALTO, .json)
+
+        Un fichier .jsonl ou .sqlite3 existant n'est pas écrasé : le texte y est ajouté (voir `_save_to_sink`).
+        """
         if not self.extracted_text:
             self.show_error("Aucun texte à sauvegarder")
             return
@@ -426,16 +722,33 @@ class OCRApp(ctk.CTk):
         # Dialog pour choisir le chemin de sauvegarde
         file_path = tk_filedialog.asksaveasfilename(
             defaultextension=".txt",
-            filetypes=[("Fichier texte", "*.txt"), ("Tous les fichiers", "*.*")],
+            filetypes=[
+                ("Fichier texte", "*.txt"), ("hOCR", "*.hocr"), ("ALTO XML", "*.xml"),
+                ("JSON (mots, rectangles, confiances)", "*.json"),
+                ("JSON Lines (ajout)", "*.jsonl"), ("SQLite (ajout)", "*.sqlite3"), ("Tous les fichiers", "*.*"),
+            ],
             initialfile="texte_ocr.txt",
         )
 
         if not file_path:
             return
 
+        extension = os.path.splitext(file_path)[1].lower()
+        if extension in SINK_EXTENSIONS:
+            self._save_to_sink(SINK_EXTENSIONS[extension], file_path)
+            return
+
+        fmt = SAVE_FORMATS.get(extension, 'txt')
+        if fmt != 'txt' and (not self.last_layouts or len(self.last_layouts) != 1):
+            self.show_error("Export hOCR / ALTO / JSON : disponible pour une image d'une page extraite ici")
+            return
+
         try:
             with open(file_path, "w", encoding="utf-8") as f:
-                f.write(self.extracted_text)
+                if fmt == 'txt':
+                    f.write(self.extracted_text)
+                else:
+                    f.write(export(self.last_layouts[0], fmt, self.current_image_path or ''))
 
             self.show_success(f"Texte sauvegardé avec succès !\n{os.path.basename(file_path)}")
             self.update_status("Texte sauvegardé ✓", "#34C759")
@@ -443,6 +756,29 @@ class OCRApp(ctk.CTk):
         except Exception as e:
             self.show_error(f"Erreur lors de la sauvegarde:\n{str(e)}")
 
+    def _save_to_sink(self, kind, file_path):
+        """Ajoute le texte affiché (une ligne par page) à la sortie JSONL ou SQLite `file_path`"""
+        if not self.text_path:
+            self.show_error("Aucune image associée à ce texte")
+            return
+        try:
+            with open_sink(f"{kind}:{file_path}") as sink:
+                if self.last_layouts:
+                    written = [sink.write(self.text_path, layout.text(), page=number)
+                               for number, layout in enumerate(self.last_layouts, 1)]
+                else:
+                    written = [sink.write(self.text_path, self.extracted_text)]
+        except Exception as e:
+            self.show_error(f"Erreur lors de la sauvegarde:\n{str(e)}")
+            return
+
+        name = os.path.basename(file_path)
+        if any(written):
+            self.show_success(f"Texte ajouté à {name}")
+            self.update_status("Texte sauvegardé ✓", "#34C759")
+        else:
+            self.update_status(f"Déjà présent dans {name} : non réécrit", "#8E8E93")
+
     def copy_text(self):
         """Copie le texte extrait dans le presse-papiers"""
         if not self.extracted_text:
@@ -458,9 +794,13 @@ class OCRApp(ctk.CTk):
 
     def clear_all(self):
         """Efface tout (image, texte, état)"""
+        self.cancel_ocr()
         self.current_image_path = None
         self.current_image = None
+        self.page_count = 1
         self.extracted_text = None
+        self.text_path = None
+        self.last_layouts = None
         self.image_preview_photo = None
 
         # Réinitialiser l'UI
@@ -479,8 +819,23 @@ class OCRApp(ctk.CTk):
     # Méthodes utilitaires UI
     # ========================================================================
 
-    def update_status(self, status_text, color):
-        """Met à jour l'indicateur d'état"""
+    def _probe_tesseract(self):
+        """Affiche la version et les langues de Tesseract (relues du fichier de sondes)"""
+        if self.is_processing:
+            return
+        try:
+            info = probe_tesseract(TESSERACT_PATH)
+        except RuntimeError:
+            self.update_status("Tesseract introuvable : installez-le ou corrigez TESSERACT_PATH", "#FF3B30")
+            return
+        if not self.current_image_path:
+            langs = ", ".join(info['langs']) or "aucune langue"
+            self.update_status(f"Prêt - {info['version']} ({langs})", "#CCCCCC")
+
+    def update_status(self, status_text, color, trace=None):
+        """Met à jour l'indicateur d'état (avec le temps par étape si `trace` est fourni)"""
+        if trace:
+            status_text = f"{status_text}  —  {format_breakdown(trace)}"
         self.status_indicator.configure(fg_color=color)
         self.status_text.configure(text=status_text)
 
@@ -504,6 +859,7 @@ class OCRApp(ctk.CTk):
         self.bind("<Control-o>", lambda e: self.load_image())  # Ctrl+O : Ouvrir
         self.bind("<Control-s>", lambda e: self.save_text())   # Ctrl+S : Sauvegarder
         self.bind("<Control-e>", lambda e: self.run_ocr_threaded())  # Ctrl+E : Extraire
+        self.bind("<Control-f>", lambda e: self.search_entry.focus_set())  # Ctrl+F : Rechercher
 
 
 # ============================================================================
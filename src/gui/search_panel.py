@@ -0,0 +1,134 @@
+"""
+Panneau de recherche plein texte de la GUI OCR
+Fenêtre listant les pages de l'index (SEARCH_INDEX) qui correspondent à une requête.
+
+Fonctionnalités :
+- Requête : mots (accents et casse ignorés), "phrase exacte", préfixe*, OR, -exclusion
+- Une ligne par page trouvée : fichier, page, extrait avec les termes [marqués]
+- Plus de résultats : les suivants sont lus par pages de DEFAULT_LIMIT
+- Double-clic sur une ligne : ouvre l'image et affiche son texte indexé dans la fenêtre principale
+
+Les recherches tiennent en quelques millisecondes (voir src/core/search.py) :
+elles s'exécutent directement dans la boucle Tkinter, sans travail en arrière-plan.
+"""
+
+import os
+import sqlite3
+import time
+from tkinter import ttk
+
+import customtkinter as ctk
+from customtkinter import CTkButton, CTkEntry, CTkLabel
+
+from src.core.search import DEFAULT_LIMIT
+
+
+class SearchPanel(ctk.CTkToplevel):
+    """Fenêtre de résultats d'une recherche dans l'index plein texte"""
+
+    def __init__(self, master, index, query="", on_select=None):
+        super().__init__(master)
+        self.title("Recherche dans les textes")
+        self.geometry("820x480")
+
+        self.index = index
+        self.on_select = on_select
+        self.results = []  # résultats affichés, dans l'ordre des lignes
+        self.query = ""
+
+        self._create_ui()
+        self.protocol("WM_DELETE_WINDOW", self.destroy)
+        if query:
+            self.query_entry.insert(0, query)
+            self.search()
+
+    # ========================================================================
+    # Interface
+    # ========================================================================
+
+    def _create_ui(self):
+        self.grid_columnconfigure(0, weight=1)
+        self.grid_rowconfigure(1, weight=1)
+
+        # --- Requête ---
+        bar = ctk.CTkFrame(self, fg_color="transparent")
+        bar.grid(row=0, column=0, columnspan=2, sticky="ew", padx=15, pady=(15, 0))
+        bar.grid_columnconfigure(0, weight=1)
+
+        self.query_entry = CTkEntry(
+            bar, placeholder_text='mots, "phrase exacte", préfixe*, -exclusion', height=34,
+        )
+        self.query_entry.grid(row=0, column=0, sticky="ew", padx=(0, 8))
+        self.query_entry.bind("<Return>", lambda e: self.search())
+
+        CTkButton(bar, text="🔍 Rechercher", width=120, height=34, command=self.search).grid(row=0, column=1)
+
+        # --- Pages trouvées ---
+        columns = ("file", "page", "snippet")
+        self.tree = ttk.Treeview(self, columns=columns, show="headings", selectmode="browse")
+        for name, title, width in (("file", "Fichier", 200), ("page", "Page", 60), ("snippet", "Extrait", 520)):
+            self.tree.heading(name, text=title)
+            self.tree.column(name, width=width, anchor="center" if name == "page" else "w")
+        self.tree.grid(row=1, column=0, sticky="nsew", padx=(15, 0), pady=15)
+        self.tree.bind("<Double-1>", self._show_selected)
+
+        scrollbar = ttk.Scrollbar(self, orient="vertical", command=self.tree.yview)
+        scrollbar.grid(row=1, column=1, sticky="ns", padx=(0, 15), pady=15)
+        self.tree.configure(yscrollcommand=scrollbar.set)
+
+        # --- État et pagination ---
+        actions = ctk.CTkFrame(self, fg_color="transparent")
+        actions.grid(row=2, column=0, columnspan=2, sticky="ew", padx=15, pady=(0, 15))
+        actions.grid_columnconfigure(0, weight=1)
+
+        self.summary_label = CTkLabel(actions, text="", font=("Helvetica", 11), text_color="#666666")
+        self.summary_label.grid(row=0, column=0, sticky="w")
+
+        self.more_btn = CTkButton(actions, text="Plus de résultats", width=140, command=self.more, state="disabled")
+        self.more_btn.grid(row=0, column=1, padx=(5, 0))
+
+    # ========================================================================
+    # Recherche
+    # ========================================================================
+
+    def search(self):
+        """Lance la requête saisie et remplace les résultats affichés"""
+        self.query = self.query_entry.get().strip()
+        self.results = []
+        self.tree.delete(*self.tree.get_children())
+        if self.query:
+            self._fetch()
+
+    def more(self):
+        """Ajoute les DEFAULT_LIMIT résultats suivants"""
+        self._fetch()
+
+    def _fetch(self):
+        start = time.perf_counter()
+        try:
+            found = self.index.search(self.query, DEFAULT_LIMIT, offset=len(self.results))
+        except (ValueError, sqlite3.OperationalError) as e:
+            self.summary_label.configure(text=f"Requête invalide : {e}")
+            self.more_btn.configure(state="disabled")
+            return
+        elapsed = time.perf_counter() - start
+
+        for result in found:
+            row = len(self.results)
+            self.results.append(result)
+            snippet = " ".join(result['snippet'].split())
+            self.tree.insert("", "end", iid=str(row),
+                             values=(os.path.basename(result['path']), result['page'], snippet))
+
+        self.more_btn.configure(state="normal" if len(found) == DEFAULT_LIMIT else "disabled")
+        self.summary_label.configure(
+            text=f"{len(self.results)} page(s) affichée(s) · {elapsed * 1000:.1f} ms · "
+                 f"{len(self.index)} page(s) indexée(s)"
+        )
+
+    def _show_selected(self, event=None):
+        selection = self.tree.selection()
+        if not selection or not self.on_select:
+            return
+        result = self.results[int(selection[0])]
+        self.on_select(result['path'], result['page'], self.index.text(result['path'], result['page']) or "")
@@ -0,0 +1,80 @@
+"""
+Benchmark : latence par image de chaque moteur OCR (voir src/core/backends.py).
+Premier appel (chargement du modèle) mesuré à part, puis médiane et p95.
+
+Usage : python utils/bench_backends.py [dossier_images] [--count 20] [--engines tesseract,tesserocr,fake]
+Sans dossier, de petites images de texte sont générées en mémoire.
+"""
+
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Racine du projet dans sys.path pour `from src.core...`
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.core.backends import available_backends, get_backend
+from src.core.batch import collect_image_paths
+from src.core.functions import load_image, preprocess_image
+
+from bench_engine import synthetic_images
+from benchmark import percentile
+
+
+def measure(backend, images, lang=None):
+    """(premier appel, latences des appels suivants) en secondes."""
+    start = time.perf_counter()
+    backend.recognize(images[0], lang)
+    first = time.perf_counter() - start
+
+    latencies = []
+    for img in images[1:] or images:
+        start = time.perf_counter()
+        backend.recognize(img, lang)
+        latencies.append(time.perf_counter() - start)
+    return first, latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('folder', nargs='?', help="dossier d'images (optionnel)")
+    parser.add_argument('--count', type=int, default=20, help="nombre d'images")
+    parser.add_argument('--engines', default=None,
+                        help="moteurs à comparer, séparés par des virgules (défaut : tous ceux installés)")
+    parser.add_argument('--transport', choices=('file', 'pipe'), default='file',
+                        help="transport du moteur 'tesseract'")
+    parser.add_argument('-l', '--lang', default=None, help="langue(s) Tesseract")
+    args = parser.parse_args()
+
+    if args.folder:
+        images = [load_image(p) for p in collect_image_paths([args.folder])[:args.count]]
+    else:
+        images = synthetic_images(args.count)
+    processed = [preprocess_image(img) for img in images]
+    if not processed:
+        print("Aucune image à traiter.")
+        return
+
+    names = args.engines.split(',') if args.engines else available_backends()
+    print(f"Images : {len(processed)}")
+    print(f"{'Moteur':<12} {'1er appel':>10} {'médiane':>10} {'p95':>10} {'débit':>12}")
+    for name in names:
+        try:
+            backend = get_backend(name, args.transport)
+            first, latencies = measure(backend, processed, args.lang)
+        except Exception as e:
+            print(f"{name:<12} indisponible : {e}")
+            continue
+        latencies.sort()
+        median = statistics.median(latencies)
+        rate = len(latencies) / sum(latencies) if sum(latencies) > 0 else float('inf')
+        print(f"{name:<12} {first * 1000:>7.1f} ms {median * 1000:>7.1f} ms "
+              f"{percentile(latencies, 95) * 1000:>7.1f} ms {rate:>7.1f} img/s")
+
+
+if __name__ == '__main__':
+    main()
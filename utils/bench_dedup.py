@@ -0,0 +1,83 @@
+"""
+Benchmark : index des quasi-doublons (src/core/dedup.py) avec des millions d'empreintes.
+Empreintes aléatoires insérées par lots, puis recherches de copies bruitées
+(quelques bits modifiés) et d'empreintes absentes : médiane et p95.
+
+Usage : python utils/bench_dedup.py [--entries 1000000] [--queries 200] [--distance 20]
+"""
+
+import argparse
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Racine du projet dans sys.path pour `from src.core...`
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.core.dedup import DEFAULT_DISTANCE, HASH_BITS, NearDuplicateIndex
+
+from benchmark import percentile
+
+SCOPE = 'bench'
+BATCH = 10000
+
+
+def noisy(fingerprint: int, bits: int, rng) -> int:
+    """Copie de `fingerprint` dont `bits` bits sont inversés."""
+    for bit in rng.sample(range(HASH_BITS), bits):
+        fingerprint ^= 1 << bit
+    return fingerprint
+
+
+def timed_queries(index, fingerprints, distance):
+    """(latences en secondes, nombre de requêtes ayant trouvé une entrée)."""
+    latencies, found = [], 0
+    for fingerprint in fingerprints:
+        start = time.perf_counter()
+        found += index.nearest(fingerprint, SCOPE, distance) is not None
+        latencies.append(time.perf_counter() - start)
+    return sorted(latencies), found
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--entries', type=int, default=1_000_000, help="empreintes dans l'index")
+    parser.add_argument('--queries', type=int, default=200, help="recherches mesurées par scénario")
+    parser.add_argument('--distance', type=int, default=DEFAULT_DISTANCE, help="distance de Hamming maximale")
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    with tempfile.TemporaryDirectory(prefix='dedup_') as tmp:
+        index = NearDuplicateIndex(tmp)
+        sample = []
+        start = time.perf_counter()
+        for offset in range(0, args.entries, BATCH):
+            batch = [(rng.getrandbits(HASH_BITS), SCOPE, f'key{offset + i}', None)
+                     for i in range(min(BATCH, args.entries - offset))]
+            index.add_many(batch)
+            if len(sample) < args.queries:
+                sample.extend(fingerprint for fingerprint, *_ in batch[:args.queries - len(sample)])
+        elapsed = time.perf_counter() - start
+        print(f"Index : {args.entries} empreinte(s) en {elapsed:.1f} s ({args.entries / elapsed:,.0f}/s)")
+
+        scenarios = [
+            (f"copies ({args.distance // 2} bits modifiés)", [noisy(f, args.distance // 2, rng) for f in sample]),
+            (f"copies ({args.distance} bits modifiés)", [noisy(f, args.distance, rng) for f in sample]),
+            ("empreintes absentes", [rng.getrandbits(HASH_BITS) for _ in sample]),
+        ]
+        print(f"{'Recherche':<32} {'trouvées':>9} {'médiane':>10} {'p95':>10}")
+        for name, queries in scenarios:
+            latencies, found = timed_queries(index, queries, args.distance)
+            print(f"{name:<32} {found:>4}/{len(queries):<4} {statistics.median(latencies) * 1000:>7.2f} ms "
+                  f"{percentile(latencies, 95) * 1000:>7.2f} ms")
+        index.close()
+
+
+if __name__ == '__main__':
+    main()
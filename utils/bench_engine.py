@@ -0,0 +1,79 @@
+"""
+Benchmark : un appel Tesseract par image vs appels groupés (`recognize_many`).
+Mesure le surcoût de démarrage économisé par image.
+
+Usage : python utils/bench_engine.py [dossier_images] [--count 20] [--group 10]
+Sans dossier, de petites images de texte sont générées en mémoire.
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+import pytesseract
+
+# Racine du projet dans sys.path pour `from src.core...`
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.core.batch import collect_image_paths
+from src.core.engine import recognize_many, resolve_tesseract_cmd
+from src.core.functions import load_image, preprocess_image
+
+
+def synthetic_images(count):
+    """Petites images d'une ligne, typiques des cas où le démarrage domine."""
+    images = []
+    for i in range(count):
+        img = 255 * np.ones((80, 600, 3), dtype='uint8')
+        cv2.putText(img, f"Facture {i:04d} - Total 12{i} EUR", (10, 50),
+                    cv2.FONT_HERSHEY_SIMPLEX, 1.0, (0, 0, 0), 2, cv2.LINE_AA)
+        images.append(img)
+    return images
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('folder', nargs='?', help="dossier d'images (optionnel)")
+    parser.add_argument('--count', type=int, default=20, help="nombre d'images")
+    parser.add_argument('--group', type=int, default=10, help="images par appel groupé")
+    args = parser.parse_args()
+
+    if args.folder:
+        paths = collect_image_paths([args.folder])[:args.count]
+        images = [load_image(p) for p in paths]
+    else:
+        images = synthetic_images(args.count)
+    processed = [preprocess_image(img) for img in images]
+    n = len(processed)
+    if not n:
+        print("Aucune image à traiter.")
+        return
+
+    pytesseract.pytesseract.tesseract_cmd = resolve_tesseract_cmd()
+
+    # 1) Chemin actuel : un processus tesseract par image
+    start = time.perf_counter()
+    for img in processed:
+        pytesseract.image_to_string(img)
+    single = time.perf_counter() - start
+
+    # 2) Appels groupés : un processus tesseract pour `group` images
+    start = time.perf_counter()
+    for i in range(0, n, args.group):
+        recognize_many(processed[i:i + args.group])
+    grouped = time.perf_counter() - start
+
+    print(f"Images            : {n} (groupes de {args.group})")
+    print(f"Un appel / image  : {single:.2f} s ({1000 * single / n:.1f} ms/image)")
+    print(f"Appels groupés    : {grouped:.2f} s ({1000 * grouped / n:.1f} ms/image)")
+    print(f"Surcoût économisé : {1000 * (single - grouped) / n:.1f} ms/image "
+          f"(x{single / grouped:.2f})")
+
+
+if __name__ == '__main__':
+    main()
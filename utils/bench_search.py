@@ -0,0 +1,101 @@
+"""
+Benchmark : recherche plein texte (src/core/search.py) sur un million de pages.
+Pages synthétiques (vocabulaire français accentué, fréquences de Zipf)
+indexées par lots, puis requêtes mot rare, mot courant, préfixe, phrase
+et sans accents : médiane et p95.
+
+Usage : python utils/bench_search.py [--pages 1000000] [--words 120] [--queries 50] [--index bench.sqlite3]
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Racine du projet dans sys.path pour `from src.core...`
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.core.search import SearchIndex
+
+from benchmark import percentile
+
+BATCH = 5000
+VOCABULARY = 20000
+
+SYLLABLES = ['fac', 'tu', 're', 'dé', 'vis', 'bon', 'com', 'man', 'de', 'é', 'té', 'ré', 'gle', 'ment',
+             'li', 'vrai', 'son', 'mon', 'tant', 'prix', 'clé', 'ça', 'pè', 'ro', 'nu', 'mé', 'ro', 'ga']
+
+
+def vocabulary(rng, size):
+    words = set()
+    while len(words) < size:
+        words.add(''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))))
+    return sorted(words)
+
+
+def timed(index, queries, order):
+    latencies, found = [], 0
+    for query in queries:
+        start = time.perf_counter()
+        found += bool(index.search(query, order=order))
+        latencies.append(time.perf_counter() - start)
+    return sorted(latencies), found
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--pages', type=int, default=1_000_000, help="pages dans l'index")
+    parser.add_argument('--words', type=int, default=120, help="mots par page")
+    parser.add_argument('--queries', type=int, default=50, help="requêtes mesurées par scénario")
+    parser.add_argument('--index', default=None, help="fichier d'index (réutilisé s'il existe ; défaut : temporaire)")
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    words = vocabulary(rng, VOCABULARY)
+    # Zipf : le rang r apparaît avec un poids 1 / r
+    weights = [1 / (rank + 1) for rank in range(len(words))]
+
+    with tempfile.TemporaryDirectory(prefix='search_') as tmp:
+        path = args.index or os.path.join(tmp, 'index.sqlite3')
+        index = SearchIndex(path)
+        if len(index) < args.pages:
+            start = time.perf_counter()
+            for offset in range(len(index), args.pages, BATCH):
+                count = min(BATCH, args.pages - offset)
+                index.add_many((f'/scans/lot{(offset + i) // 500:05d}.pdf', (offset + i) % 500 + 1,
+                                ' '.join(rng.choices(words, weights, k=args.words)))
+                               for i in range(count))
+            index.optimize()
+            elapsed = time.perf_counter() - start
+            print(f"Index : {args.pages} page(s) en {elapsed:.1f} s ({args.pages / elapsed:,.0f}/s), "
+                  f"{os.path.getsize(path) / 2**20:.0f} Mo")
+
+        rare = words[len(words) // 2:]
+        common = words[:20]
+        scenarios = [
+            ("mot rare", [rng.choice(rare) for _ in range(args.queries)]),
+            ("deux mots rares", [f"{rng.choice(rare)} {rng.choice(rare)}" for _ in range(args.queries)]),
+            ("préfixe (4 lettres)*", [rng.choice(rare)[:4] + '*' for _ in range(args.queries)]),
+            ("phrase", [f'"{rng.choice(words[:200])} {rng.choice(words[:200])}"' for _ in range(args.queries)]),
+            ("sans accents", [rng.choice([w for w in rare if 'é' in w]).replace('é', 'e')
+                              for _ in range(args.queries)]),
+            ("mot courant", [rng.choice(common) for _ in range(args.queries)]),
+        ]
+        print(f"{'Requête':<24} {'ordre':<7} {'trouvées':>9} {'médiane':>10} {'p95':>10}")
+        for name, queries in scenarios:
+            for order in ('auto', 'rank', 'recent'):
+                latencies, found = timed(index, queries, order)
+                print(f"{name:<24} {order:<7} {found:>4}/{len(queries):<4} "
+                      f"{statistics.median(latencies) * 1000:>7.2f} ms {percentile(latencies, 95) * 1000:>7.2f} ms")
+        index.close()
+
+
+if __name__ == '__main__':
+    main()
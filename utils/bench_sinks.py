@@ -0,0 +1,69 @@
+"""
+Benchmark : écriture des résultats dans chaque sortie (src/core/sinks.py).
+Textes synthétiques d'environ 2 Ko écrits page par page dans un fichier
+par image (dir), en JSON Lines et en SQLite, puis reprise (pages déjà
+présentes relues à l'ouverture) : pages/s et fichiers créés.
+
+Lancer sur le partage réseau visé (--dir) : c'est là que le coût des
+métadonnées d'un fichier par image apparaît.
+
+Usage : python utils/bench_sinks.py [--pages 20000] [--dir /mnt/partage/bench]
+"""
+
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Racine du projet dans sys.path pour `from src.core...`
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.core.sinks import SINKS, open_sink
+
+WORDS = ['facture', 'montant', 'été', 'règlement', 'échéance', 'référence', 'total', 'clé', 'numéro', 'société']
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--pages', type=int, default=20000, help="pages écrites par sortie")
+    parser.add_argument('--dir', default=None, help="dossier de travail (défaut : temporaire local)")
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    texts = [' '.join(rng.choices(WORDS, k=250)) for _ in range(100)]
+
+    base = args.dir or tempfile.mkdtemp(prefix='sinks_')
+    print(f"{'Sortie':<8} {'écriture':>12} {'pages/s':>10} {'reprise':>10} {'fichiers':>9}")
+    try:
+        for kind in SINKS:
+            out_dir = os.path.join(base, kind)
+            shutil.rmtree(out_dir, ignore_errors=True)
+            os.makedirs(out_dir)
+
+            start = time.perf_counter()
+            with open_sink(kind, out_dir) as sink:
+                for i in range(args.pages):
+                    sink.write(f'/scans/lot{i // 500:04d}/page{i:07d}.png', texts[i % len(texts)])
+            elapsed = time.perf_counter() - start
+
+            start = time.perf_counter()
+            with open_sink(kind, out_dir) as sink:
+                sink.written()
+            resume = time.perf_counter() - start
+
+            files = len(os.listdir(out_dir))
+            print(f"{kind:<8} {elapsed:>10.2f} s {args.pages / elapsed:>10,.0f} {resume * 1000:>7.0f} ms {files:>9}")
+    finally:
+        if not args.dir:
+            shutil.rmtree(base, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+"""
+Benchmark : temps de démarrage du CLI et de la GUI, sonde Tesseract froide et mémorisée.
+Chaque scénario est lancé dans un nouvel interpréteur, `--runs` fois (médiane).
+
+Usage : python utils/bench_startup.py [--runs 5]
+La ligne « référence » mesure l'import de cv2, numpy et pytesseract :
+c'est le coût repoussé au premier usage par lazy.py.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Racine du projet : les scénarios y sont lancés pour `import src.core...`
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+
+HEAVY_MODULES = ('cv2', 'numpy', 'pytesseract', 'PIL')
+
+# Code exécuté dans l'interpréteur mesuré : temps interne + modules lourds chargés
+_PROBE_CODE = """
+import sys, time, json
+start = time.perf_counter()
+{body}
+elapsed = time.perf_counter() - start
+print(json.dumps({{'elapsed': elapsed, 'heavy': [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+SCENARIOS = [
+    ("référence : import cv2, numpy, pytesseract", "import cv2, numpy, pytesseract"),
+    ("import src.core.main", "import src.core.main"),
+    ("CLI --help", "import src.core.main as m\ntry:\n    m.parse_args(['--help'])\nexcept SystemExit:\n    pass"),
+    ("import src.gui.gui_app", "sys.path.insert(0, 'src/gui')\nimport src.gui.gui_app"),
+    ("sonde Tesseract (mémorisée)", "from src.core.engine import tesseract_version\ntesseract_version()"),
+]
+
+
+def run_once(body: str, env=None) -> dict:
+    """Lance `body` dans un nouvel interpréteur ; temps total du processus et temps interne."""
+    code = _PROBE_CODE.format(body=body, heavy=HEAVY_MODULES)
+    start = time.perf_counter()
+    proc = subprocess.run([sys.executable, '-c', code], cwd=PROJECT_ROOT, env=env,
+                          capture_output=True, text=True)
+    wall = time.perf_counter() - start
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else 'échec')
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    result['wall'] = wall
+    return result
+
+
+def measure(body: str, runs: int, env=None, before=None) -> dict:
+    """Médianes sur `runs` lancements ; `before()` est appelé avant chacun."""
+    results = []
+    for _ in range(runs):
+        if before:
+            before()
+        results.append(run_once(body, env))
+    return {
+        'wall': statistics.median(r['wall'] for r in results),
+        'elapsed': statistics.median(r['elapsed'] for r in results),
+        'heavy': results[-1]['heavy'],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5, help="lancements par scénario")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix='probe_') as tmp:
+        probe_file = os.path.join(tmp, 'tesseract_probe.json')
+        env = dict(os.environ, OCR_PROBE_CACHE=probe_file)
+
+        def forget_probe():
+            if os.path.exists(probe_file):
+                os.remove(probe_file)
+
+        rows = []
+        for name, body in SCENARIOS:
+            try:
+                rows.append((name, measure(body, args.runs, env)))
+            except RuntimeError as e:
+                print(f"{name} : ignoré ({e})")
+        try:
+            cold = measure("from src.core.engine import tesseract_version\ntesseract_version()",
+                           args.runs, env, before=forget_probe)
+            rows.insert(len(rows) - 1, ("sonde Tesseract (froide)", cold))
+        except RuntimeError as e:
+            print(f"Sonde Tesseract : ignorée ({e})")
+
+    print(f"{'Scénario':<44} {'processus':>10} {'interne':>9}  modules lourds chargés")
+    for name, r in rows:
+        heavy = ', '.join(r['heavy']) or '-'
+        print(f"{name:<44} {r['wall'] * 1000:>8.0f} ms {r['elapsed'] * 1000:>6.0f} ms  {heavy}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+"""
+Benchmark : transport 'file' (pytesseract, fichiers temporaires) vs 'pipe'
+(PNM en mémoire sur stdin/stdout). Mesure le temps et les octets écrits
+sur disque par image.
+
+Usage : python utils/bench_transport.py [dossier_images] [--count 20]
+"""
+
+import argparse
+import glob
+import os
+import sys
+import time
+from pathlib import Path
+
+import pytesseract
+
+# Racine du projet dans sys.path pour `from src.core...`
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.core.batch import collect_image_paths
+from src.core.engine import encode_pnm, recognize_pipe, resolve_tesseract_cmd
+from src.core.functions import load_image, preprocess_image
+
+from bench_engine import synthetic_images
+
+# Octets des fichiers temporaires de pytesseract, relevés juste avant leur suppression
+_written = [0]
+_cleanup = pytesseract.pytesseract.cleanup
+
+
+def _counting_cleanup(temp_name):
+    for name in glob.glob(temp_name + '*'):
+        _written[0] += os.path.getsize(name)
+    _cleanup(temp_name)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('folder', nargs='?', help="dossier d'images (optionnel)")
+    parser.add_argument('--count', type=int, default=20, help="nombre d'images")
+    args = parser.parse_args()
+
+    if args.folder:
+        images = [load_image(p) for p in collect_image_paths([args.folder])[:args.count]]
+    else:
+        images = synthetic_images(args.count)
+    processed = [preprocess_image(img) for img in images]
+    n = len(processed)
+    if not n:
+        print("Aucune image à traiter.")
+        return
+
+    pytesseract.pytesseract.tesseract_cmd = resolve_tesseract_cmd()
+    pytesseract.pytesseract.cleanup = _counting_cleanup
+
+    start = time.perf_counter()
+    for img in processed:
+        pytesseract.image_to_string(img)
+    file_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for img in processed:
+        recognize_pipe(img)
+    pipe_time = time.perf_counter() - start
+    piped = sum(len(encode_pnm(img)) for img in processed)
+
+    print(f"Images         : {n}")
+    print(f"file (disque)  : {1000 * file_time / n:.1f} ms/image, "
+          f"{_written[0] / n / 1024:.1f} Ko écrits/image")
+    print(f"pipe (mémoire) : {1000 * pipe_time / n:.1f} ms/image, "
+          f"0.0 Ko écrits/image ({piped / n / 1024:.1f} Ko transmis par pipe)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,165 @@
+"""
+Benchmark débit / précision du chemin CLI (`run_batch`) sur un corpus annoté.
+Pour chaque nombre de processus : images/s, latence p50/p95/p99 et taux
+d'erreur caractère (CER) par rapport aux fichiers `.gt.txt`.
+
+Usage :
+    python utils/create_sample_image.py --corpus data/corpus --count 100 --seed 1 --noise 6
+    python utils/benchmark.py data/corpus --workers 1,2,4 [--pipeline "..."] [--json resultats.json]
+
+Comparer deux exécutions (avant / après une modification du prétraitement
+ou de la concurrence) sur le même corpus et la même graine.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+# Racine du projet dans sys.path pour `from src.core...`
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.core.backends import ENGINES
+from src.core.batch import collect_image_paths, default_workers, run_batch
+from src.core.pipeline import get_pipeline
+
+
+def edit_distance(a: str, b: str) -> int:
+    """Distance de Levenshtein (insertion, suppression, substitution)."""
+    if len(a) < len(b):
+        a, b = b, a
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb)))
+        previous = current
+    return previous[-1]
+
+
+def _normalize(text: str) -> str:
+    # Les blancs (lignes vides, espaces multiples) ne comptent pas comme erreurs
+    return ' '.join(text.split())
+
+
+def ground_truth(path: str):
+    """Texte attendu pour `path` (`page.png` -> `page.gt.txt`), ou None."""
+    gt_path = os.path.splitext(path)[0] + '.gt.txt'
+    if not os.path.exists(gt_path):
+        return None
+    with open(gt_path, encoding='utf-8') as f:
+        return f.read()
+
+
+def percentile(values, p: float) -> float:
+    """Percentile `p` (0-100) par interpolation linéaire."""
+    values = sorted(values)
+    if not values:
+        return 0.0
+    k = (len(values) - 1) * p / 100
+    lo = int(k)
+    hi = min(lo + 1, len(values) - 1)
+    return values[lo] + (values[hi] - values[lo]) * (k - lo)
+
+
+def run(paths, workers: int, group: int, options: dict) -> dict:
+    """Une passe complète sur `paths` ; retourne les mesures et les textes."""
+    start = time.perf_counter()
+    results = list(run_batch(paths, workers=workers, ordered=True, group=group, options=options))
+    wall = time.perf_counter() - start
+
+    latencies = [r['duration'] for r in results if not r['error']]
+    return {
+        'workers': workers,
+        'images': len(results),
+        'errors': sum(1 for r in results if r['error']),
+        'wall': wall,
+        'images_per_s': len(results) / wall if wall else 0.0,
+        'p50': percentile(latencies, 50),
+        'p95': percentile(latencies, 95),
+        'p99': percentile(latencies, 99),
+        'texts': {r['path']: r['text'] for r in results},
+    }
+
+
+def character_error_rate(texts: dict) -> float:
+    """CER global : somme des distances / somme des longueurs de vérité terrain."""
+    errors = chars = 0
+    for path, text in texts.items():
+        expected = ground_truth(path)
+        if expected is None:
+            continue
+        expected = _normalize(expected)
+        errors += edit_distance(_normalize(text), expected)
+        chars += len(expected)
+    return errors / chars if chars else float('nan')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('corpus', nargs='+', help="dossier(s), fichiers ou motifs d'images")
+    parser.add_argument('--workers', default=None,
+                        help="nombres de processus à comparer, ex. 1,2,4 (défaut : 1 et nombre de cœurs)")
+    parser.add_argument('--limit', type=int, default=0, help="nombre maximal d'images")
+    parser.add_argument('-g', '--group', type=int, default=1, help="images par appel Tesseract")
+    parser.add_argument('-l', '--lang', default=None, help="langue(s) Tesseract")
+    parser.add_argument('--pipeline', default=None, help="prétraitement (voir pipeline.py)")
+    parser.add_argument('--engine', choices=ENGINES, default='auto', help="moteur OCR (voir backends.py)")
+    parser.add_argument('--transport', choices=('file', 'pipe'), default='file', help="transport vers Tesseract")
+    parser.add_argument('--x-height', type=int, default=0, help="hauteur de caractère visée (0 = désactivé)")
+    parser.add_argument('--warmup', type=int, default=1, help="passes de chauffe ignorées")
+    parser.add_argument('--json', default=None, metavar='FICHIER', help="enregistrer les mesures en JSON")
+    args = parser.parse_args()
+
+    paths = collect_image_paths(args.corpus)
+    if args.limit:
+        paths = paths[:args.limit]
+    if not paths:
+        print("Aucune image à traiter.")
+        return 1
+
+    if args.workers:
+        counts = [int(n) for n in args.workers.split(',')]
+    else:
+        counts = sorted({1, default_workers()})
+
+    get_pipeline(args.pipeline)
+    options = {'lang': args.lang, 'pipeline': args.pipeline, 'engine': args.engine, 'transport': args.transport,
+               'x_height': args.x_height}
+
+    # Chauffe : cache disque du système, import des modules dans le processus
+    for _ in range(args.warmup):
+        run(paths[:max(counts)], max(counts), args.group, options)
+
+    rows = []
+    cer = None
+    for workers in counts:
+        row = run(paths, workers, args.group, options)
+        texts = row.pop('texts')
+        if cer is None:
+            # Le texte ne dépend pas du nombre de processus : CER calculé une fois
+            cer = character_error_rate(texts)
+        row['cer'] = cer
+        rows.append(row)
+
+    print(f"Corpus   : {len(paths)} image(s), pipeline « {get_pipeline(args.pipeline, args.x_height).spec} »")
+    print(f"CER      : {100 * cer:.2f} %")
+    print(f"{'proc.':>6} {'images/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'temps s':>8} {'erreurs':>8}")
+    for row in rows:
+        print(f"{row['workers']:>6} {row['images_per_s']:>9.2f} {1000 * row['p50']:>8.1f} "
+              f"{1000 * row['p95']:>8.1f} {1000 * row['p99']:>8.1f} {row['wall']:>8.2f} {row['errors']:>8}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'corpus': args.corpus, 'images': len(paths), 'options': options,
+                       'cer': cer, 'runs': rows}, f, indent=2, ensure_ascii=False)
+        print(f"Mesures enregistrées : {args.json}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
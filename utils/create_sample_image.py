@@ -1,40 +1,186 @@
 """
 Génère un exemple d'image `images/document.png` contenant du texte.
 Utile si vous n'avez pas d'image de test prête.
+
+Avec `--corpus`, génère un corpus synthétique reproductible pour les
+benchmarks (voir utils/benchmark.py) : chaque image `page_XXXXX.png|jpg`
+est accompagnée de sa vérité terrain `page_XXXXX.gt.txt`, et `manifest.jsonl`
+décrit les paramètres de chaque page.
+
+    python utils/create_sample_image.py
+    python utils/create_sample_image.py --corpus data/corpus --count 200 --seed 42 \\
+        --size 1240x1754 --lines 10-40 --noise 8 --blur 3 --rotation 2 --jpeg 70
+
+Les polices Hershey d'OpenCV ne dessinent pas les accents : le texte
+généré est donc en ASCII pour que la vérité terrain reste exacte.
 """
 
+import argparse
+import json
 import os
+import random
+
 import cv2
+import numpy as np
 
 OUT_DIR = 'images'
 OUT_FILE = os.path.join(OUT_DIR, 'document.png')
 
-os.makedirs(OUT_DIR, exist_ok=True)
+# Polices disponibles pour le corpus (nom -> constante OpenCV)
+FONTS = {
+    'simplex': cv2.FONT_HERSHEY_SIMPLEX,
+    'duplex': cv2.FONT_HERSHEY_DUPLEX,
+    'complex': cv2.FONT_HERSHEY_COMPLEX,
+    'triplex': cv2.FONT_HERSHEY_TRIPLEX,
+    'plain': cv2.FONT_HERSHEY_PLAIN,
+}
 
-# Création d'une image blanche
-w, h = 1200, 400
-img = 255 * (1 * np.ones((h, w, 3), dtype='uint8')) if 'np' in globals() else None
+# Vocabulaire des pages générées (sans accents, voir plus haut)
+WORDS = (
+    "facture client date total montant adresse rue avenue paris lyon numero "
+    "commande livraison produit quantite prix unitaire remise taxe reference "
+    "document page article contrat signature service paiement banque compte "
+    "le la les de du des un une et ou pour avec sans sur dans par"
+).split()
 
-if img is None:
-    import numpy as np
+
+def create_sample():
+    """Image d'exemple historique : 1200x400, trois lignes de texte."""
+    os.makedirs(OUT_DIR, exist_ok=True)
+
+    # Création d'une image blanche
+    w, h = 1200, 400
     img = 255 * np.ones((h, w, 3), dtype='uint8')
 
-# Texte d'exemple (plusieurs lignes)
-lines = [
-    "Ceci est un exemple de texte pour OCR.",
-    "Lignes multiples, Tesseract devrait les détecter.",
-    "Numéro: 12345 | Date: 2026-02-01"
-]
-
-y0, dy = 60, 70
-font = cv2.FONT_HERSHEY_SIMPLEX
-font_scale = 1.2
-color = (0, 0, 0)  # noir
-thickness = 2
-
-for i, line in enumerate(lines):
-    y = y0 + i * dy
-    cv2.putText(img, line, (40, y), font, font_scale, color, thickness, cv2.LINE_AA)
-
-cv2.imwrite(OUT_FILE, img)
-print(f"Image d'exemple générée: {OUT_FILE}")
+    # Texte d'exemple (plusieurs lignes)
+    lines = [
+        "Ceci est un exemple de texte pour OCR.",
+        "Lignes multiples, Tesseract devrait les détecter.",
+        "Numéro: 12345 | Date: 2026-02-01"
+    ]
+
+    y0, dy = 60, 70
+    font = cv2.FONT_HERSHEY_SIMPLEX
+    font_scale = 1.2
+    color = (0, 0, 0)  # noir
+    thickness = 2
+
+    for i, line in enumerate(lines):
+        y = y0 + i * dy
+        cv2.putText(img, line, (40, y), font, font_scale, color, thickness, cv2.LINE_AA)
+
+    cv2.imwrite(OUT_FILE, img)
+    print(f"Image d'exemple générée: {OUT_FILE}")
+
+
+def random_line(rng, font, scale, thickness, max_width):
+    """Ligne de mots et de nombres aléatoires tenant dans `max_width` pixels."""
+    words = []
+    while True:
+        word = str(rng.randint(1, 99999)) if rng.random() < 0.15 else rng.choice(WORDS)
+        candidate = ' '.join(words + [word])
+        (width, _), _ = cv2.getTextSize(candidate, font, scale, thickness)
+        if width > max_width:
+            return ' '.join(words) if words else word
+        words.append(word)
+
+
+def render_page(rng, width, height, lines, font_name, scale, noise, blur, rotation):
+    """Dessine une page et applique les dégradations. Retourne (image, texte, paramètres)."""
+    font = FONTS[font_name]
+    thickness = max(1, round(scale * 2))
+    margin = width // 20
+    (_, text_h), baseline = cv2.getTextSize("Hg", font, scale, thickness)
+    line_step = int((text_h + baseline) * 1.6)
+    lines = min(lines, max(1, (height - 2 * margin) // line_step))
+
+    img = np.full((height, width), 255, dtype=np.uint8)
+    text_lines = []
+    for i in range(lines):
+        line = random_line(rng, font, scale, thickness, width - 2 * margin)
+        y = margin + text_h + i * line_step
+        cv2.putText(img, line, (margin, y), font, scale, 0, thickness, cv2.LINE_AA)
+        text_lines.append(line)
+
+    angle = rng.uniform(-rotation, rotation) if rotation else 0.0
+    if angle:
+        matrix = cv2.getRotationMatrix2D((width / 2, height / 2), angle, 1.0)
+        img = cv2.warpAffine(img, matrix, (width, height), borderValue=255)
+    if blur:
+        k = blur if blur % 2 else blur + 1
+        img = cv2.GaussianBlur(img, (k, k), 0)
+    if noise:
+        # Le bruit dépend de la graine : générateur NumPy dérivé de `rng`
+        np_rng = np.random.default_rng(rng.randrange(2 ** 32))
+        noisy = img.astype(np.int16) + np_rng.normal(0, noise, img.shape).astype(np.int16)
+        img = np.clip(noisy, 0, 255).astype(np.uint8)
+
+    params = {'width': width, 'height': height, 'lines': lines, 'font': font_name,
+              'scale': scale, 'noise': noise, 'blur': blur, 'rotation': round(angle, 3)}
+    return img, '\n'.join(text_lines) + '\n', params
+
+
+def _range(value: str):
+    """'10-40' -> (10, 40) ; '12' -> (12, 12)."""
+    lo, _, hi = value.partition('-')
+    return int(lo), int(hi or lo)
+
+
+def create_corpus(args):
+    os.makedirs(args.corpus, exist_ok=True)
+    rng = random.Random(args.seed)
+    fonts = args.fonts.split(',')
+    for name in fonts:
+        if name not in FONTS:
+            raise SystemExit(f"Police inconnue : {name} (disponibles : {', '.join(FONTS)})")
+    width, height = (int(v) for v in args.size.lower().split('x'))
+    lines_lo, lines_hi = _range(args.lines)
+
+    with open(os.path.join(args.corpus, 'manifest.jsonl'), 'w', encoding='utf-8') as manifest:
+        for i in range(args.count):
+            img, text, params = render_page(
+                rng, width, height, rng.randint(lines_lo, lines_hi), rng.choice(fonts),
+                rng.uniform(args.scale * 0.8, args.scale * 1.2), args.noise, args.blur, args.rotation,
+            )
+            stem = f"page_{i:05d}"
+            if args.jpeg:
+                image_name = stem + '.jpg'
+                cv2.imwrite(os.path.join(args.corpus, image_name), img,
+                            [cv2.IMWRITE_JPEG_QUALITY, args.jpeg])
+            else:
+                image_name = stem + '.png'
+                cv2.imwrite(os.path.join(args.corpus, image_name), img)
+            with open(os.path.join(args.corpus, stem + '.gt.txt'), 'w', encoding='utf-8') as f:
+                f.write(text)
+
+            params.update(image=image_name, jpeg=args.jpeg, seed=args.seed)
+            manifest.write(json.dumps(params) + '\n')
+
+    print(f"Corpus généré : {args.count} page(s) dans {args.corpus}")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Image d'exemple ou corpus synthétique avec vérité terrain")
+    parser.add_argument('--corpus', default=None, metavar='DOSSIER',
+                        help="générer un corpus dans DOSSIER (sinon : images/document.png)")
+    parser.add_argument('--count', type=int, default=50, help="nombre de pages")
+    parser.add_argument('--seed', type=int, default=0, help="graine (corpus reproductible)")
+    parser.add_argument('--size', default='1240x1754', help="taille des pages LxH (défaut : A4 150 dpi)")
+    parser.add_argument('--lines', default='10-30', help="lignes par page, ex. 10-30")
+    parser.add_argument('--fonts', default='simplex,duplex,complex',
+                        help=f"polices séparées par des virgules ({', '.join(FONTS)})")
+    parser.add_argument('--scale', type=float, default=1.0, help="taille moyenne du texte (échelle OpenCV)")
+    parser.add_argument('--noise', type=float, default=0, help="écart-type du bruit gaussien (0-255)")
+    parser.add_argument('--blur', type=int, default=0, help="noyau de flou gaussien (0 = aucun)")
+    parser.add_argument('--rotation', type=float, default=0, help="rotation aléatoire maximale (degrés)")
+    parser.add_argument('--jpeg', type=int, default=0, metavar='QUALITÉ',
+                        help="enregistrer en JPEG avec cette qualité (artefacts de compression)")
+    return parser.parse_args(argv)
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    if args.corpus:
+        create_corpus(args)
+    else:
+        create_sample()